@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+ROOT = Path(__file__).resolve().parent.parent
+AGENT_KEY = "bench-agent-key"
+ADMIN_KEY = "bench-admin-key"
+PIN = "4321"
+
+DEFAULT_MIX = "allow=60,deny=10,require_pin=10,status=18,approve=2"
+
+# action/target pairs that hit each decision under the repo's policy.json
+TRAFFIC = {
+    "allow": ("file.read.config", "C:\\Games\\OpenClaw\\config.ini"),
+    "deny": ("exec.shell", "cmd.exe"),
+    "require_pin": ("file.write.savegame", "C:\\Games\\OpenClaw\\SAVES.XML"),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in {"allow", "deny", "require_pin", "status", "approve"}:
+            raise SystemExit(f"unknown traffic kind in --mix: {name}")
+        mix[name] = float(weight or 0)
+    return mix
+
+
+def bench_env(workdir: Path) -> Dict[str, str]:
+    shutil.copy(ROOT / "policy.json", workdir / "policy.json")
+    return {
+        "GLOVE_DB_PATH": str(workdir / "glove.db"),
+        "GLOVE_POLICY_PATH": str(workdir / "policy.json"),
+        "GLOVE_AGENT_KEY": AGENT_KEY,
+        "GLOVE_ADMIN_KEY": ADMIN_KEY,
+        "GLOVE_NOTIFIER_PROVIDER": "console",
+        "GLOVE_NOTIFIER_PROVIDERS": "",
+        "GLOVE_CLAWHUB_EXTENSIONS_DIR": str(workdir / "extensions"),
+        # One process, as with `python main.py`: keep the pending table on.
+        "GLOVE_PENDING_TABLE": "1",
+        # Measure the server, not the admission limits.
+        "GLOVE_AGENT_RATE_PER_KEY": "0",
+        "GLOVE_AGENT_RATE_PER_IP": "0",
+        "GLOVE_ACTION_RATE_PER_PREFIX": "0",
+        "GLOVE_AGENT_MAX_IN_FLIGHT": "0",
+        "GLOVE_ADMIN_MAX_IN_FLIGHT": "0",
+    }
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, ok: bool) -> None:
+        if ok:
+            self.latencies.setdefault(name, []).append(seconds)
+        else:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        endpoints: Dict[str, Any] = {}
+        total = 0
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(name, []))
+            total += len(values)
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": round(len(values) / elapsed, 1),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+            }
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], recorder: Recorder):
+        self.client = client
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.recorder = recorder
+        self.pending: deque = deque(maxlen=5000)
+        self.known: deque = deque(maxlen=1000)
+
+    async def _timed(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(name, time.perf_counter() - started, False)
+            return None
+        self.recorder.add(name, time.perf_counter() - started, resp.status_code < 500 and resp.status_code != 429)
+        return resp
+
+    async def one(self, kind: str) -> None:
+        if kind in TRAFFIC:
+            action, target = TRAFFIC[kind]
+            resp = await self._timed(
+                f"agent_request:{kind}",
+                "POST",
+                "/api/v1/agent/request",
+                json={"action": action, "target": target, "metadata": {"source": "bench"}},
+                headers={"X-Glove-Agent-Key": AGENT_KEY},
+            )
+            if kind == "require_pin" and resp is not None and resp.status_code == 200:
+                request_id = resp.json().get("request_id")
+                if request_id:
+                    self.pending.append(request_id)
+                    self.known.append(request_id)
+            return
+        if kind == "status":
+            if not self.known:
+                return await self.one("require_pin")
+            await self._timed(
+                "agent_request_status",
+                "GET",
+                "/api/v1/agent/request-status",
+                params={"request_id": random.choice(self.known)},
+                headers={"X-Glove-Agent-Key": AGENT_KEY},
+            )
+            return
+        if not self.pending:
+            return await self.one("require_pin")
+        await self._timed(
+            "approve_pin",
+            "POST",
+            "/api/v1/admin/approve-pin",
+            json={"request_id": self.pending.popleft(), "pin": PIN},
+            headers={"X-Glove-Admin-Key": ADMIN_KEY},
+        )
+
+    async def worker(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            await self.one(random.choices(self.kinds, self.weights)[0])
+
+    async def run(self, concurrency: int, duration: float, warmup: float) -> float:
+        if warmup > 0:
+            recorder, self.recorder = self.recorder, Recorder()
+            end = time.perf_counter() + warmup
+            await asyncio.gather(*(self.worker(end) for _ in range(concurrency)))
+            self.recorder = recorder
+        started = time.perf_counter()
+        await asyncio.gather(*(self.worker(started + duration) for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+async def _setup_pin(client: httpx.AsyncClient) -> None:
+    resp = await client.post("/api/v1/admin/setup-pin", json={"pin": PIN}, headers={"X-Glove-Admin-Key": ADMIN_KEY})
+    resp.raise_for_status()
+
+
+async def run_inprocess(args: argparse.Namespace, mix: Dict[str, float], workdir: Path) -> Dict[str, Any]:
+    os.environ.update(bench_env(workdir))
+    sys.path.insert(0, str(ROOT))
+    from glove.app import app
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    # The console notifier prints every require_pin message; keep it out of the report.
+    # ASGITransport does not send lifespan events, so open the app's resources directly.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _setup_pin(client)
+            driver = LoadDriver(client, mix, recorder)
+            elapsed = await driver.run(args.concurrency, args.duration, args.warmup)
+    return recorder.summary(elapsed)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_uvicorn(args: argparse.Namespace, mix: Dict[str, float], workdir: Path) -> Dict[str, Any]:
+    port = _free_port()
+    env = dict(os.environ, **bench_env(workdir), PYTHONPATH=str(ROOT))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "glove.app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=str(workdir),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for _ in range(200):
+                try:
+                    if (await client.get("/api/v1/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if proc.poll() is not None:
+                    raise SystemExit("uvicorn exited during start-up")
+                await asyncio.sleep(0.05)
+            else:
+                raise SystemExit("uvicorn did not become healthy")
+            await _setup_pin(client)
+            recorder = Recorder()
+            driver = LoadDriver(client, mix, recorder)
+            elapsed = await driver.run(args.concurrency, args.duration, args.warmup)
+            return recorder.summary(elapsed)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions: List[str] = []
+    for name, base in baseline.get("endpoints", {}).items():
+        current = result["endpoints"].get(name)
+        if not current or not base.get("count"):
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if base["throughput_rps"] and current["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']}/s < baseline {base['throughput_rps']}/s"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Glove agent and approval APIs.")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted traffic mix (default: {DEFAULT_MIX}).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write the JSON result here.")
+    parser.add_argument("--baseline", default=str(Path(__file__).resolve().parent / "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    workdir = Path(tempfile.mkdtemp(prefix="glove-bench-"))
+    try:
+        runner = run_inprocess if args.mode == "inprocess" else run_uvicorn
+        summary = asyncio.run(runner(args, mix, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "benchmark": "api_load",
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "mix": mix,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **summary,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if args.update_baseline:
+        baselines[args.mode] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        return 0
+    if args.mode not in baselines:
+        print(f"no {args.mode} baseline in {baseline_path}; skipping comparison", file=sys.stderr)
+        return 0
+    regressions = compare(result, baselines[args.mode], args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+AGENT_KEY = "bench-agent-key"
+ADMIN_KEY = "bench-admin-key"
+PIN = "4321"
+ALLOW = ("file.read.config", "C:\\Games\\OpenClaw\\config.ini")
+REQUIRE_PIN = ("file.write.savegame", "C:\\Games\\OpenClaw\\SAVES.XML")
+POLL_INTERVAL = 1.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_env(workdir: Path) -> Dict[str, str]:
+    shutil.copy(ROOT / "policy.json", workdir / "policy.json")
+    return {
+        "GLOVE_DB_PATH": str(workdir / "glove.db"),
+        "GLOVE_POLICY_PATH": str(workdir / "policy.json"),
+        "GLOVE_AGENT_KEY": AGENT_KEY,
+        "GLOVE_ADMIN_KEY": ADMIN_KEY,
+        "GLOVE_NOTIFIER_PROVIDER": "console",
+        "GLOVE_NOTIFIER_PROVIDERS": "",
+        "GLOVE_CLAWHUB_EXTENSIONS_DIR": str(workdir / "extensions"),
+        # One process, as with `python main.py`: keep the pending table on.
+        "GLOVE_PENDING_TABLE": "1",
+        "GLOVE_DECISION_CACHE_SECONDS": "60",
+        "GLOVE_AGENT_RATE_PER_KEY": "0",
+        "GLOVE_AGENT_RATE_PER_IP": "0",
+        "GLOVE_ACTION_RATE_PER_PREFIX": "0",
+        "GLOVE_AGENT_MAX_IN_FLIGHT": "0",
+        "GLOVE_ADMIN_MAX_IN_FLIGHT": "0",
+    }
+
+
+def _admin_post(base_url: str, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    req = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"X-Glove-Admin-Key": ADMIN_KEY, "Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return json.loads(resp.read())
+
+
+def time_calls(n: int, call: Callable[[], Any]) -> List[float]:
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def urllib_decide(base_url: str) -> None:
+    # What a hand-written integration does: a new connection per call.
+    action, target = ALLOW
+    req = urllib.request.Request(
+        base_url + "/api/v1/agent/request",
+        data=json.dumps({"action": action, "target": target, "metadata": {}}).encode("utf-8"),
+        headers={"X-Glove-Agent-Key": AGENT_KEY, "Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        resp.read()
+
+
+async def time_async_calls(base_url: str, n: int, concurrency: int) -> List[float]:
+    from glove.client import AsyncGloveClient
+
+    samples: List[float] = []
+    remaining = [n]
+
+    async def worker(client: AsyncGloveClient) -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            await client.decide(*ALLOW)
+            samples.append(time.perf_counter() - started)
+
+    async with AsyncGloveClient(base_url, AGENT_KEY, pool_size=concurrency, cache=False) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return samples
+
+
+def approval_notice_delays(base_url: str, n: int, wait: Callable[[Any, str], None]) -> List[float]:
+    # Time from the approval commit to the agent seeing "approved".
+    from glove.client import GloveClient
+
+    delays: List[float] = []
+    with GloveClient(base_url, AGENT_KEY, cache=False) as client:
+        for _ in range(n):
+            request_id = client.decide(*REQUIRE_PIN).request_id
+            approved_at: List[float] = []
+
+            def approve() -> None:
+                time.sleep(random.uniform(0.1, 0.5))
+                _admin_post(base_url, "/api/v1/admin/approve-pin", {"request_id": request_id, "pin": PIN})
+                approved_at.append(time.perf_counter())
+
+            approver = threading.Thread(target=approve)
+            approver.start()
+            wait(client, request_id)
+            seen = time.perf_counter()
+            approver.join()
+            delays.append(max(0.0, seen - approved_at[0]))
+    return delays
+
+
+def wait_long_poll(client: Any, request_id: str) -> None:
+    client.wait_for_approval(request_id, timeout=30)
+
+
+def wait_fixed_poll(client: Any, request_id: str) -> None:
+    while client.status(request_id)["status"] == "pending":
+        time.sleep(POLL_INTERVAL)
+
+
+def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    os.environ.update(bench_env(workdir))
+    sys.path.insert(0, str(ROOT))
+    import uvicorn
+
+    from glove.app import app
+    from glove.client import GloveClient
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    # The console notifier prints every require_pin message; keep it out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        thread.start()
+        try:
+            deadline = time.monotonic() + 30
+            while not server.started:
+                if time.monotonic() > deadline or not thread.is_alive():
+                    raise SystemExit("uvicorn did not start")
+                time.sleep(0.01)
+            _admin_post(base_url, "/api/v1/admin/setup-pin", {"pin": PIN})
+
+            scenarios: Dict[str, List[float]] = {}
+            scenarios["urllib_per_call"] = time_calls(args.requests, lambda: urllib_decide(base_url))
+            with GloveClient(base_url, AGENT_KEY, cache=False) as client:
+                client.decide(*ALLOW)
+                scenarios["client_pooled"] = time_calls(args.requests, lambda: client.decide(*ALLOW))
+            with GloveClient(base_url, AGENT_KEY) as client:
+                client.decide(*ALLOW)
+                scenarios["client_cached"] = time_calls(args.requests, lambda: client.decide(*ALLOW))
+            scenarios["async_pooled"] = asyncio.run(time_async_calls(base_url, args.requests, args.concurrency))
+            scenarios["approval_long_poll"] = approval_notice_delays(base_url, args.approvals, wait_long_poll)
+            if args.approvals_fixed_poll:
+                scenarios["approval_fixed_poll"] = approval_notice_delays(
+                    base_url, args.approvals_fixed_poll, wait_fixed_poll
+                )
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+    return {name: summarize(samples) for name, samples in scenarios.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure glove.client latency against an in-process server.")
+    parser.add_argument("--requests", type=int, default=500, help="Decisions per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Coroutines for the async scenario.")
+    parser.add_argument("--approvals", type=int, default=10, help="Approvals timed with long-polling.")
+    parser.add_argument(
+        "--approvals-fixed-poll",
+        type=int,
+        default=5,
+        help=f"Approvals timed with {POLL_INTERVAL:g}s fixed polling, for comparison (0 to skip).",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write the JSON result here.")
+    parser.add_argument("--baseline", default=str(Path(__file__).resolve().parent / "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="glove-client-bench-"))
+    try:
+        scenarios = run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "benchmark": "client_latency",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": scenarios,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if args.update_baseline:
+        baselines["client_latency"] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        return 0
+    stored = baselines.get("client_latency", {}).get("scenarios", {})
+    regressions: List[str] = []
+    for name, current in scenarios.items():
+        base = stored.get(name)
+        # Fixed polling is a reference point, not something to hold steady.
+        if not base or name == "approval_fixed_poll":
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + args.threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,336 @@
+import argparse
+import dataclasses
+import json
+import math
+import platform
+import random
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+ROOT = Path(__file__).resolve().parent.parent
+PROVIDERS = ("webhook", "twilio", "smtp", "clawhub")
+OUTCOMES = ("ok", "failed", "circuit_open")
+DEFAULT_SCENARIOS = "webhook,twilio,smtp,clawhub,all"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Behaviour:
+    # Latency and failure injection shared by the stand-ins.
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.received = 0
+        self.failed = 0
+
+    def next(self) -> Tuple[float, bool]:
+        # -> (seconds to wait, fail this one)
+        with self._lock:
+            self.received += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.failed += 1
+            return delay, fail
+
+
+class HttpSink:
+    # Answers webhook POSTs with 200 and Twilio Messages.json POSTs with a
+    # 201 message resource, or 500 / Twilio's error shape when failing.
+    def __init__(self, behaviour: Behaviour):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                delay, fail = sink.behaviour.next()
+                time.sleep(delay)
+                twilio = self.path.endswith("/Messages.json")
+                if fail:
+                    status = 500
+                    body: Dict[str, Any] = {"code": 20500, "message": "Internal Server Error", "status": 500}
+                elif twilio:
+                    status = 201
+                    body = {"sid": "SM" + "0" * 32, "status": "queued", "error_code": None}
+                else:
+                    status = 200
+                    body = {"ok": True}
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.behaviour = behaviour
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SmtpSink:
+    # Enough of RFC 5321 for smtplib.SMTP.send_message without STARTTLS/AUTH.
+    # Failures are a 451 after DATA, which smtplib raises as SMTPDataError.
+    def __init__(self, behaviour: Behaviour):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write((line + "\r\n").encode("ascii"))
+
+            def handle(self) -> None:
+                self.reply("220 glove-bench ESMTP")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    verb = line.decode("latin-1").strip().split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self.reply("250-glove-bench")
+                        self.reply("250 8BITMIME")
+                    elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        while self.rfile.readline() not in (b".\r\n", b""):
+                            pass
+                        delay, fail = sink.behaviour.next()
+                        time.sleep(delay)
+                        self.reply("451 4.3.0 Temporary failure" if fail else "250 OK queued")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        self.behaviour = behaviour
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+EXTENSION_SCRIPT = """import json
+import random
+import sys
+import time
+
+envelope = json.loads(sys.stdin.read())
+time.sleep(float(sys.argv[1]) / 1000.0)
+sys.exit(1 if random.random() < float(sys.argv[2]) else 0)
+"""
+
+
+def make_extension(ext_dir: Path, latency_ms: float, error_rate: float) -> str:
+    ext_id = "bench_sink"
+    path = ext_dir / ext_id
+    path.mkdir(parents=True)
+    (path / "notify.py").write_text(EXTENSION_SCRIPT, encoding="utf-8")
+    manifest = {
+        "name": ext_id,
+        "notify": {"command": sys.executable, "args": ["notify.py", str(latency_ms), str(error_rate)]},
+    }
+    (path / "glove-extension.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return ext_id
+
+
+def drive(notifier: Any, rate: float, duration: float, concurrency: int) -> Dict[str, Any]:
+    # Open loop: sends are scheduled at a fixed rate whether or not earlier
+    # ones have finished, so a slow provider shows up as queueing delay.
+    service: List[float] = []
+    queued: List[float] = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def one(scheduled: float, seq: int) -> None:
+        started = time.perf_counter()
+        ok = True
+        try:
+            notifier.send("Glove PIN Required", f"Glove approval needed.\nRequest: bench-{seq}\n", {"request_id": f"bench-{seq}"})
+        except Exception:
+            ok = False
+        finished = time.perf_counter()
+        with lock:
+            service.append(finished - started)
+            queued.append(started - scheduled)
+            if not ok:
+                failures[0] += 1
+
+    interval = 1.0 / rate
+    total = max(1, int(rate * duration))
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seq in range(total):
+            scheduled = began + seq * interval
+            pause = scheduled - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+            pool.submit(one, scheduled, seq)
+    elapsed = time.perf_counter() - began
+    ms = sorted(s * 1000 for s in service)
+    wait = sorted(q * 1000 for q in queued)
+    return {
+        "sent": len(service),
+        "failed": failures[0],
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round(len(service) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "queue_p95_ms": round(percentile(wait, 95), 2),
+    }
+
+
+def provider_outcomes(histogram: Any, before: Dict[Tuple[str, str], int]) -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {}
+    for provider in PROVIDERS:
+        for outcome in OUTCOMES:
+            delta = histogram.count(provider, outcome) - before.get((provider, outcome), 0)
+            if delta:
+                out.setdefault(provider, {})[outcome] = delta
+    return out
+
+
+def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    sys.path.insert(0, str(ROOT))
+    from glove.config import load_settings
+    from glove.metrics import NOTIFIER_SECONDS
+    from glove.notifier import Notifier
+
+    http_sink = HttpSink(Behaviour(args.latency_ms, args.jitter_ms, args.error_rate, args.seed))
+    smtp_sink = SmtpSink(Behaviour(args.latency_ms, args.jitter_ms, args.error_rate, args.seed + 1))
+    ext_dir = workdir / "extensions"
+    ext_id = make_extension(ext_dir, args.latency_ms, args.error_rate)
+    base = dataclasses.replace(
+        load_settings(),
+        webhook_url=http_sink.url + "/webhook",
+        smtp_host="127.0.0.1",
+        smtp_port=smtp_sink.port,
+        smtp_use_tls=False,
+        smtp_username="",
+        smtp_from="glove@bench.local",
+        notify_to="approver@bench.local",
+        twilio_account_sid="ACbench",
+        twilio_auth_token="bench-token",
+        twilio_from="+15550000001",
+        twilio_to="+15550000002",
+        twilio_api_base=http_sink.url,
+        clawhub_extensions_dir=str(ext_dir),
+        clawhub_extensions=ext_id,
+    )
+    results: Dict[str, Any] = {}
+    try:
+        for scenario in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+            providers = ",".join(PROVIDERS) if scenario == "all" else scenario
+            if scenario != "all" and scenario not in PROVIDERS:
+                raise SystemExit(f"unknown scenario: {scenario}")
+            notifier = Notifier(dataclasses.replace(base, notifier_providers=providers))
+            # clawhub forks a process per message; give it its own, lower rate.
+            rate = args.clawhub_rate if scenario in ("clawhub", "all") else args.rate
+            before = {(p, o): NOTIFIER_SECONDS.count(p, o) for p in PROVIDERS for o in OUTCOMES}
+            result = drive(notifier, rate, args.duration, args.concurrency)
+            result["rate"] = rate
+            result["providers"] = provider_outcomes(NOTIFIER_SECONDS, before)
+            results[scenario] = result
+    finally:
+        http_sink.close()
+        smtp_sink.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive Glove's Notifier against local stand-in providers.")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help=f"Comma list (default: {DEFAULT_SCENARIOS}).")
+    parser.add_argument("--rate", type=float, default=50.0, help="Messages per second for HTTP/SMTP scenarios.")
+    parser.add_argument("--clawhub-rate", type=float, default=10.0, help="Messages per second when clawhub is involved.")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=8, help="Sender threads (request handlers in the app).")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Stand-in response latency.")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stand-in calls that fail.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write the JSON result here.")
+    parser.add_argument("--baseline", default=str(Path(__file__).resolve().parent / "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="glove-notifier-bench-"))
+    try:
+        scenarios = run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "benchmark": "notifier_load",
+        "duration_seconds": args.duration,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": scenarios,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if args.update_baseline:
+        baselines["notifier_load"] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        return 0
+    stored = baselines.get("notifier_load", {}).get("scenarios", {})
+    regressions: List[str] = []
+    for name, current in scenarios.items():
+        base = stored.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + args.threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if base["messages_per_second"] and current["messages_per_second"] < base["messages_per_second"] * (
+            1 - args.threshold
+        ):
+            regressions.append(
+                f"{name}: {current['messages_per_second']} msg/s < baseline {base['messages_per_second']} msg/s"
+            )
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
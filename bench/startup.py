@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUNDLE = ROOT / "dist" / "Glove-Windows" / "dist" / "glove" / "glove.exe"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env(workdir: Path, port: int) -> Dict[str, str]:
+    shutil.copy(ROOT / "policy.json", workdir / "policy.json")
+    return dict(
+        os.environ,
+        PYTHONPATH=str(ROOT),
+        GLOVE_HOST="127.0.0.1",
+        GLOVE_PORT=str(port),
+        GLOVE_WORKERS="1",
+        GLOVE_DB_PATH=str(workdir / "glove.db"),
+        GLOVE_POLICY_PATH=str(workdir / "policy.json"),
+        GLOVE_CLAWHUB_EXTENSIONS_DIR=str(workdir / "extensions"),
+        GLOVE_AGENT_KEY="bench-agent-key",
+        GLOVE_ADMIN_KEY="bench-admin-key",
+    )
+
+
+def time_import() -> float:
+    # Fresh interpreter per sample so nothing is already in sys.modules.
+    workdir = Path(tempfile.mkdtemp(prefix="glove-startup-"))
+    try:
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "import glove.app"],
+            cwd=str(workdir),
+            env=_env(workdir, 0),
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        return time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def time_until_healthy(command: List[str], timeout: float) -> float:
+    # Spawn to first 200 from /api/v1/health on a throw-away database.
+    workdir = Path(tempfile.mkdtemp(prefix="glove-startup-"))
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/health"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        command,
+        cwd=str(workdir),
+        env=_env(workdir, port),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise SystemExit(f"{command[0]} exited during start-up")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.005)
+        raise SystemExit(f"{command[0]} did not become healthy within {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    ms = sorted(round(s * 1000, 1) for s in samples)
+    return {
+        "runs": len(ms),
+        "min_ms": ms[0],
+        "median_ms": round(statistics.median(ms), 1),
+        "max_ms": ms[-1],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure Glove cold start time.")
+    parser.add_argument(
+        "--target",
+        choices=["import", "source", "bundle"],
+        action="append",
+        help="What to time (repeatable, default: import and source).",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--bundle", default=str(DEFAULT_BUNDLE), help="Path to the PyInstaller glove.exe.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=None, help="Write the JSON result here.")
+    parser.add_argument("--baseline", default=str(Path(__file__).resolve().parent / "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    targets = args.target or ["import", "source"]
+    results: Dict[str, Any] = {}
+    for target in targets:
+        if target == "import":
+            samples = [time_import() for _ in range(args.runs)]
+        elif target == "source":
+            command = [sys.executable, str(ROOT / "main.py")]
+            samples = [time_until_healthy(command, args.timeout) for _ in range(args.runs)]
+        else:
+            if not Path(args.bundle).exists():
+                raise SystemExit(f"bundle not found: {args.bundle} (build it with scripts/build_windows_bundle.ps1)")
+            samples = [time_until_healthy([args.bundle], args.timeout) for _ in range(args.runs)]
+        results[target] = summarize(samples)
+
+    result = {
+        "benchmark": "startup",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "targets": results,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    stored = baselines.get("startup", {}).get("targets", {})
+    if args.update_baseline:
+        baselines["startup"] = dict(result, targets={**stored, **results})
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        return 0
+
+    regressions: List[str] = []
+    for target, current in results.items():
+        base = stored.get(target)
+        if base and current["median_ms"] > base["median_ms"] * (1 + args.threshold):
+            regressions.append(f"{target}: median {current['median_ms']}ms > baseline {base['median_ms']}ms")
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
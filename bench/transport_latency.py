@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from client_latency import ALLOW, _free_port, bench_env, percentile, time_calls
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, Any]:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "count": len(ms),
+        "requests_per_second": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def sequential(n: int, client: Any) -> Dict[str, Any]:
+    client.decide(*ALLOW)
+    started = time.perf_counter()
+    samples = time_calls(n, lambda: client.decide(*ALLOW))
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def concurrent(n: int, concurrency: int, **client_args: Any) -> Dict[str, Any]:
+    from glove.client import AsyncGloveClient
+
+    samples: List[float] = []
+    remaining = [n]
+
+    async def worker(client: AsyncGloveClient) -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            await client.decide(*ALLOW)
+            samples.append(time.perf_counter() - started)
+
+    async with AsyncGloveClient(pool_size=concurrency, cache=False, **client_args) as client:
+        await client.decide(*ALLOW)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+
+def run(args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    env = bench_env(workdir)
+    socket_path = str(workdir / "agent.sock")
+    env["GLOVE_AGENT_SOCKET"] = socket_path
+    os.environ.update(env)
+    sys.path.insert(0, str(ROOT))
+    import uvicorn
+
+    from glove.app import app
+    from glove.client import GloveClient
+
+    agent_key = env["GLOVE_AGENT_KEY"]
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        thread.start()
+        try:
+            deadline = time.monotonic() + 30
+            while not (server.started and os.path.exists(socket_path)):
+                if time.monotonic() > deadline or not thread.is_alive():
+                    raise SystemExit("uvicorn or the agent socket did not start")
+                time.sleep(0.01)
+
+            scenarios: Dict[str, Any] = {}
+            with GloveClient(base_url, agent_key, cache=False) as client:
+                scenarios["tcp_sequential"] = sequential(args.requests, client)
+            with GloveClient(unix_socket=socket_path, cache=False) as client:
+                scenarios["unix_sequential"] = sequential(args.requests, client)
+            scenarios["tcp_concurrent"] = asyncio.run(
+                concurrent(args.requests, args.concurrency, base_url=base_url, agent_key=agent_key)
+            )
+            scenarios["unix_concurrent"] = asyncio.run(
+                concurrent(args.requests, args.concurrency, unix_socket=socket_path)
+            )
+        finally:
+            server.should_exit = True
+            thread.join(timeout=15)
+    return scenarios
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the allow fast-path over TCP loopback and the agent socket.")
+    parser.add_argument("--requests", type=int, default=2000, help="Decisions per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Coroutines for the concurrent scenarios.")
+    parser.add_argument("--output", default=None, help="Write the JSON result here.")
+    parser.add_argument("--baseline", default=str(Path(__file__).resolve().parent / "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if sys.platform == "win32":
+        raise SystemExit("the agent socket is not available on Windows")
+    # AF_UNIX paths are limited to ~100 bytes; keep the temp dir short.
+    workdir = Path(tempfile.mkdtemp(prefix="glove-tr-", dir="/tmp"))
+    try:
+        scenarios = run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "benchmark": "transport_latency",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": scenarios,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if args.update_baseline:
+        baselines["transport_latency"] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        return 0
+    stored = baselines.get("transport_latency", {}).get("scenarios", {})
+    regressions: List[str] = []
+    for name, current in scenarios.items():
+        base = stored.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + args.threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if base["requests_per_second"] and current["requests_per_second"] < base["requests_per_second"] * (
+            1 - args.threshold
+        ):
+            regressions.append(
+                f"{name}: {current['requests_per_second']} req/s < baseline {base['requests_per_second']} req/s"
+            )
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
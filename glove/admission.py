@@ -0,0 +1,211 @@
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from .agent_socket import TRANSPORT_SCOPE_KEY
+from .config import Settings
+from .metrics import REGISTRY
+from .policy import action_prefix
+
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "glove_admission_rejected_total",
+    "Requests rejected with 429 by admission control, by limit.",
+    ("limit",),
+)
+
+AGENT_PATH_PREFIX = "/api/v1/agent/"
+AGENT_REQUEST_PATH = "/api/v1/agent/request"
+PROTECTED_PATH_PREFIXES = ("/api/v1/admin/", "/api/v1/inbound/")
+# Long-lived streams wait on the event loop, not a worker thread; they do not
+# take an in-flight slot.
+STREAMING_PATHS = frozenset({"/api/v1/admin/feed/stream"})
+# Per-key bucket shared by every request whose agent key is missing or wrong,
+# so made-up keys cannot each get a bucket of their own.
+UNAUTHENTICATED_KEY = "unauthenticated"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+
+class RateLimiter:
+    # Token bucket per key, kept in least recently used order. Idle buckets
+    # refill to full, which is the same as not existing, so they are dropped
+    # once the table reaches max_keys; if it is still full, only the least
+    # recently used bucket is evicted.
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = float(max(1, burst))
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str) -> float:
+        # 0.0 when admitted, otherwise seconds until a token is available.
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = TokenBucket(self.burst, now)
+                self._buckets[key] = bucket
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+                self._buckets.move_to_end(key)
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return 0.0
+            return (1.0 - bucket.tokens) / self.rate
+
+    def _prune(self, now: float) -> None:
+        # Oldest first, so the refilled buckets are a prefix of the table.
+        full_after = self.burst / self.rate
+        buckets = self._buckets
+        while buckets and now - next(iter(buckets.values())).updated >= full_after:
+            buckets.popitem(last=False)
+        if len(buckets) >= self.max_keys:
+            buckets.popitem(last=False)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, limit: str, retry_after: float):
+        super().__init__(limit)
+        self.limit = limit
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class AdmissionController:
+    def __init__(self, settings: Settings):
+        self.per_key = RateLimiter(settings.agent_rate_per_key, settings.agent_burst_per_key)
+        self.per_ip = RateLimiter(settings.agent_rate_per_ip, settings.agent_burst_per_ip)
+        self.per_action = RateLimiter(settings.action_rate_per_prefix, settings.action_burst_per_prefix)
+        self.agent_max_in_flight = settings.agent_max_in_flight
+        self.admin_max_in_flight = settings.admin_max_in_flight
+        self.agent_in_flight = 0
+        self.admin_in_flight = 0
+        self._agent_key_ids: frozenset = frozenset()
+
+    @staticmethod
+    def _key_id(agent_key: str) -> str:
+        # A digest, so raw keys are never held in the bucket table.
+        return hashlib.sha256(agent_key.encode("utf-8")).hexdigest()[:16]
+
+    def set_agent_keys(self, agent_keys: Iterable[str]) -> None:
+        # Keys that get a bucket of their own; called once they are loaded.
+        self._agent_key_ids = frozenset(self._key_id(k) for k in agent_keys if k)
+
+    def check_agent(self, agent_key: str, client_ip: str, peer_authenticated: bool = False) -> None:
+        # Agent socket peers were authenticated by uid and are limited per uid
+        # (client_ip is "uid:<n>" for them).
+        if peer_authenticated:
+            key_id = client_ip
+        else:
+            key_id = self._key_id(agent_key)
+            if key_id not in self._agent_key_ids:
+                key_id = UNAUTHENTICATED_KEY
+        wait = self.per_key.acquire(key_id)
+        if wait:
+            ADMISSION_REJECTED.inc("agent_key")
+            raise AdmissionRejected("agent_key", wait)
+        wait = self.per_ip.acquire(client_ip)
+        if wait:
+            ADMISSION_REJECTED.inc("source_ip")
+            raise AdmissionRejected("source_ip", wait)
+
+    def check_action(self, action: str) -> None:
+        wait = self.per_action.acquire(action_prefix(action))
+        if wait:
+            ADMISSION_REJECTED.inc("action_prefix")
+            raise AdmissionRejected("action_prefix", wait)
+
+
+def _reject_body(exc: AdmissionRejected) -> bytes:
+    return json.dumps({"detail": f"rate_limited: {exc.limit}"}).encode("utf-8")
+
+
+class AdmissionMiddleware:
+    # Runs on the event loop before any worker thread is taken, so rejected
+    # requests cost a header scan and a dict lookup. In-flight counters need
+    # no lock: they are only touched from the loop.
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller
+        path = scope.get("path", "")
+        if path.startswith(AGENT_PATH_PREFIX):
+            await self._agent(controller, path, scope, receive, send)
+        elif path.startswith(PROTECTED_PATH_PREFIXES) and path not in STREAMING_PATHS:
+            await self._admin(controller, scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _agent(self, controller: AdmissionController, path: str, scope, receive, send) -> None:
+        agent_key = ""
+        for key, value in scope.get("headers", []):
+            if key == b"x-glove-agent-key":
+                agent_key = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        try:
+            controller.check_agent(agent_key, client[0] if client else "", scope.get(TRANSPORT_SCOPE_KEY) == "unix")
+        except AdmissionRejected as exc:
+            await self._reject(send, exc)
+            return
+        # Only decisions hold a worker thread; status long-polls wait on the loop.
+        if path != AGENT_REQUEST_PATH:
+            await self.app(scope, receive, send)
+            return
+        if controller.agent_max_in_flight and controller.agent_in_flight >= controller.agent_max_in_flight:
+            ADMISSION_REJECTED.inc("agent_in_flight")
+            await self._reject(send, AdmissionRejected("agent_in_flight", 1.0))
+            return
+        controller.agent_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.agent_in_flight -= 1
+
+    async def _admin(self, controller: AdmissionController, scope, receive, send) -> None:
+        if controller.admin_max_in_flight and controller.admin_in_flight >= controller.admin_max_in_flight:
+            ADMISSION_REJECTED.inc("admin_in_flight")
+            await self._reject(send, AdmissionRejected("admin_in_flight", 1.0))
+            return
+        controller.admin_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.admin_in_flight -= 1
+
+    @staticmethod
+    async def _reject(send, exc: AdmissionRejected) -> None:
+        body = _reject_body(exc)
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))]
+        headers.extend((k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in exc.headers.items())
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import struct
+from typing import Any, Callable, FrozenSet, Optional
+
+from .config import Settings
+from .metrics import REGISTRY
+
+
+AGENT_SOCKET_CONNECTIONS = REGISTRY.counter(
+    "glove_agent_socket_connections_total",
+    "Connections to the agent Unix socket, by whether the peer uid was allowed.",
+    ("outcome",),
+)
+
+# Set on every request that arrived over the agent socket; _require_agent
+# accepts it in place of the agent key. Nothing on the TCP listener sets it.
+TRANSPORT_SCOPE_KEY = "glove.transport"
+# The agent decision and status APIs, plus health for readiness checks.
+AGENT_SOCKET_PATHS = frozenset({"/api/v1/agent/request", "/api/v1/agent/request-status", "/api/v1/health"})
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "SO_PEERCRED")
+
+
+def peer_uid(sock: Any) -> Optional[int]:
+    # SO_PEERCRED is struct ucred {pid, uid, gid}, filled in by the kernel at
+    # connect() time, so the client cannot forge it.
+    try:
+        raw = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    except (OSError, AttributeError):
+        return None
+    return struct.unpack("3i", raw)[1]
+
+
+def allowed_uids(settings: Settings) -> FrozenSet[int]:
+    # Defaults to the uid Glove runs as.
+    raw = [x.strip() for x in settings.agent_socket_uids.split(",") if x.strip()]
+    return frozenset(int(x) for x in raw) if raw else frozenset({os.getuid()})
+
+
+def peer_credential_protocol(uids: FrozenSet[int]) -> type:
+    # uvicorn's HTTP protocol with a uid check when the connection is made.
+    # Rejected peers are disconnected before a byte is read. Accepted ones
+    # show up as client "uid:<n>", which admission control then limits per uid
+    # the way it limits TCP agents per IP.
+    from uvicorn.config import HTTP_PROTOCOLS
+    from uvicorn.importer import import_from_string
+
+    base = import_from_string(HTTP_PROTOCOLS["auto"])
+
+    class PeerCredentialProtocol(base):  # type: ignore[misc, valid-type]
+        def connection_made(self, transport: asyncio.Transport) -> None:  # type: ignore[override]
+            super().connection_made(transport)
+            uid = peer_uid(transport.get_extra_info("socket"))
+            if uid is None or uid not in uids:
+                AGENT_SOCKET_CONNECTIONS.inc("rejected")
+                transport.close()
+                return
+            AGENT_SOCKET_CONNECTIONS.inc("accepted")
+            self.client = (f"uid:{uid}", 0)
+
+    return PeerCredentialProtocol
+
+
+class AgentSocketApp:
+    # Outermost ASGI wrapper for the socket listener: marks requests as
+    # peer-authenticated and serves only AGENT_SOCKET_PATHS.
+    def __init__(self, app: Callable[..., Any]):
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] not in AGENT_SOCKET_PATHS:
+            body = json.dumps({"detail": "not_served_on_agent_socket"}).encode("utf-8")
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 404,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+        await self.app({**scope, TRANSPORT_SCOPE_KEY: "unix"}, receive, send)
+
+
+class AgentSocketServer:
+    # A second uvicorn server on GLOVE_AGENT_SOCKET, running in the main
+    # server's event loop and sharing its app and lifespan. With several
+    # worker processes, the one that takes the lock file serves the socket.
+    def __init__(self, app: Callable[..., Any], settings: Settings):
+        self.app = app
+        self.path = settings.agent_socket_path
+        self.mode = settings.agent_socket_mode
+        self.settings = settings
+        self._lock_file: Optional[Any] = None
+        self._server: Optional[Any] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        if not supported():
+            print(json.dumps({"event": "glove_agent_socket_unsupported", "path": self.path}))
+            return
+        if not self._take_lock():
+            return
+        import uvicorn
+
+        if os.path.exists(self.path):
+            if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+                raise RuntimeError(f"GLOVE_AGENT_SOCKET exists and is not a socket: {self.path}")
+            # Left over from a previous run; the lock says nobody serves it.
+            os.unlink(self.path)
+        config = uvicorn.Config(
+            AgentSocketApp(self.app),
+            uds=self.path,
+            http=peer_credential_protocol(allowed_uids(self.settings)),
+            lifespan="off",
+            proxy_headers=False,
+            access_log=False,
+            log_config=None,
+            # Status long-polls would otherwise hold shutdown for up to 30s.
+            timeout_graceful_shutdown=5,
+        )
+        config.load()
+        server = uvicorn.Server(config)
+        # startup()/main_loop() rather than serve(): serve() would take over
+        # the process signal handlers from the main server.
+        server.lifespan = config.lifespan_class(config)
+        await server.startup()
+        os.chmod(self.path, self.mode)
+        self._server = server
+        self._task = asyncio.create_task(server.main_loop())
+        print(json.dumps({"event": "glove_agent_socket", "path": self.path, "mode": oct(self.mode)}))
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            if self._task is not None:
+                await self._task
+            await self._server.shutdown()
+            self._server = None
+            self._task = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _take_lock(self) -> bool:
+        import fcntl
+
+        lock_file = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
@@ -0,0 +1,186 @@
+import json
+import math
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .codec import load_json
+from .policy import action_prefix
+
+if TYPE_CHECKING:
+    from .db import GloveDB
+
+
+# Upper bounds (seconds) of the approval latency histogram kept per hour.
+APPROVAL_LATENCY_BUCKETS = (
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    15.0,
+    20.0,
+    30.0,
+    45.0,
+    60.0,
+    90.0,
+    120.0,
+    180.0,
+    300.0,
+    600.0,
+    1800.0,
+    3600.0,
+)
+PIN_FAILURE_OUTCOMES = ("failed", "locked")
+GROUP_FIELDS = ("action_prefix", "policy_id", "outcome")
+
+
+def hour_of(ts: str) -> str:
+    # ts is an ISO timestamp in UTC as written by now_iso().
+    return ts[:13] + ":00:00+00:00"
+
+
+def latency_bucket(seconds: float) -> int:
+    for index, bound in enumerate(APPROVAL_LATENCY_BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(APPROVAL_LATENCY_BUCKETS)
+
+
+def aggregate_audit_rows(
+    rows: Iterable[Dict[str, Any]],
+) -> Tuple[Counter, Counter, Counter]:
+    # rows: audit_log columns plus request_created_at for approved PINs.
+    decisions: Counter = Counter()
+    pins: Counter = Counter()
+    latency: Counter = Counter()
+    for row in rows:
+        event_type = row["event_type"]
+        if event_type == "agent_request":
+            details = load_json(row["details_json"])
+            key = (hour_of(row["ts"]), action_prefix(row["action"] or ""), details.get("policy_id", ""), row["outcome"])
+            decisions[key] += 1
+        elif event_type == "agent_request_rollup":
+            details = load_json(row["details_json"])
+            hour = hour_of(details.get("bucket_start") or row["ts"])
+            decisions[(hour, row["action"] or "", details.get("policy_id", ""), row["outcome"])] += int(
+                details.get("count", 0)
+            )
+        elif event_type == "approve_pin":
+            hour = hour_of(row["ts"])
+            pins[(hour, row["outcome"])] += 1
+            if row["outcome"] != "approved":
+                continue
+            details = load_json(row["details_json"])
+            seconds = details.get("latency_ms")
+            if seconds is not None:
+                seconds = float(seconds) / 1000.0
+            elif row.get("request_created_at"):
+                started = datetime.fromisoformat(row["request_created_at"])
+                seconds = (datetime.fromisoformat(row["ts"]) - started).total_seconds()
+            if seconds is not None:
+                latency[(hour, latency_bucket(max(0.0, seconds)))] += 1
+    return decisions, pins, latency
+
+
+def histogram_percentile(counts: Sequence[int], pct: float) -> Optional[float]:
+    # Upper bound of the bucket holding the nearest-rank percentile; None
+    # when empty, inf when it falls past the last bound.
+    total = sum(counts)
+    if not total:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * total))
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return APPROVAL_LATENCY_BUCKETS[index] if index < len(APPROVAL_LATENCY_BUCKETS) else float("inf")
+    return float("inf")
+
+
+def summarize_stats(raw: Dict[str, List[Dict[str, Any]]], group_by: Sequence[str], interval: str) -> Dict[str, Any]:
+    grouped: Dict[Tuple[str, ...], int] = {}
+    for row in raw["decisions"]:
+        key = tuple(row[f] for f in group_by)
+        if interval == "hour":
+            key = (row["hour"],) + key
+        grouped[key] = grouped.get(key, 0) + row["count"]
+    fields = (["hour"] if interval == "hour" else []) + list(group_by)
+    decisions = [dict(zip(fields, key), count=count) for key, count in sorted(grouped.items())]
+
+    pin_counts: Counter = Counter()
+    for row in raw["pins"]:
+        pin_counts[row["outcome"]] += row["count"]
+    failures = sum(pin_counts[o] for o in PIN_FAILURE_OUTCOMES)
+    attempts = failures + pin_counts["approved"]
+
+    buckets = [0] * (len(APPROVAL_LATENCY_BUCKETS) + 1)
+    for row in raw["latency"]:
+        buckets[row["bucket"]] += row["count"]
+
+    def pct(value: float) -> Optional[float]:
+        result = histogram_percentile(buckets, value)
+        return None if result is None or result == float("inf") else result
+
+    return {
+        "decisions": decisions,
+        "pin": {
+            "outcomes": dict(sorted(pin_counts.items())),
+            "attempts": attempts,
+            "failure_rate": round(failures / attempts, 4) if attempts else None,
+        },
+        "approval_latency": {
+            "count": sum(buckets),
+            # Bucket upper bounds in seconds; null past the last bound (1h).
+            "p50_seconds": pct(50),
+            "p95_seconds": pct(95),
+            "p99_seconds": pct(99),
+            "buckets": [
+                {"le": bound, "count": buckets[i]} for i, bound in enumerate(APPROVAL_LATENCY_BUCKETS)
+            ]
+            + [{"le": "+Inf", "count": buckets[-1]}],
+        },
+    }
+
+
+class AuditStatsUpdater:
+    # Folds new audit rows into the hourly stats tables from a watermark.
+    # Every worker may run one; the watermark moves under the write lock.
+    def __init__(self, db: "GloveDB", interval: float = 10.0, batch_size: int = 5000):
+        self.db = db
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def catch_up(self, max_batches: int = 0) -> int:
+        done = 0
+        batches = 0
+        while True:
+            n = self.db.catch_up_audit_stats(self.batch_size)
+            done += n
+            batches += 1
+            if n < self.batch_size or (max_batches and batches >= max_batches):
+                return done
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glove-audit-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.catch_up()
+            except Exception as exc:
+                print(json.dumps({"event": "glove_audit_stats_failed", "error": str(exc)}))
+            if self._stop.wait(self.interval):
+                return
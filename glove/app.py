@@ -1,66 +1,96 @@
+import asyncio
+import hashlib
 import json
 import os
 import secrets
 import shutil
+import sqlite3
 import sys
 import tempfile
-import urllib.request
+import threading
+import time
 import urllib.parse
 import zipfile
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
-from typing import Any, Dict, Optional
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Optional
 
-from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+import anyio.to_thread
+from fastapi import APIRouter, Depends, FastAPI, File, Form, Header, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
 
-from .config import load_settings
+from .admission import AdmissionController, AdmissionMiddleware, AdmissionRejected
+from .agent_socket import TRANSPORT_SCOPE_KEY, AgentSocketServer
+from .analytics import GROUP_FIELDS, AuditStatsUpdater, summarize_stats
+from .config import Settings, load_settings
 from .db import GloveDB
+from .inbound import INBOUND_MESSAGES, InboundRejected, InboundWorker
 from .models import (
     AgentDecisionOut,
     AgentRequestIn,
     ApprovePinIn,
+    BulkApprovePinIn,
     ExtensionConfigIn,
     ExtensionInstallUrlIn,
     ExtensionTestIn,
     MessageReplyIn,
+    PolicyReplayIn,
     RiskKeywordsConfigIn,
     SetupPinIn,
 )
+from .metrics import DECISIONS, PIN_VERIFY_SECONDS, REGISTRY, THREADPOOL, MetricsMiddleware
 from .notifier import Notifier
-from .policy import PolicyDecision, PolicyEngine
+from .pending import in_worker_process
+from .policy import PolicyEngine, RiskKeywordMatcher, keyword_decision, normalize_keywords
+from .profiler import ProfilerBusy, render_collapsed, sample_stacks
+from .retention import RequestRetention
+from .rollup import AuditRollup
+from .search import AuditSearchBackfill, SearchQueryError, build_match_expression, decode_cursor, encode_cursor
 from .security import hash_pin, new_request_id, verify_pin
-from .signature import SignatureError, load_trust_store, verify_extension_zip_signature
+from .signature import SignatureError, load_trust_store, verify_extension_digest_signature
+from .sync import ChangeWatcher
+from .tracing import TracingMiddleware, configure as configure_tracing, stage
+
+
+# Set by create_app(); the DB, notifier, keys and policy below are opened by
+# the lifespan handler so importing this module stays cheap.
+settings: Settings
+db: GloveDB
+notifier: Notifier
+change_watcher: ChangeWatcher
+audit_rollup: AuditRollup
+audit_search_backfill: AuditSearchBackfill
+audit_stats: AuditStatsUpdater
+request_retention: RequestRetention
+inbound_worker: InboundWorker
+admission: AdmissionController
+AGENT_KEY = ""
+ADMIN_KEY = ""
+
+router = APIRouter()
 
-
-settings = load_settings()
-db = GloveDB(settings.db_path)
-policy_engine = PolicyEngine(settings.policy_path)
-notifier = Notifier(settings)
-
-app = FastAPI(title="Glove Safety Shell", version="0.1.0")
 if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
     static_dir = Path(sys._MEIPASS) / "glove" / "static"  # type: ignore[attr-defined]
 else:
     static_dir = Path(__file__).resolve().parent / "static"
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 
 def _read_or_create_key(name: str) -> str:
     existing = db.get_setting(name)
     if existing:
         return existing
-    generated = secrets.token_urlsafe(24)
-    db.set_setting(name, generated)
-    return generated
-
+    # Several workers can boot at once; whichever insert lands first is used by all.
+    return db.get_or_create_setting(name, secrets.token_urlsafe(24))
 
-AGENT_KEY = os.getenv("GLOVE_AGENT_KEY", "").strip() or _read_or_create_key("agent_key")
-ADMIN_KEY = os.getenv("GLOVE_ADMIN_KEY", "").strip() or _read_or_create_key("admin_key")
 
-
-def _require_agent(x_glove_agent_key: Optional[str] = Header(default=None)) -> None:
+def _require_agent(request: Request, x_glove_agent_key: Optional[str] = Header(default=None)) -> None:
+    # Agent socket peers were authenticated by uid when they connected.
+    if request.scope.get(TRANSPORT_SCOPE_KEY) == "unix":
+        return
     if not x_glove_agent_key or x_glove_agent_key != AGENT_KEY:
         raise HTTPException(status_code=401, detail="invalid_agent_key")
 
@@ -70,12 +100,97 @@ def _require_admin(x_glove_admin_key: Optional[str] = Header(default=None)) -> N
         raise HTTPException(status_code=401, detail="invalid_admin_key")
 
 
+def _require_metrics_reader(
+    x_glove_admin_key: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+) -> None:
+    # Scrapers usually can only send a bearer token, so GLOVE_METRICS_TOKEN is
+    # accepted here as well as the admin key.
+    if x_glove_admin_key and x_glove_admin_key == ADMIN_KEY:
+        return
+    if settings.metrics_token and authorization == f"Bearer {settings.metrics_token}":
+        return
+    raise HTTPException(status_code=401, detail="invalid_metrics_credentials")
+
+
+def _collect_pending_requests() -> Dict[tuple, float]:
+    return {(): float(db.count_pending_requests())}
+
+
+PENDING_REQUESTS = REGISTRY.gauge(
+    "glove_pending_requests",
+    "Approval requests currently pending.",
+    collect=_collect_pending_requests,
+)
+AUDIT_ROLLUP_PENDING = REGISTRY.gauge(
+    "glove_audit_rollup_pending",
+    "Allow decisions counted in memory and not yet written as rollup entries.",
+    collect=lambda: {(): float(audit_rollup.pending_count())},
+)
+NOTIFIER_CIRCUIT_OPEN = REGISTRY.gauge(
+    "glove_notifier_circuit_open",
+    "1 while a notifier provider or extension is being skipped after repeated failures.",
+    ("channel",),
+    collect=lambda: {(name,): float(h["state"] != "closed") for name, h in notifier.channel_health().items()},
+)
+
+
+# (config_version, settings rows). Refreshed when the change watcher sees
+# another process bump config_version, and dropped after local writes.
+_settings_cache: tuple[int, Dict[str, str]] = (-1, {})
+_policy_lock = threading.Lock()
+_policy_state: tuple[str, Optional[PolicyEngine]] = ("", None)
+
+
+def _setting(key: str) -> Optional[str]:
+    global _settings_cache
+    if not change_watcher.running:
+        return db.get_setting(key)
+    version = change_watcher.config_version
+    cached_version, values = _settings_cache
+    if cached_version != version:
+        values = db.get_all_settings()
+        _settings_cache = (version, values)
+    return values.get(key)
+
+
+def _store_settings(values: Dict[str, str]) -> None:
+    global _settings_cache
+    db.set_settings(values)
+    _settings_cache = (-1, {})
+
+
+def _get_policy_engine() -> PolicyEngine:
+    global _policy_state
+    version = _setting("policy_version") or ""
+    cached_version, engine = _policy_state
+    if engine is not None and version == cached_version:
+        return engine
+    with _policy_lock:
+        cached_version, engine = _policy_state
+        if engine is None:
+            engine = PolicyEngine(settings.policy_path)
+        elif version != cached_version:
+            try:
+                engine = PolicyEngine(settings.policy_path)
+            except (OSError, ValueError) as exc:
+                print(json.dumps({"event": "glove_policy_reload_failed", "policy_version": version, "error": str(exc)}))
+        _policy_state = (version, engine)
+    return engine
+
+
+def _decision_version() -> str:
+    # config_version moves on every policy reload and keyword or settings
+    # change, so clients drop cached decisions as soon as they see a new one.
+    return _setting("config_version") or "0"
+
+
 def _has_pin() -> bool:
-    return bool(db.get_setting("pin_salt") and db.get_setting("pin_hash"))
+    return bool(_setting("pin_salt") and _setting("pin_hash"))
 
 
 def _get_enabled_extensions() -> list[str]:
-    raw = db.get_setting("clawhub_enabled_extensions")
+    raw = _setting("clawhub_enabled_extensions")
     if raw:
         return [x.strip() for x in raw.split(",") if x.strip()]
     return [x.strip() for x in settings.clawhub_extensions.split(",") if x.strip()]
@@ -97,156 +212,510 @@ def _approval_ui_url_from_metadata(request_id: str, metadata: Dict[str, Any]) ->
     return f"{base}/?request_id={request_id}"
 
 
-def _normalize_keywords(keywords: list[str]) -> list[str]:
-    out: list[str] = []
-    seen = set()
-    for raw in keywords:
-        kw = str(raw).strip().lower()
-        if not kw or len(kw) > 64:
-            continue
-        if kw in seen:
-            continue
-        seen.add(kw)
-        out.append(kw)
-    return out
-
-
 def _get_risk_keywords() -> list[str]:
-    raw = db.get_setting("risk_keywords")
+    raw = _setting("risk_keywords")
     if not raw:
         return []
-    return _normalize_keywords([x for x in raw.split(",") if x.strip()])
+    return normalize_keywords([x for x in raw.split(",") if x.strip()])
+
+
+_keyword_matcher_cache: tuple[str, RiskKeywordMatcher] = ("", RiskKeywordMatcher([]))
+
+
+def _get_risk_keyword_matcher() -> RiskKeywordMatcher:
+    global _keyword_matcher_cache
+    raw = _setting("risk_keywords") or ""
+    cached_raw, matcher = _keyword_matcher_cache
+    if raw != cached_raw:
+        matcher = RiskKeywordMatcher(normalize_keywords([x for x in raw.split(",") if x.strip()]))
+        _keyword_matcher_cache = (raw, matcher)
+    return matcher
 
 
-def _install_extension_from_zip_bytes(
-    zip_bytes: bytes,
+MAX_EXTENSION_ZIP_BYTES = 25 * 1024 * 1024
+MAX_EXTENSION_UNPACKED_BYTES = 100 * 1024 * 1024
+_STREAM_CHUNK = 64 * 1024
+_EXTENSION_ID_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_.")
+
+
+def _copy_hashing(read: Callable[[int], bytes], out: Optional[BinaryIO]) -> str:
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = read(_STREAM_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_EXTENSION_ZIP_BYTES:
+            raise HTTPException(status_code=400, detail="zip_too_large")
+        digest.update(chunk)
+        if out is not None:
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def _verify_extension_signature(digest_hex: str, key_id: Optional[str], signature_b64: Optional[str]) -> None:
+    if not settings.require_extension_signatures:
+        return
+    if not key_id or not signature_b64:
+        raise HTTPException(status_code=400, detail="signature_required")
+    try:
+        trust_store = load_trust_store(settings.clawhub_trust_store_path)
+        verify_extension_digest_signature(digest_hex, trust_store, key_id, signature_b64)
+    except SignatureError as exc:
+        raise HTTPException(status_code=400, detail=f"signature_invalid: {exc}")
+
+
+def _safe_relative_path(name: str) -> Optional[PurePosixPath]:
+    rel = PurePosixPath(name.replace("\\", "/"))
+    if rel.is_absolute() or any(part in ("..", "") or ":" in part for part in rel.parts):
+        return None
+    return rel
+
+
+def _install_extension_from_zip_file(
+    zip_file: BinaryIO,
+    digest_hex: str,
     replace_existing: bool,
     key_id: Optional[str],
     signature_b64: Optional[str],
 ) -> str:
-    if len(zip_bytes) > 25 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="zip_too_large")
-
-    if settings.require_extension_signatures:
-        if not key_id or not signature_b64:
-            raise HTTPException(status_code=400, detail="signature_required")
-        try:
-            trust_store = load_trust_store(settings.clawhub_trust_store_path)
-            verify_extension_zip_signature(zip_bytes, trust_store, key_id, signature_b64)
-        except SignatureError as exc:
-            raise HTTPException(status_code=400, detail=f"signature_invalid: {exc}")
+    _verify_extension_signature(digest_hex, key_id, signature_b64)
 
     ext_root = Path(settings.clawhub_extensions_dir).resolve()
     ext_root.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory(prefix="glove-ext-") as tmp:
-        tmp_path = Path(tmp).resolve()
-        zip_path = tmp_path / "extension.zip"
-        zip_path.write_bytes(zip_bytes)
-
-        with zipfile.ZipFile(str(zip_path), "r") as zf:
-            for member in zf.infolist():
-                if member.is_dir():
-                    continue
-                member_path = (tmp_path / member.filename).resolve()
-                if not str(member_path).startswith(str(tmp_path)):
-                    raise HTTPException(status_code=400, detail="invalid_zip_paths")
-            zf.extractall(path=str(tmp_path))
-
-        manifests = list(tmp_path.rglob("glove-extension.json"))
+    try:
+        zf = zipfile.ZipFile(zip_file, "r")
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="invalid_zip")
+    with zf:
+        infos = zf.infolist()
+        manifests = [
+            i for i in infos if not i.is_dir() and PurePosixPath(i.filename).name == "glove-extension.json"
+        ]
         if len(manifests) != 1:
             raise HTTPException(status_code=400, detail="zip_must_contain_one_extension_manifest")
 
-        manifest_path = manifests[0]
-        extension_dir = manifest_path.parent
-        extension_id = extension_dir.name.strip()
+        extension_root = PurePosixPath(manifests[0].filename).parent
+        extension_id = extension_root.name.strip()
         if not extension_id:
             raise HTTPException(status_code=400, detail="invalid_extension_id")
-        if any(c for c in extension_id if c not in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_."):
+        if any(c not in _EXTENSION_ID_CHARS for c in extension_id) or extension_id.startswith("."):
             raise HTTPException(status_code=400, detail="invalid_extension_id_chars")
 
-        target_dir = (ext_root / extension_id).resolve()
-        if target_dir.exists():
-            if not replace_existing:
-                raise HTTPException(status_code=409, detail="extension_exists")
-            shutil.rmtree(target_dir)
-
-        shutil.copytree(str(extension_dir), str(target_dir))
-        return extension_id
+        target_dir = ext_root / extension_id
+        if target_dir.exists() and not replace_existing:
+            raise HTTPException(status_code=409, detail="extension_exists")
+
+        # Only the extension's own subtree is unpacked.
+        prefix = f"{extension_root.as_posix()}/"
+        members = []
+        unpacked = 0
+        for info in infos:
+            if not info.filename.startswith(prefix) or info.filename == prefix:
+                continue
+            rel = _safe_relative_path(info.filename[len(prefix) :].rstrip("/"))
+            if rel is None:
+                raise HTTPException(status_code=400, detail="invalid_zip_paths")
+            unpacked += info.file_size
+            if unpacked > MAX_EXTENSION_UNPACKED_BYTES:
+                raise HTTPException(status_code=400, detail="zip_unpacked_too_large")
+            members.append((info, rel))
+
+        # Staged next to the target so the final swap is a same-volume rename.
+        staging = Path(tempfile.mkdtemp(prefix=f".{extension_id}.staging-", dir=str(ext_root)))
+        try:
+            for info, rel in members:
+                dest = staging.joinpath(*rel.parts)
+                if info.is_dir():
+                    dest.mkdir(parents=True, exist_ok=True)
+                    continue
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(info) as src, dest.open("wb") as dst:
+                    shutil.copyfileobj(src, dst, _STREAM_CHUNK)
+            _swap_extension_dir(staging, target_dir, replace_existing)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return extension_id
+
+
+def _swap_extension_dir(staging: Path, target_dir: Path, replace_existing: bool) -> None:
+    if not target_dir.exists():
+        os.replace(staging, target_dir)
+        return
+    if not replace_existing:
+        raise HTTPException(status_code=409, detail="extension_exists")
+    backup = target_dir.with_name(f".{target_dir.name}.old-{secrets.token_hex(4)}")
+    os.replace(target_dir, backup)
+    try:
+        os.replace(staging, target_dir)
+    except BaseException:
+        os.replace(backup, target_dir)
+        raise
+    shutil.rmtree(backup, ignore_errors=True)
 
 
-@app.get("/")
+@router.get("/")
 def web_ui():
     return FileResponse(str(static_dir / "index.html"))
 
 
-@app.get("/api/v1/admin/bootstrap", dependencies=[Depends(_require_admin)])
+@router.get("/api/v1/admin/bootstrap", dependencies=[Depends(_require_admin)])
 def admin_bootstrap() -> Dict[str, Any]:
     return {"pin_configured": _has_pin()}
 
 
-@app.post("/api/v1/admin/setup-pin", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/setup-pin", dependencies=[Depends(_require_admin)])
 def setup_pin(payload: SetupPinIn) -> Dict[str, Any]:
     salt_b64, digest_b64, iterations = hash_pin(payload.pin)
-    db.set_setting("pin_salt", salt_b64)
-    db.set_setting("pin_hash", digest_b64)
-    db.set_setting("pin_iterations", str(iterations))
+    _store_settings({"pin_salt": salt_b64, "pin_hash": digest_b64, "pin_iterations": str(iterations)})
     db.append_audit("pin_setup", "success", {"source": "admin"})
     return {"status": "ok"}
 
 
-@app.get("/api/v1/admin/requests/pending", dependencies=[Depends(_require_admin)])
-def list_pending() -> Dict[str, Any]:
-    return {"items": db.list_pending_requests()}
+@router.get("/api/v1/admin/requests/pending", dependencies=[Depends(_require_admin)])
+def list_pending(include_metadata: bool = False) -> Dict[str, Any]:
+    return {"items": db.list_pending_requests(include_metadata)}
+
+
+@router.get("/api/v1/admin/audit/recent", dependencies=[Depends(_require_admin)])
+def recent_audit(include_details: bool = False) -> Dict[str, Any]:
+    return {"items": db.recent_audit(100, include_details)}
 
 
-@app.get("/api/v1/admin/audit/recent", dependencies=[Depends(_require_admin)])
-def recent_audit() -> Dict[str, Any]:
-    return {"items": db.recent_audit(100)}
+@router.get("/api/v1/admin/audit/entries/{entry_id}", dependencies=[Depends(_require_admin)])
+def audit_entry(entry_id: int) -> Dict[str, Any]:
+    entry = db.audit_entry(entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="audit_entry_not_found")
+    return entry
 
 
-@app.get("/api/v1/admin/risk-keywords", dependencies=[Depends(_require_admin)])
+def _utc_iso(value: Optional[str], name: str) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"invalid_{name}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+@router.get("/api/v1/admin/audit/search", dependencies=[Depends(_require_admin)])
+def search_audit(
+    q: str,
+    syntax: str = "simple",
+    event_type: Optional[str] = None,
+    outcome: Optional[str] = None,
+    action_prefix: Optional[str] = None,
+    request_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    order: str = "recent",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    if not db.search_enabled:
+        raise HTTPException(status_code=503, detail="audit_search_unavailable")
+    if order not in {"recent", "rank"}:
+        raise HTTPException(status_code=400, detail="invalid_order")
+    limit = max(1, min(limit, 200))
+    try:
+        match = build_match_expression(q, syntax)
+        after = decode_cursor(order, cursor) if cursor else None
+    except SearchQueryError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid_query: {exc}")
+    try:
+        items = db.search_audit(
+            match,
+            event_type=event_type,
+            outcome=outcome,
+            action_prefix=action_prefix,
+            request_id=request_id,
+            since_ts=_utc_iso(since, "since"),
+            until_ts=_utc_iso(until, "until"),
+            order=order,
+            after=after,
+            limit=limit,
+        )
+    except sqlite3.OperationalError as exc:
+        # FTS5 reports query syntax errors at execution time.
+        raise HTTPException(status_code=400, detail=f"invalid_query: {exc}")
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_cursor(order, last["score"], last["id"])
+    for item in items:
+        if order != "rank":
+            item.pop("score", None)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "index_complete": audit_search_backfill.complete,
+    }
+
+
+MAX_STATS_RANGE_HOURS = 24 * 366
+
+
+@router.get("/api/v1/admin/stats", dependencies=[Depends(_require_admin)])
+def admin_stats(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    group_by: str = ",".join(GROUP_FIELDS),
+    interval: str = "hour",
+) -> Dict[str, Any]:
+    # Answered from the hourly stats tables; hours are [since, until) and
+    # default to the last 24 hours.
+    fields = [f.strip() for f in group_by.split(",") if f.strip()]
+    if any(f not in GROUP_FIELDS for f in fields):
+        raise HTTPException(status_code=400, detail="invalid_group_by")
+    if interval not in {"hour", "total"}:
+        raise HTTPException(status_code=400, detail="invalid_interval")
+    now = datetime.now(timezone.utc)
+    end = datetime.fromisoformat(_utc_iso(until, "until")) if until else now + timedelta(hours=1)
+    start = datetime.fromisoformat(_utc_iso(since, "since")) if since else end - timedelta(hours=25)
+    if start >= end or end - start > timedelta(hours=MAX_STATS_RANGE_HOURS):
+        raise HTTPException(status_code=400, detail="invalid_range")
+    since_hour = start.replace(minute=0, second=0, microsecond=0).isoformat()
+    until_hour = end.replace(minute=0, second=0, microsecond=0).isoformat()
+    # Fold in whatever the background updater has not reached yet (bounded).
+    audit_stats.catch_up(max_batches=4)
+    raw = db.audit_stats(since_hour, until_hour)
+    return {
+        "since": since_hour,
+        "until": until_hour,
+        "interval": interval,
+        "group_by": fields,
+        "watermark": raw["watermark"],
+        **summarize_stats(raw, fields, interval),
+    }
+
+
+FEED_MAX_ENTRIES = 500
+FEED_KEEPALIVE_SECONDS = 15.0
+# Streams end after this long; clients reconnect with Last-Event-ID, which
+# also lets a graceful shutdown finish without waiting on idle admin tabs.
+FEED_STREAM_MAX_SECONDS = 300.0
+
+
+def _feed(since: Optional[int]) -> Dict[str, Any]:
+    # Audit ids are the cursor: every new request and status change writes an
+    # audit entry, so the requests touched since the cursor are exactly the
+    # request_ids of the new entries.
+    if since is not None and since >= 0:
+        entries = db.audit_since(since, FEED_MAX_ENTRIES + 1)
+        if len(entries) <= FEED_MAX_ENTRIES:
+            request_ids = sorted({e["request_id"] for e in entries if e["request_id"]})
+            return {
+                "cursor": entries[-1]["id"] if entries else since,
+                "reset": False,
+                "audit": entries,
+                "requests": db.request_summaries(request_ids),
+            }
+    # First call, or too far behind: send a snapshot. The cursor is read first,
+    # so anything committed meanwhile is sent again rather than skipped.
+    cursor = db.audit_cursor()
+    return {
+        "cursor": cursor,
+        "reset": True,
+        "audit": list(reversed(db.recent_audit(100))),
+        "requests": db.pending_request_summaries(),
+    }
+
+
+@router.get("/api/v1/admin/feed", dependencies=[Depends(_require_admin)])
+def admin_feed(request: Request, response: Response, since: Optional[int] = None) -> Any:
+    base = "snapshot" if since is None else str(since)
+    etag = f'W/"feed-{base}-{db.audit_cursor()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return _feed(since)
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\nid: {payload['cursor']}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+@router.get("/api/v1/admin/feed/stream", dependencies=[Depends(_require_admin)])
+async def admin_feed_stream(request: Request, since: Optional[int] = None) -> StreamingResponse:
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def events() -> AsyncIterator[str]:
+        generation = change_watcher.generation
+        payload = await run_in_threadpool(_feed, since)
+        cursor = payload["cursor"]
+        yield _sse("feed", payload)
+        deadline = time.monotonic() + FEED_STREAM_MAX_SECONDS
+        while time.monotonic() < deadline and not await request.is_disconnected():
+            current = await change_watcher.wait_async(generation, FEED_KEEPALIVE_SECONDS)
+            if current == generation:
+                yield ": keepalive\n\n"
+                continue
+            generation = current
+            # Settings writes and other commits wake us too; only build a
+            # delta when an audit entry was actually appended.
+            if await run_in_threadpool(db.audit_cursor) == cursor:
+                continue
+            payload = await run_in_threadpool(_feed, cursor)
+            cursor = payload["cursor"]
+            yield _sse("feed", payload)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/v1/admin/risk-keywords", dependencies=[Depends(_require_admin)])
 def get_risk_keywords() -> Dict[str, Any]:
     return {"keywords": _get_risk_keywords()}
 
 
-@app.post("/api/v1/admin/risk-keywords/config", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/risk-keywords/config", dependencies=[Depends(_require_admin)])
 def set_risk_keywords(payload: RiskKeywordsConfigIn) -> Dict[str, Any]:
-    keywords = _normalize_keywords(payload.keywords)
-    db.set_setting("risk_keywords", ",".join(keywords))
+    keywords = normalize_keywords(payload.keywords)
+    _store_settings({"risk_keywords": ",".join(keywords)})
     db.append_audit("risk_keywords_config", "success", {"count": len(keywords), "keywords": keywords})
     return {"status": "ok", "keywords": keywords}
 
 
-@app.get("/api/v1/admin/extensions", dependencies=[Depends(_require_admin)])
+# A running replay reports progress at least this often; one that has not
+# for REPLAY_STALE_SECONDS is taken to have died with its process.
+REPLAY_PROGRESS_SECONDS = 2.0
+REPLAY_STALE_SECONDS = 300
+
+
+@router.post("/api/v1/admin/policy/replay", status_code=202, dependencies=[Depends(_require_admin)])
+def replay_policy(payload: PolicyReplayIn) -> Dict[str, Any]:
+    # Starts the replay on a background thread and returns the job; poll
+    # GET /api/v1/admin/policy/replay/{job_id} for progress and the result.
+    try:
+        PolicyEngine.from_policy(payload.policy)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid_policy: {exc}")
+    keywords = payload.keywords if payload.keywords is not None else _get_risk_keywords()
+    stale_before = (datetime.now(timezone.utc) - timedelta(seconds=REPLAY_STALE_SECONDS)).isoformat()
+    job = db.create_replay_job(secrets.token_hex(8), payload.model_dump(exclude={"policy", "keywords"}), stale_before)
+    if job is None:
+        raise HTTPException(status_code=409, detail="replay_running")
+    threading.Thread(
+        target=_run_replay_job,
+        args=(job["id"], payload, keywords),
+        name="glove-policy-replay",
+        daemon=True,
+    ).start()
+    return job
+
+
+def _run_replay_job(job_id: str, payload: PolicyReplayIn, keywords: list[str]) -> None:
+    # Pulls in multiprocessing/concurrent.futures; only needed when a replay is requested.
+    from .replay import replay_audit_log
+
+    next_report = [0.0]
+
+    def progress(scanned: int, elapsed: float) -> None:
+        if elapsed >= next_report[0]:
+            next_report[0] = elapsed + REPLAY_PROGRESS_SECONDS
+            db.update_replay_job(job_id, scanned)
+
+    try:
+        result = replay_audit_log(
+            settings.db_path,
+            payload.policy,
+            keywords,
+            workers=payload.workers,
+            chunk_size=payload.chunk_size,
+            sample_size=payload.sample_size,
+            since_id=payload.since_id,
+            limit=payload.limit,
+            progress=progress,
+        )
+    except Exception as exc:
+        print(json.dumps({"event": "glove_policy_replay_failed", "job_id": job_id, "error": str(exc)}))
+        db.finish_replay_job(job_id, "failed", None, str(exc))
+        return
+    db.finish_replay_job(job_id, "done", result)
+
+
+@router.get("/api/v1/admin/policy/replay/{job_id}", dependencies=[Depends(_require_admin)])
+def replay_policy_status(job_id: str) -> Dict[str, Any]:
+    job = db.get_replay_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="replay_job_not_found")
+    return job
+
+
+@router.post("/api/v1/admin/policy/reload", dependencies=[Depends(_require_admin)])
+def reload_policy() -> Dict[str, Any]:
+    global _policy_state
+    try:
+        engine = PolicyEngine(settings.policy_path)
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"invalid_policy: {exc}")
+    # Other workers pick the new version up through the change watcher.
+    version = secrets.token_hex(8)
+    with _policy_lock:
+        _store_settings({"policy_version": version})
+        _policy_state = (version, engine)
+    db.append_audit("policy_reload", "success", {"policy_version": version})
+    return {"status": "ok", "policy_version": version}
+
+
+@router.post("/api/v1/admin/retention/run", dependencies=[Depends(_require_admin)])
+def run_retention() -> Dict[str, Any]:
+    # One archive + incremental vacuum pass now, instead of waiting for the
+    # background interval. Returns row counts and file size before and after.
+    if not request_retention.enabled:
+        raise HTTPException(status_code=409, detail="retention_disabled")
+    return request_retention.run_once()
+
+
+@router.get("/api/v1/admin/extensions", dependencies=[Depends(_require_admin)])
 def list_extensions() -> Dict[str, Any]:
     installed = notifier.discover_clawhub_extensions()
     enabled = _get_enabled_extensions()
+    channels = notifier.channel_health()
     return {
         "extensions_dir": settings.clawhub_extensions_dir,
         "installed": installed,
         "enabled": [x for x in enabled if x in installed],
+        "health": {x: channels[f"clawhub:{x}"] for x in installed if f"clawhub:{x}" in channels},
     }
 
 
-@app.post("/api/v1/admin/extensions/config", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/extensions/config", dependencies=[Depends(_require_admin)])
 def set_extensions(payload: ExtensionConfigIn) -> Dict[str, Any]:
     installed = set(notifier.discover_clawhub_extensions())
     enabled = [x for x in payload.enabled_ids if x in installed]
-    db.set_setting("clawhub_enabled_extensions", ",".join(enabled))
+    _store_settings({"clawhub_enabled_extensions": ",".join(enabled)})
     db.append_audit("extensions_config", "success", {"enabled": enabled})
     return {"status": "ok", "enabled": enabled}
 
 
-@app.post("/api/v1/admin/extensions/test", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/extensions/test", dependencies=[Depends(_require_admin)])
 def test_extension(payload: ExtensionTestIn) -> Dict[str, Any]:
     installed = notifier.discover_clawhub_extensions()
     if payload.extension_id not in installed:
         raise HTTPException(status_code=404, detail="extension_not_found")
     try:
+        # Runs even while the extension's circuit is open; a pass closes it.
         notifier.test_clawhub_extension(payload.extension_id)
         db.append_audit("extensions_test", "success", {"extension_id": payload.extension_id})
-        return {"status": "ok", "extension_id": payload.extension_id}
+        return {
+            "status": "ok",
+            "extension_id": payload.extension_id,
+            "health": notifier.channel_health().get(f"clawhub:{payload.extension_id}"),
+        }
     except Exception as exc:
         db.append_audit(
             "extensions_test",
@@ -256,20 +725,30 @@ def test_extension(payload: ExtensionTestIn) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"extension_test_failed: {exc}")
 
 
-@app.post("/api/v1/admin/extensions/install-url", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/extensions/install-url", dependencies=[Depends(_require_admin)])
 def install_extension_url(payload: ExtensionInstallUrlIn) -> Dict[str, Any]:
-    try:
-        with urllib.request.urlopen(payload.url, timeout=20) as resp:
-            zip_bytes = resp.read()
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"download_failed: {exc}")
+    import urllib.request
 
-    extension_id = _install_extension_from_zip_bytes(
-        zip_bytes,
-        payload.replace_existing,
-        payload.key_id,
-        payload.signature_b64,
-    )
+    with tempfile.TemporaryFile(prefix="glove-ext-") as spool:
+        try:
+            with urllib.request.urlopen(payload.url, timeout=20) as resp:
+                length = resp.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > MAX_EXTENSION_ZIP_BYTES:
+                    raise HTTPException(status_code=400, detail="zip_too_large")
+                digest_hex = _copy_hashing(resp.read, spool)
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"download_failed: {exc}")
+
+        spool.seek(0)
+        extension_id = _install_extension_from_zip_file(
+            spool,
+            digest_hex,
+            payload.replace_existing,
+            payload.key_id,
+            payload.signature_b64,
+        )
     db.append_audit(
         "extensions_install",
         "success",
@@ -278,7 +757,7 @@ def install_extension_url(payload: ExtensionInstallUrlIn) -> Dict[str, Any]:
     return {"status": "ok", "extension_id": extension_id}
 
 
-@app.post("/api/v1/admin/extensions/install-upload", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/extensions/install-upload", dependencies=[Depends(_require_admin)])
 async def install_extension_upload(
     file: UploadFile = File(...),
     key_id: str = Form(...),
@@ -287,166 +766,355 @@ async def install_extension_upload(
 ) -> Dict[str, Any]:
     if not file.filename.lower().endswith(".zip"):
         raise HTTPException(status_code=400, detail="file_must_be_zip")
-    zip_bytes = await file.read()
-    extension_id = _install_extension_from_zip_bytes(zip_bytes, replace_existing, key_id, signature_b64)
+    # The multipart parser has already spooled the upload to a temp file; hash
+    # and unpack it from there on a worker thread so the event loop never blocks.
+    return await run_in_threadpool(
+        _install_uploaded_extension,
+        file.file,
+        file.filename,
+        replace_existing,
+        key_id,
+        signature_b64,
+    )
+
+
+def _install_uploaded_extension(
+    upload: BinaryIO,
+    filename: str,
+    replace_existing: bool,
+    key_id: str,
+    signature_b64: str,
+) -> Dict[str, Any]:
+    upload.seek(0)
+    digest_hex = _copy_hashing(upload.read, None)
+    upload.seek(0)
+    extension_id = _install_extension_from_zip_file(upload, digest_hex, replace_existing, key_id, signature_b64)
     db.append_audit(
         "extensions_install",
         "success",
-        {"source": "upload", "filename": file.filename, "extension_id": extension_id, "key_id": key_id},
+        {"source": "upload", "filename": filename, "extension_id": extension_id, "key_id": key_id},
     )
     return {"status": "ok", "extension_id": extension_id}
 
 
-@app.post("/api/v1/admin/approve-pin", dependencies=[Depends(_require_admin)])
+# Matches the BulkApprovePinIn request_ids limit.
+BULK_APPROVE_MAX = 200
+
+
+def _verify_approval_pin(pin: str) -> bool:
+    salt_b64 = _setting("pin_salt")
+    digest_b64 = _setting("pin_hash")
+    iterations = int(_setting("pin_iterations") or "210000")
+    if not (salt_b64 and digest_b64):
+        raise HTTPException(status_code=409, detail="pin_not_configured")
+
+    started = time.perf_counter()
+    with stage("pin_verify"):
+        pin_ok = verify_pin(pin, salt_b64, digest_b64, iterations)
+    PIN_VERIFY_SECONDS.observe(time.perf_counter() - started, "ok" if pin_ok else "invalid")
+    return pin_ok
+
+
+@router.post("/api/v1/admin/approve-pin", dependencies=[Depends(_require_admin)])
 def approve_pin(payload: ApprovePinIn) -> Dict[str, Any]:
-    request = db.get_request(payload.request_id)
+    with stage("get_request"):
+        request = db.get_request_status(payload.request_id)
     if not request:
         raise HTTPException(status_code=404, detail="request_not_found")
     if request["status"] != "pending":
         raise HTTPException(status_code=409, detail=f"request_{request['status']}")
     if datetime.fromisoformat(request["expires_at"]) < datetime.now(timezone.utc):
-        db.set_request_status(payload.request_id, "expired")
-        db.append_audit("approve_pin", "expired", {"reason": "request_expired"}, payload.request_id)
+        with db.unit_of_work() as uow:
+            if uow.set_request_status(payload.request_id, "expired"):
+                uow.append_audit("approve_pin", "expired", {"reason": "request_expired"}, payload.request_id)
         raise HTTPException(status_code=409, detail="request_expired")
 
-    salt_b64 = db.get_setting("pin_salt")
-    digest_b64 = db.get_setting("pin_hash")
-    iterations = int(db.get_setting("pin_iterations") or "210000")
-    if not (salt_b64 and digest_b64):
-        raise HTTPException(status_code=409, detail="pin_not_configured")
+    if not _verify_approval_pin(payload.pin):
+        resolved = ""
+        with db.unit_of_work() as uow:
+            # Re-read under the write lock, as for approvals: a request
+            # resolved while the PIN was checked is not charged or denied.
+            current = uow.get_request_status(payload.request_id)
+            if not current or current["status"] != "pending":
+                resolved = current["status"] if current else "archived"
+                uow.append_audit(
+                    "approve_pin",
+                    "failed",
+                    {"reason": f"request_{resolved}"},
+                    payload.request_id,
+                    request["action"],
+                    request["target"],
+                )
+            else:
+                attempts = uow.increment_attempts(payload.request_id)
+                outcome = "failed"
+                if attempts >= settings.max_pin_attempts:
+                    uow.set_request_status(payload.request_id, "denied")
+                    outcome = "locked"
+                uow.append_audit(
+                    "approve_pin",
+                    outcome,
+                    {"attempts": attempts, "max_attempts": settings.max_pin_attempts},
+                    payload.request_id,
+                    request["action"],
+                    request["target"],
+                )
+        if resolved:
+            raise HTTPException(status_code=409, detail=f"request_{resolved}")
+        raise HTTPException(status_code=401, detail="invalid_pin")
 
-    if not verify_pin(payload.pin, salt_b64, digest_b64, iterations):
-        attempts = db.increment_attempts(payload.request_id)
-        outcome = "failed"
-        if attempts >= settings.max_pin_attempts:
-            db.set_request_status(payload.request_id, "denied")
-            outcome = "locked"
-        db.append_audit(
+    approval_token = secrets.token_urlsafe(24)
+    latency = datetime.now(timezone.utc) - datetime.fromisoformat(request["created_at"])
+    with stage("set_request_status"), db.unit_of_work() as uow:
+        # Re-read under the write lock: another approver or worker may have
+        # resolved it while the PIN was being checked.
+        current = uow.get_request_status(payload.request_id)
+        if not current or current["status"] != "pending":
+            status = current["status"] if current else "archived"
+            raise HTTPException(status_code=409, detail=f"request_{status}")
+        uow.set_request_status(payload.request_id, "approved")
+        uow.append_audit(
             "approve_pin",
-            outcome,
-            {"attempts": attempts, "max_attempts": settings.max_pin_attempts},
+            "approved",
+            {"approval_token_tail": approval_token[-8:], "latency_ms": int(latency.total_seconds() * 1000)},
             payload.request_id,
             request["action"],
             request["target"],
         )
+    return {"status": "approved", "approval_token": approval_token, "request_id": payload.request_id}
+
+
+@router.post("/api/v1/admin/approve-pin/bulk", dependencies=[Depends(_require_admin)])
+def approve_pin_bulk(payload: BulkApprovePinIn) -> Dict[str, Any]:
+    # One PIN verification and one transaction for the whole batch.
+    if payload.request_ids and payload.action_prefix is not None:
+        raise HTTPException(status_code=400, detail="request_ids_or_action_prefix")
+    skipped: list[Dict[str, Any]] = []
+    if payload.request_ids:
+        requested = list(dict.fromkeys(x.strip() for x in payload.request_ids if x.strip()))
+        # Only pending requests go on to the PIN check, so a batch of unknown
+        # or resolved ids cannot be used to test PINs without a charged attempt.
+        with stage("get_request"):
+            statuses = {row["id"]: row["status"] for row in db.request_summaries(requested)}
+        skipped = [
+            {"request_id": request_id, "status": statuses.get(request_id, "not_found")}
+            for request_id in requested
+            if statuses.get(request_id) != "pending"
+        ]
+        request_ids = [request_id for request_id in requested if statuses.get(request_id) == "pending"]
+    elif payload.action_prefix is not None:
+        request_ids = db.pending_request_ids(payload.action_prefix.strip(), BULK_APPROVE_MAX)
+    else:
+        raise HTTPException(status_code=400, detail="request_ids_or_action_prefix")
+    if not request_ids:
+        raise HTTPException(status_code=404, detail="no_pending_requests")
+
+    if not _verify_approval_pin(payload.pin):
+        with stage("append_audit"):
+            db.fail_pin_attempts(request_ids, settings.max_pin_attempts)
         raise HTTPException(status_code=401, detail="invalid_pin")
 
-    db.set_request_status(payload.request_id, "approved")
-    approval_token = secrets.token_urlsafe(24)
-    db.append_audit(
-        "approve_pin",
-        "approved",
-        {"approval_token_tail": approval_token[-8:]},
-        payload.request_id,
-        request["action"],
-        request["target"],
-    )
-    return {"status": "approved", "approval_token": approval_token, "request_id": payload.request_id}
+    tokens = {request_id: secrets.token_urlsafe(24) for request_id in request_ids}
+    with stage("set_request_status"):
+        results = db.approve_requests({request_id: token[-8:] for request_id, token in tokens.items()})
+    for result in results:
+        if result["status"] == "approved":
+            result["approval_token"] = tokens[result["request_id"]]
+    approved = sum(1 for result in results if result["status"] == "approved")
+    if skipped:
+        order = {request_id: index for index, request_id in enumerate(requested)}
+        results = sorted(results + skipped, key=lambda result: order[result["request_id"]])
+    return {"status": "ok", "approved": approved, "results": results}
+
+
+def _pin_reply_parts(body: str) -> list[str]:
+    parts = body.strip().split()
+    if len(parts) not in (3, 4) or parts[0].upper() != "PIN":
+        raise HTTPException(status_code=400, detail="invalid_format")
+    return parts
 
 
-@app.post("/api/v1/admin/message-reply", dependencies=[Depends(_require_admin)])
+@router.post("/api/v1/admin/message-reply", dependencies=[Depends(_require_admin)])
 def approve_from_message(payload: MessageReplyIn) -> Dict[str, Any]:
-    # Expected format: PIN <request_id> <pin>
-    parts = payload.body.strip().split()
-    if len(parts) != 3 or parts[0].upper() != "PIN":
+    # Expected formats:
+    #   PIN <request_id> <pin>
+    #   PIN <request_id>,<request_id>,... <pin>
+    #   PIN ALL [<action_prefix>] <pin>
+    parts = _pin_reply_parts(payload.body)
+    if parts[1].upper() == "ALL":
+        prefix = parts[2].strip() if len(parts) == 4 else ""
+        return approve_pin_bulk(BulkApprovePinIn(action_prefix=prefix, pin=parts[-1].strip()))
+    if len(parts) != 3:
         raise HTTPException(status_code=400, detail="invalid_format")
-    request_id = parts[1].strip()
     pin = parts[2].strip()
+    if "," in parts[1]:
+        request_ids = [x.strip() for x in parts[1].split(",") if x.strip()]
+        if len(request_ids) > BULK_APPROVE_MAX:
+            raise HTTPException(status_code=400, detail="too_many_request_ids")
+        return approve_pin_bulk(BulkApprovePinIn(request_ids=request_ids, pin=pin))
+    request_id = parts[1].strip()
     return approve_pin(ApprovePinIn(request_id=request_id, pin=pin))
 
 
-@app.post("/api/v1/inbound/reply")
+# Replies without a gateway message id are deduplicated on their text within
+# this many seconds.
+INBOUND_DEDUPE_WINDOW = 300
+
+
+@router.post("/api/v1/inbound/reply")
 def inbound_reply(
     token: str,
     body: Optional[str] = Form(default=None),
     Body: Optional[str] = Form(default=None),
+    MessageSid: Optional[str] = Form(default=None),
+    message_id: Optional[str] = Form(default=None, alias="Message-Id"),
+    idempotency_key: Optional[str] = Header(default=None),
 ) -> Dict[str, Any]:
+    # Acknowledges as soon as the reply is stored; the inbound worker does the
+    # PIN check and approval. A gateway retry with the same message id (Twilio
+    # MessageSid, mail Message-Id or an Idempotency-Key header) is not queued
+    # again.
     if not settings.inbound_token or token != settings.inbound_token:
         raise HTTPException(status_code=401, detail="invalid_inbound_token")
     raw = (body or Body or "").strip()
     if not raw:
         raise HTTPException(status_code=400, detail="missing_message_body")
-    return approve_from_message(  # reuse parser/approval flow
-        MessageReplyIn(body=raw),
-    )
-
-
-@app.post("/api/v1/agent/request", response_model=AgentDecisionOut, dependencies=[Depends(_require_agent)])
-def agent_request(payload: AgentRequestIn) -> AgentDecisionOut:
-    keyword_match = None
-    keywords = _get_risk_keywords()
-    if keywords:
-        haystack = (
-            f"{payload.action}\n{payload.target}\n"
-            f"{json.dumps(payload.metadata, sort_keys=True, ensure_ascii=False)}"
-        ).lower()
-        for kw in keywords:
-            if kw in haystack:
-                keyword_match = kw
-                break
-
-    if keyword_match:
-        decision = PolicyDecision(
-            decision="require_pin",
-            risk="high",
-            reason=f"Risk keyword matched: '{keyword_match}'",
-            policy_id="policy-risk-keyword",
-        )
+    try:
+        _pin_reply_parts(MessageReplyIn(body=raw).body)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="invalid_format")
+    gateway_id = (idempotency_key or MessageSid or message_id or "").strip()
+    if gateway_id:
+        key = f"id:{gateway_id}"
     else:
-        decision = policy_engine.evaluate(payload.action, payload.target, payload.metadata)
+        digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        key = f"sha256:{digest}:{int(time.time()) // INBOUND_DEDUPE_WINDOW}"
+    message, created = db.enqueue_inbound(key, raw)
+    INBOUND_MESSAGES.inc("queued" if created else "duplicate")
+    if created:
+        inbound_worker.wake()
+    return {"status": "queued" if created else "duplicate", "message_id": message["id"]}
+
+
+def _process_inbound_reply(body: str) -> Dict[str, Any]:
+    # Runs on the inbound worker thread. Client errors are final outcomes;
+    # anything else propagates and is retried.
+    try:
+        result = approve_from_message(MessageReplyIn(body=body))
+    except HTTPException as exc:
+        if exc.status_code >= 500:
+            raise
+        raise InboundRejected(exc.status_code, str(exc.detail))
+    # Stored and audited; approval tokens stay out of both.
+    result = {k: v for k, v in result.items() if k != "approval_token"}
+    if isinstance(result.get("results"), list):
+        result["results"] = [{k: v for k, v in r.items() if k != "approval_token"} for r in result["results"]]
+    return result
+
+
+@router.get("/api/v1/admin/inbound/messages", dependencies=[Depends(_require_admin)])
+def inbound_messages(limit: int = 50) -> Dict[str, Any]:
+    return {"items": db.recent_inbound(max(1, min(limit, 500)))}
+
+
+# Room in an agent request body for everything but metadata: action and
+# target at their length limits, fully escaped, plus the JSON around them.
+AGENT_REQUEST_ENVELOPE_BYTES = 8192
+
+
+async def _limit_agent_request_body(request: Request) -> None:
+    # Caps metadata by the size of the body as received. FastAPI has already
+    # read it to parse the payload, so this costs a len() rather than
+    # encoding the metadata again on every request.
+    if settings.max_metadata_bytes > 0:
+        body = await request.body()
+        if len(body) > settings.max_metadata_bytes + AGENT_REQUEST_ENVELOPE_BYTES:
+            raise HTTPException(status_code=413, detail="metadata_too_large")
+
+
+@router.post(
+    "/api/v1/agent/request",
+    response_model=AgentDecisionOut,
+    dependencies=[Depends(_require_agent), Depends(_limit_agent_request_body)],
+)
+def agent_request(payload: AgentRequestIn) -> AgentDecisionOut:
+    try:
+        admission.check_action(payload.action)
+    except AdmissionRejected as exc:
+        raise HTTPException(status_code=429, detail=f"rate_limited: {exc.limit}", headers=exc.headers)
+    with stage("keyword_scan"):
+        decision = keyword_decision(_get_risk_keyword_matcher(), payload.action, payload.target, payload.metadata)
+    if decision is None:
+        with stage("policy_evaluate"):
+            decision = _get_policy_engine().evaluate(payload.action, payload.target, payload.metadata)
+    DECISIONS.inc(decision.decision, decision.policy_id)
 
     if decision.decision == "deny":
-        db.append_audit(
-            "agent_request",
-            "deny",
-            {"reason": decision.reason, "policy_id": decision.policy_id},
-            None,
-            payload.action,
-            payload.target,
-        )
+        with stage("append_audit"):
+            db.append_audit(
+                "agent_request",
+                "deny",
+                {"reason": decision.reason, "policy_id": decision.policy_id},
+                None,
+                payload.action,
+                payload.target,
+                payload.metadata,
+            )
         return AgentDecisionOut(
             decision="deny",
             reason=decision.reason,
             policy_id=decision.policy_id,
             risk=decision.risk,
+            cache_ttl_seconds=settings.decision_cache_seconds or None,
+            policy_version=_decision_version(),
         )
 
     if decision.decision == "allow":
-        db.append_audit(
-            "agent_request",
-            "allow",
-            {"reason": decision.reason, "policy_id": decision.policy_id},
-            None,
-            payload.action,
-            payload.target,
-        )
+        if audit_rollup.enabled and audit_rollup.applies_to(decision.risk, decision.policy_id):
+            audit_rollup.record(payload.action, payload.target, decision.policy_id)
+        else:
+            with stage("append_audit"):
+                db.append_audit(
+                    "agent_request",
+                    "allow",
+                    {"reason": decision.reason, "policy_id": decision.policy_id},
+                    None,
+                    payload.action,
+                    payload.target,
+                    payload.metadata,
+                )
         return AgentDecisionOut(
             decision="allow",
             reason=decision.reason,
             policy_id=decision.policy_id,
             risk=decision.risk,
+            cache_ttl_seconds=settings.decision_cache_seconds or None,
+            policy_version=_decision_version(),
         )
 
     request_id = new_request_id()
     expires_at = (datetime.now(timezone.utc) + timedelta(seconds=settings.request_ttl_seconds)).isoformat()
-    db.create_request(
-        request_id=request_id,
-        action=payload.action,
-        target=payload.target,
-        metadata=payload.metadata,
-        risk=decision.risk,
-        reason=decision.reason,
-        policy_id=decision.policy_id,
-        expires_at=expires_at,
-    )
-    db.append_audit(
-        "agent_request",
-        "require_pin",
-        {"reason": decision.reason, "policy_id": decision.policy_id},
-        request_id,
-        payload.action,
-        payload.target,
-    )
+    # The request row and its audit entry commit together.
+    with stage("create_request"), db.unit_of_work() as uow:
+        uow.create_request(
+            request_id=request_id,
+            action=payload.action,
+            target=payload.target,
+            metadata=payload.metadata,
+            risk=decision.risk,
+            reason=decision.reason,
+            policy_id=decision.policy_id,
+            expires_at=expires_at,
+        )
+        uow.append_audit(
+            "agent_request",
+            "require_pin",
+            {"reason": decision.reason, "policy_id": decision.policy_id},
+            request_id,
+            payload.action,
+            payload.target,
+            payload.metadata,
+        )
 
     ui_link = _approval_ui_url_from_metadata(request_id, payload.metadata)
     msg = (
@@ -458,12 +1126,13 @@ def agent_request(payload: AgentRequestIn) -> AgentDecisionOut:
     )
 
     try:
-        notifier.send(
-            "Glove PIN Required",
-            msg,
-            {"request_id": request_id},
-            options={"clawhub_extensions": _get_enabled_extensions()},
-        )
+        with stage("notify"):
+            notifier.send(
+                "Glove PIN Required",
+                msg,
+                {"request_id": request_id},
+                options={"clawhub_extensions": _get_enabled_extensions()},
+            )
     except Exception as exc:
         db.append_audit(
             "notify",
@@ -482,19 +1151,35 @@ def agent_request(payload: AgentRequestIn) -> AgentDecisionOut:
         request_id=request_id,
         expires_at=expires_at,
         ui_url=ui_link,
+        policy_version=_decision_version(),
     )
 
 
-@app.get("/api/v1/agent/request-status", dependencies=[Depends(_require_agent)])
-def agent_request_status(request_id: str) -> Dict[str, Any]:
-    request = db.get_request(request_id)
+MAX_STATUS_WAIT_SECONDS = 30.0
+
+
+def _request_status(request_id: str) -> Dict[str, Any]:
+    request = db.get_request_status(request_id)
     if not request:
         raise HTTPException(status_code=404, detail="request_not_found")
 
     status = request["status"]
     if status == "pending" and datetime.fromisoformat(request["expires_at"]) < datetime.now(timezone.utc):
-        db.set_request_status(request_id, "expired")
-        status = "expired"
+        with db.unit_of_work() as uow:
+            current = uow.get_request_status(request_id)
+            if current and current["status"] == "pending":
+                uow.set_request_status(request_id, "expired")
+                uow.append_audit(
+                    "request_status",
+                    "expired",
+                    {"reason": "request_expired"},
+                    request_id,
+                    request["action"],
+                    request["target"],
+                )
+                status = "expired"
+            elif current:
+                status = current["status"]
 
     return {
         "request_id": request_id,
@@ -506,19 +1191,123 @@ def agent_request_status(request_id: str) -> Dict[str, Any]:
     }
 
 
-@app.get("/api/v1/health")
+@router.get("/api/v1/agent/request-status", dependencies=[Depends(_require_agent)])
+async def agent_request_status(request_id: str, wait_seconds: float = 0.0) -> Dict[str, Any]:
+    # wait_seconds > 0 long-polls: the call returns as soon as the request
+    # leaves "pending" (in any worker) or the wait runs out.
+    generation = change_watcher.generation
+    result = await run_in_threadpool(_request_status, request_id)
+    wait_seconds = max(0.0, min(wait_seconds, MAX_STATUS_WAIT_SECONDS))
+    if wait_seconds <= 0 or result["status"] != "pending":
+        return result
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    expires_in = (datetime.fromisoformat(result["expires_at"]) - datetime.now(timezone.utc)).total_seconds()
+    deadline = min(deadline, loop.time() + max(0.0, expires_in) + 0.05)
+    while result["status"] == "pending":
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        generation = await change_watcher.wait_async(generation, remaining)
+        result = await run_in_threadpool(_request_status, request_id)
+    return result
+
+
+@router.get("/api/v1/metrics", dependencies=[Depends(_require_metrics_reader)])
+async def metrics() -> PlainTextResponse:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    THREADPOOL.set(limiter.total_tokens, "limit")
+    THREADPOOL.set(stats.borrowed_tokens, "busy")
+    THREADPOOL.set(stats.tasks_waiting, "waiting")
+    body = await run_in_threadpool(REGISTRY.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/api/v1/admin/debug/profile", dependencies=[Depends(_require_admin)])
+async def profile(seconds: float = 10.0, interval_ms: float = 5.0) -> PlainTextResponse:
+    seconds = max(0.1, min(seconds, 120.0))
+    interval = max(0.001, min(interval_ms / 1000.0, 1.0))
+    try:
+        stacks = await run_in_threadpool(sample_stacks, seconds, interval)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="profile_in_progress")
+    return PlainTextResponse(
+        render_collapsed(stacks),
+        headers={"Content-Disposition": 'attachment; filename="glove-profile.folded"'},
+    )
+
+
+@router.get("/api/v1/health")
 def health() -> Dict[str, Any]:
     return {
         "status": "ok",
         "pin_configured": _has_pin(),
         "notifier": settings.notifier_provider,
+        # last_error can name hosts and paths; it is only in the admin API.
+        "notifier_channels": {
+            name: {k: v for k, v in h.items() if k != "last_error"} for name, h in notifier.channel_health().items()
+        },
         "agent_key_tail": AGENT_KEY[-8:],
         "admin_key_tail": ADMIN_KEY[-8:],
     }
 
 
-@app.on_event("startup")
-def startup_log() -> None:
+def _open_resources(app_settings: Settings) -> None:
+    global db, notifier, change_watcher, audit_rollup, audit_search_backfill, audit_stats, request_retention
+    global inbound_worker, AGENT_KEY, ADMIN_KEY, _policy_state, _settings_cache
+    db = GloveDB(
+        app_settings.db_path,
+        app_settings.blob_compress_bytes,
+        [x.strip() for x in app_settings.audit_search_metadata_keys.split(",") if x.strip()],
+    )
+    # Other worker processes' commits would not reach an in-process table.
+    if app_settings.pending_table:
+        if app_settings.workers == 1 and not in_worker_process():
+            db.enable_pending_table()
+        else:
+            print(json.dumps({"event": "glove_pending_table_disabled", "reason": "multiple_processes"}))
+    notifier = Notifier(app_settings)
+    change_watcher = ChangeWatcher(app_settings.db_path)
+    audit_rollup = AuditRollup(
+        db,
+        app_settings.audit_rollup_risks,
+        app_settings.audit_rollup_policy_ids,
+        app_settings.audit_rollup_seconds,
+        app_settings.audit_rollup_samples,
+    )
+    audit_search_backfill = AuditSearchBackfill(db)
+    audit_stats = AuditStatsUpdater(db)
+    request_retention = RequestRetention(
+        db,
+        app_settings.request_retention_days,
+        app_settings.retention_interval_seconds,
+        app_settings.retention_batch_size,
+    )
+    inbound_worker = InboundWorker(db, _process_inbound_reply, app_settings.inbound_poll_seconds)
+    AGENT_KEY = os.getenv("GLOVE_AGENT_KEY", "").strip() or _read_or_create_key("agent_key")
+    ADMIN_KEY = os.getenv("GLOVE_ADMIN_KEY", "").strip() or _read_or_create_key("admin_key")
+    admission.set_agent_keys([AGENT_KEY])
+    _settings_cache = (-1, {})
+    _policy_state = (db.get_setting("policy_version") or "", PolicyEngine(app_settings.policy_path))
+
+
+@asynccontextmanager
+async def _lifespan(application: FastAPI) -> AsyncIterator[None]:
+    _open_resources(settings)
+    # Agent decisions and admin calls each have an in-flight cap; size the
+    # worker threadpool so both can be busy at once and admin keeps its share.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, settings.agent_max_in_flight + settings.admin_max_in_flight + 8)
+    change_watcher.start()
+    audit_rollup.start()
+    audit_search_backfill.start()
+    audit_stats.start()
+    request_retention.start()
+    inbound_worker.start()
+    agent_socket = AgentSocketServer(application, settings)
+    await agent_socket.start()
     # Intentionally prints only tails so full keys are not leaked by default.
     print(
         json.dumps(
@@ -530,3 +1319,34 @@ def startup_log() -> None:
             }
         )
     )
+    try:
+        yield
+    finally:
+        await agent_socket.stop()
+        inbound_worker.stop()
+        request_retention.stop()
+        audit_search_backfill.stop()
+        audit_stats.stop()
+        audit_rollup.stop()
+        change_watcher.stop()
+
+
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    # One Glove app per process: the handlers above read the module-level
+    # resources, which the lifespan of the most recently created app opens.
+    global settings, admission
+    settings = app_settings or load_settings()
+    admission = AdmissionController(settings)
+    configure_tracing(settings.trace_enabled, settings.slow_request_ms)
+
+    application = FastAPI(title="Glove Safety Shell", version="0.1.0", lifespan=_lifespan)
+    application.add_middleware(AdmissionMiddleware, controller=admission)
+    application.add_middleware(MetricsMiddleware)
+    if settings.trace_enabled:
+        application.add_middleware(TracingMiddleware)
+    application.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+    application.include_router(router)
+    return application
+
+
+app = create_app()
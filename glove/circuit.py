@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    def __init__(self, channel: str, retry_after: float):
+        super().__init__(f"circuit open for {channel}, retry in {retry_after:.0f}s")
+        self.channel = channel
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and fast-fails calls
+    # for the cooldown. The first call after that is let through as a trial
+    # (half-open) while others keep fast-failing; success closes the circuit,
+    # failure reopens it with the cooldown doubled up to max_cooldown.
+    # A failure_threshold of 0 only tracks health and never opens.
+    def __init__(
+        self,
+        channel: str,
+        failure_threshold: int,
+        cooldown: float,
+        max_cooldown: float,
+        window: int = 20,
+    ):
+        self.channel = channel
+        self.failure_threshold = failure_threshold
+        self.cooldown = max(0.0, cooldown)
+        self.max_cooldown = max(self.cooldown, max_cooldown)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latency_ms = 0.0
+        self.last_error = ""
+        self.last_failure_at = 0.0
+        self._recent: Deque[bool] = deque(maxlen=window)
+        self._current_cooldown = self.cooldown
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable[..., T], *args: Any, force: bool = False) -> T:
+        # force skips the open check (manual tests from the admin UI) but the
+        # outcome still counts, so a passing test closes the circuit.
+        if not force:
+            self._admit()
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as exc:
+            self._record(False, time.perf_counter() - started, str(exc))
+            raise
+        self._record(True, time.perf_counter() - started, "")
+        return result
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN and now >= self._open_until:
+                self.state = HALF_OPEN
+                return
+            self.rejected += 1
+            raise CircuitOpen(self.channel, max(0.0, self._open_until - now))
+
+    def _record(self, ok: bool, seconds: float, error: str) -> None:
+        with self._lock:
+            self._recent.append(ok)
+            ms = seconds * 1000.0
+            self.latency_ms = ms if not (self.successes or self.failures) else 0.8 * self.latency_ms + 0.2 * ms
+            if ok:
+                self.successes += 1
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                self._current_cooldown = self.cooldown
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            self.last_failure_at = time.time()
+            if self.state == HALF_OPEN:
+                self._current_cooldown = min(self.max_cooldown, self._current_cooldown * 2)
+                self._open(time.monotonic())
+            elif self.failure_threshold > 0 and self.consecutive_failures >= self.failure_threshold:
+                self._open(time.monotonic())
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self._open_until = now + self._current_cooldown
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self._recent)
+            retry_after = max(0.0, self._open_until - time.monotonic()) if self.state == OPEN else 0.0
+            return {
+                "state": self.state,
+                "success_rate": round(sum(recent) / len(recent), 3) if recent else None,
+                "latency_ms": round(self.latency_ms, 1),
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_after_seconds": round(retry_after, 1),
+                "last_error": self.last_error,
+                "last_failure_at": int(self.last_failure_at) if self.last_failure_at else None,
+            }
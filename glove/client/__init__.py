@@ -0,0 +1,5 @@
+from .aio import AsyncGloveClient
+from .base import Decision, DecisionCache, GloveError
+from .sync import GloveClient
+
+__all__ = ["AsyncGloveClient", "Decision", "DecisionCache", "GloveClient", "GloveError"]
@@ -0,0 +1,202 @@
+import asyncio
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import (
+    DEFAULT_BASE_URL,
+    MAX_WAIT_SECONDS,
+    REQUEST_PATH,
+    TERMINAL_STATUSES,
+    Decision,
+    DecisionCache,
+    backoff_delay,
+    default_agent_key,
+    is_retryable,
+    parse_base_url,
+    raise_for_status,
+    request_body,
+    status_path,
+)
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncGloveClient:
+    # asyncio counterpart of GloveClient with a minimal HTTP/1.1 keep-alive
+    # client on asyncio streams, so it needs nothing outside the stdlib.
+    # unix_socket works as in GloveClient.
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        agent_key: Optional[str] = None,
+        timeout: float = 10.0,
+        pool_size: int = 8,
+        cache: bool = True,
+        max_cache_entries: int = 1024,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        unix_socket: Optional[str] = None,
+    ):
+        self.scheme, self.host, self.port, self.prefix = parse_base_url(base_url)
+        self.unix_socket = unix_socket
+        self.agent_key = default_agent_key(agent_key, required=unix_socket is None)
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.ssl_context = ssl_context or (ssl.create_default_context() if self.scheme == "https" else None)
+        self.cache = DecisionCache(max_cache_entries) if cache else None
+        self._idle: List[Connection] = []
+        if unix_socket is not None:
+            host = "localhost"
+        else:
+            host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        self._head = (
+            f"Host: {host}\r\n"
+            + (f"X-Glove-Agent-Key: {self.agent_key}\r\n" if self.agent_key else "")
+            + "Content-Type: application/json\r\n"
+            "Connection: keep-alive\r\n"
+        )
+
+    async def __aenter__(self) -> "AsyncGloveClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def decide(self, action: str, target: str, metadata: Optional[Dict[str, Any]] = None) -> Decision:
+        metadata = metadata or {}
+        key = DecisionCache.key(action, target, metadata) if self.cache is not None else ""
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        data = await self._call("POST", self.prefix + REQUEST_PATH, request_body(action, target, metadata))
+        decision = Decision.from_json(data)
+        if self.cache is not None:
+            self.cache.observe(key, decision)
+        return decision
+
+    async def status(self, request_id: str, wait_seconds: float = 0.0) -> Dict[str, Any]:
+        wait_seconds = max(0.0, min(wait_seconds, MAX_WAIT_SECONDS))
+        return await self._call(
+            "GET",
+            status_path(self.prefix, request_id, wait_seconds),
+            None,
+            timeout=self.timeout + wait_seconds,
+        )
+
+    async def wait_for_approval(self, request_id: str, timeout: float = 300.0) -> Dict[str, Any]:
+        # Same contract as GloveClient.wait_for_approval.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        attempt = 0
+        last: Dict[str, Any] = {"request_id": request_id, "status": "pending"}
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return last
+            try:
+                last = await self.status(request_id, min(remaining, MAX_WAIT_SECONDS))
+                attempt = 0
+            except Exception as exc:
+                if not is_retryable(exc):
+                    raise
+                delay = backoff_delay(attempt, getattr(exc, "retry_after", None))
+                attempt += 1
+                await asyncio.sleep(max(0.0, min(delay, deadline - loop.time())))
+                continue
+            if last.get("status") in TERMINAL_STATUSES:
+                return last
+
+    async def _connect(self) -> Tuple[Connection, bool]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+        if self.unix_socket is not None:
+            opening = asyncio.open_unix_connection(self.unix_socket)
+        else:
+            opening = asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        conn = await asyncio.wait_for(opening, self.timeout)
+        return conn, False
+
+    def _release(self, conn: Connection) -> None:
+        if len(self._idle) < self.pool_size:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+
+    async def _call(self, method: str, path: str, body: Optional[bytes], timeout: Optional[float] = None) -> Any:
+        payload = body or b""
+        head = f"{method} {path} HTTP/1.1\r\n{self._head}Content-Length: {len(payload)}\r\n\r\n"
+        message = head.encode("latin-1") + payload
+        while True:
+            conn, reused = await self._connect()
+            reader, writer = conn
+            try:
+                writer.write(message)
+                await writer.drain()
+                status, headers, data = await asyncio.wait_for(_read_response(reader), timeout or self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                writer.close()
+                # A keep-alive connection the server already closed fails
+                # before any response; retry on a fresh one. Timeouts and
+                # cut-off responses are not retried, as the server may have
+                # acted on the request.
+                if reused and isinstance(exc, (ConnectionResetError, BrokenPipeError)):
+                    continue
+                if isinstance(exc, asyncio.IncompleteReadError):
+                    raise ConnectionError("connection closed mid-response") from exc
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._release(conn)
+            return raise_for_status(status, headers, data)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    try:
+        status_line = await reader.readuntil(b"\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise
+        raise ConnectionResetError("connection closed before a response") from exc
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError(f"bad status line: {status_line!r}")
+    status = int(parts[1])
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                # Trailers, if any, end with an empty line.
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return status, headers, b"".join(chunks)
+    if "content-length" in headers:
+        return status, headers, await reader.readexactly(int(headers["content-length"]))
+    if status in (204, 304) or 100 <= status < 200:
+        return status, headers, b""
+    headers["connection"] = "close"
+    return status, headers, await reader.read()
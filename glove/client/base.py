@@ -0,0 +1,155 @@
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8088"
+REQUEST_PATH = "/api/v1/agent/request"
+STATUS_PATH = "/api/v1/agent/request-status"
+# The server caps a single long-poll at 30 seconds.
+MAX_WAIT_SECONDS = 30.0
+TERMINAL_STATUSES = frozenset({"approved", "denied", "expired"})
+
+
+class GloveError(Exception):
+    def __init__(self, status: int, detail: str, retry_after: Optional[float] = None):
+        super().__init__(f"{status} {detail}")
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Decision:
+    decision: str
+    reason: str
+    policy_id: str
+    risk: str
+    request_id: Optional[str] = None
+    expires_at: Optional[str] = None
+    ui_url: Optional[str] = None
+    cache_ttl_seconds: Optional[int] = None
+    policy_version: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def allowed(self) -> bool:
+        return self.decision == "allow"
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Decision":
+        known = {f.name for f in fields(cls)} - {"cached"}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class DecisionCache:
+    # allow/deny decisions keyed by (action, target, metadata). Entries live
+    # for the server's cache_ttl_seconds and are all dropped when a response
+    # carries a different policy_version.
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[float, Decision]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(action: str, target: str, metadata: Dict[str, Any]) -> str:
+        return json.dumps([action, target, metadata], sort_keys=True, separators=(",", ":"))
+
+    def get(self, key: str) -> Optional[Decision]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def observe(self, key: str, decision: Decision) -> None:
+        with self._lock:
+            if decision.policy_version is not None and decision.policy_version != self.version:
+                self._entries.clear()
+                self.version = decision.policy_version
+            if not decision.cache_ttl_seconds or decision.decision not in ("allow", "deny"):
+                return
+            self._entries[key] = (time.monotonic() + decision.cache_ttl_seconds, _as_cached(decision))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _as_cached(decision: Decision) -> Decision:
+    values = {f.name: getattr(decision, f.name) for f in fields(decision)}
+    values["cached"] = True
+    return Decision(**values)
+
+
+def parse_base_url(base_url: str) -> Tuple[str, str, int, str]:
+    # -> (scheme, host, port, path prefix)
+    parts = urllib.parse.urlsplit(base_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"unsupported base_url: {base_url}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return parts.scheme, parts.hostname, port, parts.path.rstrip("/")
+
+
+def default_agent_key(agent_key: Optional[str], required: bool = True) -> str:
+    # Not required over the agent socket, where the server checks the uid.
+    key = agent_key if agent_key is not None else os.getenv("GLOVE_AGENT_KEY", "")
+    if not key and required:
+        raise ValueError("agent_key is required (or set GLOVE_AGENT_KEY)")
+    return key
+
+
+def request_body(action: str, target: str, metadata: Dict[str, Any]) -> bytes:
+    return json.dumps({"action": action, "target": target, "metadata": metadata}).encode("utf-8")
+
+
+def status_path(prefix: str, request_id: str, wait_seconds: float) -> str:
+    query = urllib.parse.urlencode({"request_id": request_id, "wait_seconds": f"{wait_seconds:g}"})
+    return f"{prefix}{STATUS_PATH}?{query}"
+
+
+def raise_for_status(status: int, headers: Dict[str, str], data: bytes) -> Any:
+    try:
+        payload = json.loads(data) if data else {}
+    except ValueError:
+        payload = {"detail": data.decode("utf-8", "replace")}
+    if status >= 400:
+        retry_after = headers.get("retry-after")
+        raise GloveError(
+            status,
+            str(payload.get("detail", "")) if isinstance(payload, dict) else "",
+            float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+    return payload
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    # Exponential with full jitter, capped at 10s; Retry-After wins.
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(10.0, 0.25 * (2**attempt)))
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, GloveError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (OSError, TimeoutError, http.client.HTTPException))
@@ -0,0 +1,188 @@
+import http.client
+import queue
+import socket
+import ssl
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .base import (
+    DEFAULT_BASE_URL,
+    MAX_WAIT_SECONDS,
+    REQUEST_PATH,
+    TERMINAL_STATUSES,
+    Decision,
+    DecisionCache,
+    backoff_delay,
+    default_agent_key,
+    is_retryable,
+    parse_base_url,
+    raise_for_status,
+    request_body,
+    status_path,
+)
+
+
+# What sending on, or waiting for a response from, a keep-alive connection
+# the server has already closed raises. RemoteDisconnected is a
+# ConnectionResetError; socket.timeout is neither.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.unix_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class GloveClient:
+    # Thread-safe agent client. Idle keep-alive connections are kept in a
+    # small pool; a call takes one (or opens a new one) and returns it after
+    # reading the full response. With unix_socket set, requests go over the
+    # server's agent socket (GLOVE_AGENT_SOCKET) and base_url only supplies
+    # the path prefix.
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        agent_key: Optional[str] = None,
+        timeout: float = 10.0,
+        pool_size: int = 4,
+        cache: bool = True,
+        max_cache_entries: int = 1024,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        unix_socket: Optional[str] = None,
+    ):
+        self.scheme, self.host, self.port, self.prefix = parse_base_url(base_url)
+        self.unix_socket = unix_socket
+        self.agent_key = default_agent_key(agent_key, required=unix_socket is None)
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.cache = DecisionCache(max_cache_entries) if cache else None
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=max(1, pool_size))
+        self._headers = {
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        if self.agent_key:
+            self._headers["X-Glove-Agent-Key"] = self.agent_key
+
+    def __enter__(self) -> "GloveClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def decide(self, action: str, target: str, metadata: Optional[Dict[str, Any]] = None) -> Decision:
+        metadata = metadata or {}
+        key = DecisionCache.key(action, target, metadata) if self.cache is not None else ""
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        data = self._call("POST", self.prefix + REQUEST_PATH, request_body(action, target, metadata))
+        decision = Decision.from_json(data)
+        if self.cache is not None:
+            self.cache.observe(key, decision)
+        return decision
+
+    def status(self, request_id: str, wait_seconds: float = 0.0) -> Dict[str, Any]:
+        wait_seconds = max(0.0, min(wait_seconds, MAX_WAIT_SECONDS))
+        return self._call(
+            "GET",
+            status_path(self.prefix, request_id, wait_seconds),
+            None,
+            timeout=self.timeout + wait_seconds,
+        )
+
+    def wait_for_approval(self, request_id: str, timeout: float = 300.0) -> Dict[str, Any]:
+        # Long-polls, so the call returns as soon as the request is resolved
+        # in any worker. Transient errors back off and retry until timeout.
+        # Returns the last status seen ("pending" if the timeout ran out).
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        last: Dict[str, Any] = {"request_id": request_id, "status": "pending"}
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return last
+            try:
+                last = self.status(request_id, min(remaining, MAX_WAIT_SECONDS))
+                attempt = 0
+            except Exception as exc:
+                if not is_retryable(exc):
+                    raise
+                delay = backoff_delay(attempt, getattr(exc, "retry_after", None))
+                attempt += 1
+                time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+                continue
+            if last.get("status") in TERMINAL_STATUSES:
+                return last
+
+    def _connect(self) -> Tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        if self.unix_socket is not None:
+            return UnixHTTPConnection(self.unix_socket, self.timeout), False
+        if self.scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _call(self, method: str, path: str, body: Optional[bytes], timeout: Optional[float] = None) -> Any:
+        while True:
+            conn, reused = self._connect()
+            try:
+                conn.timeout = timeout or self.timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(conn.timeout)
+                conn.request(method, path, body=body, headers=self._headers)
+                resp = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                # The server closed an idle keep-alive connection before
+                # answering; retry on a fresh one. Timeouts and other errors
+                # are not retried, as the server may have acted on the request.
+                if reused:
+                    continue
+                raise
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+            try:
+                data = resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            headers = {k.lower(): v for k, v in resp.getheaders()}
+            return raise_for_status(resp.status, headers, data)
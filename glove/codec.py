@@ -0,0 +1,28 @@
+import json
+import zlib
+from typing import Any, Optional, Union
+
+# JSON columns (request metadata, audit details) hold TEXT, or a zlib BLOB
+# once the text is longer than the compression threshold. SQLite keeps the
+# storage class per value, so both forms live in the same column.
+StoredJSON = Union[str, bytes]
+
+
+def pack_text(text: str, compress_above: int) -> StoredJSON:
+    if compress_above <= 0 or len(text) <= compress_above:
+        return text
+    packed = zlib.compress(text.encode("utf-8"), 6)
+    return packed if len(packed) < len(text) else text
+
+
+def unpack_text(raw: Optional[StoredJSON]) -> str:
+    if raw is None:
+        return ""
+    if isinstance(raw, bytes):
+        return zlib.decompress(raw).decode("utf-8")
+    return raw
+
+
+def load_json(raw: Optional[StoredJSON]) -> Any:
+    text = unpack_text(raw)
+    return json.loads(text) if text else {}
@@ -12,13 +12,22 @@ def _as_bool(value: str, default: bool) -> bool:
 class Settings:
     host: str
     port: int
+    agent_socket_path: str
+    agent_socket_uids: str
+    agent_socket_mode: int
+    workers: int
+    pending_table: bool
     db_path: str
     policy_path: str
     request_ttl_seconds: int
     max_pin_attempts: int
     inbound_token: str
+    inbound_poll_seconds: float
     notifier_provider: str
     notifier_providers: str
+    notifier_failure_threshold: int
+    notifier_circuit_cooldown_seconds: float
+    notifier_circuit_max_cooldown_seconds: float
     public_url: str
     webhook_url: str
     smtp_host: str
@@ -32,24 +41,60 @@ class Settings:
     twilio_auth_token: str
     twilio_from: str
     twilio_to: str
+    twilio_api_base: str
     clawhub_extensions_dir: str
     clawhub_extensions: str
     clawhub_timeout_seconds: int
     clawhub_trust_store_path: str
     require_extension_signatures: bool
+    metrics_token: str
+    trace_enabled: bool
+    slow_request_ms: int
+    audit_rollup_risks: str
+    audit_rollup_policy_ids: str
+    audit_rollup_seconds: int
+    audit_rollup_samples: int
+    audit_search_metadata_keys: str
+    request_retention_days: float
+    max_metadata_bytes: int
+    decision_cache_seconds: int
+    blob_compress_bytes: int
+    retention_interval_seconds: float
+    retention_batch_size: int
+    agent_rate_per_key: float
+    agent_burst_per_key: int
+    agent_rate_per_ip: float
+    agent_burst_per_ip: int
+    action_rate_per_prefix: float
+    action_burst_per_prefix: int
+    agent_max_in_flight: int
+    admin_max_in_flight: int
 
 
 def load_settings() -> Settings:
     return Settings(
         host=os.getenv("GLOVE_HOST", "0.0.0.0"),
         port=int(os.getenv("GLOVE_PORT", "8088")),
+        agent_socket_path=os.getenv("GLOVE_AGENT_SOCKET", "").strip(),
+        agent_socket_uids=os.getenv("GLOVE_AGENT_SOCKET_UIDS", "").strip(),
+        agent_socket_mode=int(os.getenv("GLOVE_AGENT_SOCKET_MODE", "600"), 8),
+        workers=max(1, int(os.getenv("GLOVE_WORKERS", "1"))),
+        # Off unless set, or unless main.py runs a single worker: only the
+        # launcher knows whether other processes share the database.
+        pending_table=_as_bool(os.getenv("GLOVE_PENDING_TABLE"), False),
         db_path=os.getenv("GLOVE_DB_PATH", "./glove.db"),
         policy_path=os.getenv("GLOVE_POLICY_PATH", "./policy.json"),
         request_ttl_seconds=int(os.getenv("GLOVE_REQUEST_TTL_SECONDS", "300")),
         max_pin_attempts=int(os.getenv("GLOVE_MAX_PIN_ATTEMPTS", "5")),
         inbound_token=os.getenv("GLOVE_INBOUND_TOKEN", "").strip(),
+        inbound_poll_seconds=float(os.getenv("GLOVE_INBOUND_POLL_SECONDS", "1")),
         notifier_provider=os.getenv("GLOVE_NOTIFIER_PROVIDER", "console").strip().lower(),
         notifier_providers=os.getenv("GLOVE_NOTIFIER_PROVIDERS", "").strip().lower(),
+        notifier_failure_threshold=int(os.getenv("GLOVE_NOTIFIER_FAILURE_THRESHOLD", "3")),
+        notifier_circuit_cooldown_seconds=float(os.getenv("GLOVE_NOTIFIER_CIRCUIT_COOLDOWN_SECONDS", "30")),
+        notifier_circuit_max_cooldown_seconds=float(
+            os.getenv("GLOVE_NOTIFIER_CIRCUIT_MAX_COOLDOWN_SECONDS", "600")
+        ),
         public_url=os.getenv("GLOVE_PUBLIC_URL", "http://127.0.0.1:8088").strip(),
         webhook_url=os.getenv("GLOVE_WEBHOOK_URL", "").strip(),
         smtp_host=os.getenv("GLOVE_SMTP_HOST", "").strip(),
@@ -63,9 +108,32 @@ def load_settings() -> Settings:
         twilio_auth_token=os.getenv("GLOVE_TWILIO_AUTH_TOKEN", "").strip(),
         twilio_from=os.getenv("GLOVE_TWILIO_FROM", "").strip(),
         twilio_to=os.getenv("GLOVE_TWILIO_TO", "").strip(),
+        twilio_api_base=os.getenv("GLOVE_TWILIO_API_BASE", "https://api.twilio.com").strip().rstrip("/"),
         clawhub_extensions_dir=os.getenv("GLOVE_CLAWHUB_EXTENSIONS_DIR", "./extensions").strip(),
         clawhub_extensions=os.getenv("GLOVE_CLAWHUB_EXTENSIONS", "").strip(),
         clawhub_timeout_seconds=int(os.getenv("GLOVE_CLAWHUB_TIMEOUT_SECONDS", "10")),
         clawhub_trust_store_path=os.getenv("GLOVE_CLAWHUB_TRUST_STORE_PATH", "./trusted_publishers.json").strip(),
         require_extension_signatures=_as_bool(os.getenv("GLOVE_REQUIRE_EXTENSION_SIGNATURES"), True),
+        metrics_token=os.getenv("GLOVE_METRICS_TOKEN", "").strip(),
+        trace_enabled=_as_bool(os.getenv("GLOVE_TRACE_ENABLED"), False),
+        slow_request_ms=int(os.getenv("GLOVE_SLOW_REQUEST_MS", "500")),
+        audit_rollup_risks=os.getenv("GLOVE_AUDIT_ROLLUP_RISKS", "").strip().lower(),
+        audit_rollup_policy_ids=os.getenv("GLOVE_AUDIT_ROLLUP_POLICY_IDS", "").strip(),
+        audit_rollup_seconds=int(os.getenv("GLOVE_AUDIT_ROLLUP_SECONDS", "60")),
+        audit_rollup_samples=int(os.getenv("GLOVE_AUDIT_ROLLUP_SAMPLES", "5")),
+        audit_search_metadata_keys=os.getenv("GLOVE_AUDIT_SEARCH_METADATA_KEYS", "").strip(),
+        max_metadata_bytes=int(os.getenv("GLOVE_MAX_METADATA_BYTES", "16384")),
+        decision_cache_seconds=int(os.getenv("GLOVE_DECISION_CACHE_SECONDS", "0")),
+        blob_compress_bytes=int(os.getenv("GLOVE_BLOB_COMPRESS_BYTES", "1024")),
+        request_retention_days=float(os.getenv("GLOVE_REQUEST_RETENTION_DAYS", "30")),
+        retention_interval_seconds=float(os.getenv("GLOVE_RETENTION_INTERVAL_SECONDS", "300")),
+        retention_batch_size=int(os.getenv("GLOVE_RETENTION_BATCH_SIZE", "500")),
+        agent_rate_per_key=float(os.getenv("GLOVE_AGENT_RATE_PER_KEY", "200")),
+        agent_burst_per_key=int(os.getenv("GLOVE_AGENT_BURST_PER_KEY", "400")),
+        agent_rate_per_ip=float(os.getenv("GLOVE_AGENT_RATE_PER_IP", "200")),
+        agent_burst_per_ip=int(os.getenv("GLOVE_AGENT_BURST_PER_IP", "400")),
+        action_rate_per_prefix=float(os.getenv("GLOVE_ACTION_RATE_PER_PREFIX", "100")),
+        action_burst_per_prefix=int(os.getenv("GLOVE_ACTION_BURST_PER_PREFIX", "200")),
+        agent_max_in_flight=int(os.getenv("GLOVE_AGENT_MAX_IN_FLIGHT", "32")),
+        admin_max_in_flight=int(os.getenv("GLOVE_ADMIN_MAX_IN_FLIGHT", "16")),
     )
@@ -1,17 +1,220 @@
+import functools
 import hashlib
 import json
 import sqlite3
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .analytics import aggregate_audit_rows
+from .codec import load_json, pack_text
+from .metrics import DB_SECONDS
+from .pending import PENDING_TABLE_LOOKUPS, Change, PendingRequests
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+REQUEST_COLUMNS = (
+    "id, action, target, metadata_json, risk, status, reason, policy_id, attempts, created_at, expires_at, approved_at"
+)
+# What the status endpoint and approval checks read; no metadata blob.
+REQUEST_STATUS_COLUMNS = "id, action, target, status, attempts, created_at, expires_at, approved_at"
+REQUEST_SUMMARY_COLUMNS = (
+    "id, action, target, risk, status, reason, policy_id, attempts, created_at, expires_at, approved_at"
+)
+# What the admin audit list and feed read: compressed details are left in the
+# database (details is null) and fetched one entry at a time with audit_entry.
+AUDIT_SUMMARY_COLUMNS = (
+    "id, ts, event_type, request_id, action, target, outcome, prev_hash, entry_hash, "
+    "CASE WHEN typeof(details_json) = 'blob' THEN NULL ELSE details_json END AS details_json"
+)
+
+INBOUND_COLUMNS = (
+    "id, idempotency_key, status, outcome, attempts, result_json, received_at, claimed_at, processed_at"
+)
+
+REPLAY_JOB_COLUMNS = "id, status, params_json, scanned, result_json, error, created_at, updated_at, finished_at"
+
+# Finished replay jobs kept for the status endpoint; older ones are dropped
+# when a new job starts.
+REPLAY_JOBS_KEPT = 20
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _timed(func: F) -> F:
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            DB_SECONDS.observe(time.perf_counter() - started, name)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def search_text(value: Any) -> str:
+    # Flattens details/metadata into "key value ..." text for the FTS index.
+    parts: List[str] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            for key, item in node.items():
+                parts.append(str(key))
+                walk(item)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                walk(item)
+        elif node is not None:
+            parts.append(str(node))
+
+    walk(value)
+    return " ".join(parts)
+
+
+def _inbound_row(row: sqlite3.Row) -> Dict[str, Any]:
+    data = dict(row)
+    raw = data.pop("result_json")
+    data["result"] = json.loads(raw) if raw else None
+    return data
+
+
+def _replay_job_row(row: sqlite3.Row) -> Dict[str, Any]:
+    data = dict(row)
+    data["params"] = json.loads(data.pop("params_json"))
+    raw = data.pop("result_json")
+    data["result"] = json.loads(raw) if raw else None
+    return data
+
+
+def _audit_entry(row: sqlite3.Row) -> Dict[str, Any]:
+    # details_json is only null when AUDIT_SUMMARY_COLUMNS skipped a blob.
+    data = dict(row)
+    raw = data.pop("details_json")
+    data["details"] = load_json(raw) if raw is not None else None
+    return data
+
+
+class UnitOfWork:
+    # Request and audit writes for one decision or approval, on one connection
+    # inside one BEGIN IMMEDIATE transaction that GloveDB.unit_of_work()
+    # commits once. The write lock is held for the whole block, so PIN
+    # hashing and notifications belong outside it.
+    def __init__(self, db: "GloveDB", conn: sqlite3.Connection):
+        self.db = db
+        self.conn = conn
+        self._head: Optional[str] = None
+        # Request changes for GloveDB.pending, applied once committed.
+        self.changes: List[Change] = []
+
+    def create_request(
+        self,
+        request_id: str,
+        action: str,
+        target: str,
+        metadata: Dict[str, Any],
+        risk: str,
+        reason: str,
+        policy_id: str,
+        expires_at: str,
+    ) -> None:
+        created_at = now_iso()
+        self.conn.execute(
+            """
+            INSERT INTO approval_requests
+            (id, action, target, metadata_json, risk, status, reason, policy_id, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?, ?)
+            """,
+            (
+                request_id,
+                action,
+                target,
+                pack_text(json.dumps(metadata, separators=(",", ":")), self.db.compress_above),
+                risk,
+                reason,
+                policy_id,
+                created_at,
+                expires_at,
+            ),
+        )
+        row = {
+            "id": request_id,
+            "action": action,
+            "target": target,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": created_at,
+            "expires_at": expires_at,
+        }
+        self.changes.append(("create", row))
+
+    def get_request_status(self, request_id: str) -> Optional[Dict[str, Any]]:
+        # Live requests only: archived ones are resolved and never written.
+        row = self.conn.execute(
+            f"SELECT {REQUEST_STATUS_COLUMNS} FROM approval_requests WHERE id = ?",
+            (request_id,),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def set_request_status(self, request_id: str, status: str) -> bool:
+        # Only resolves pending requests; False if it was resolved already.
+        approved_at = now_iso() if status == "approved" else None
+        cur = self.conn.execute(
+            "UPDATE approval_requests SET status = ?, approved_at = ? WHERE id = ? AND status = 'pending'",
+            (status, approved_at, request_id),
+        )
+        if cur.rowcount != 1:
+            return False
+        self.changes.append(("status", request_id, status, approved_at))
+        return True
+
+    def increment_attempts(self, request_id: str) -> int:
+        self.conn.execute(
+            "UPDATE approval_requests SET attempts = attempts + 1 WHERE id = ?",
+            (request_id,),
+        )
+        row = self.conn.execute("SELECT attempts FROM approval_requests WHERE id = ?", (request_id,)).fetchone()
+        attempts = int(row["attempts"]) if row else 0
+        self.changes.append(("attempts", request_id, attempts))
+        return attempts
+
+    def append_audit(
+        self,
+        event_type: str,
+        outcome: str,
+        details: Dict[str, Any],
+        request_id: Optional[str] = None,
+        action: Optional[str] = None,
+        target: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        # metadata is not stored in the audit log or hashed; only its
+        # GloveDB.search_metadata_keys fields are indexed for search.
+        if self._head is None:
+            self._head = self.db._audit_head(self.conn)
+        self._head = self.db._insert_audit(
+            self.conn, self._head, event_type, outcome, details, request_id, action, target, metadata
+        )
+
+
 class GloveDB:
-    def __init__(self, path: str):
+    def __init__(self, path: str, compress_above: int = 1024, search_metadata_keys: Iterable[str] = ()):
         self.path = path
+        # Metadata / audit details longer than this are stored zlib-compressed.
+        self.compress_above = compress_above
+        self.search_enabled = False
+        # Top-level metadata keys added to the audit search index. Indexed
+        # terms can be read back from the FTS5 vocabulary and are never
+        # purged, so nothing outside this list is indexed.
+        self.search_metadata_keys = tuple(search_metadata_keys)
+        # Set by enable_pending_table(); None reads every status from SQLite.
+        self.pending: Optional[PendingRequests] = None
         self._init_schema()
 
     def _connect(self) -> sqlite3.Connection:
@@ -19,9 +222,55 @@ class GloveDB:
         conn.row_factory = sqlite3.Row
         return conn
 
+    @contextmanager
+    def unit_of_work(self) -> Iterator[UnitOfWork]:
+        # Commits everything staged in the block, or nothing if it raises.
+        # Taking the write lock up front keeps the audit hash chain linear
+        # across threads and worker processes.
+        started = time.perf_counter()
+        conn = self._connect()
+        held: List[str] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            uow = UnitOfWork(self, conn)
+            yield uow
+            if self.pending is not None and uow.changes:
+                held = list({change[1]["id"] if change[0] == "create" else change[1] for change in uow.changes})
+                self.pending.hold(held)
+            conn.commit()
+            if held:
+                self.pending.apply(uow.changes)  # type: ignore[union-attr]
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if held:
+                self.pending.release(held)  # type: ignore[union-attr]
+            conn.close()
+            DB_SECONDS.observe(time.perf_counter() - started, "unit_of_work")
+
+    def enable_pending_table(self) -> None:
+        # Only for a single process: commits made by another worker process
+        # would not reach this table.
+        pending = PendingRequests()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {REQUEST_STATUS_COLUMNS} FROM approval_requests WHERE status = 'pending'"
+            ).fetchall()
+        finally:
+            conn.close()
+        pending.load(dict(row) for row in rows)
+        self.pending = pending
+
     def _init_schema(self) -> None:
         conn = self._connect()
         try:
+            # Only takes effect on a new file; existing databases are converted
+            # once with compact() (python main.py --compact-db).
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # WAL lets readers in other worker processes proceed during writes.
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS settings (
@@ -44,6 +293,27 @@ class GloveDB:
                     approved_at TEXT
                 );
 
+                CREATE INDEX IF NOT EXISTS idx_approval_requests_status_created
+                ON approval_requests (status, created_at);
+
+                -- Resolved requests past the retention age; audit entries keep
+                -- pointing at these ids.
+                CREATE TABLE IF NOT EXISTS approval_requests_history (
+                    id TEXT PRIMARY KEY,
+                    action TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    metadata_json TEXT NOT NULL,
+                    risk TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    policy_id TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    expires_at TEXT NOT NULL,
+                    approved_at TEXT,
+                    archived_at TEXT NOT NULL
+                ) WITHOUT ROWID;
+
                 CREATE TABLE IF NOT EXISTS audit_log (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     ts TEXT NOT NULL,
@@ -56,12 +326,104 @@ class GloveDB:
                     prev_hash TEXT,
                     entry_hash TEXT NOT NULL
                 );
+
+                -- Inbound approval replies, acknowledged as soon as they are
+                -- stored and processed by the inbound worker. The body holds
+                -- a PIN and is cleared once the message is finished.
+                CREATE TABLE IF NOT EXISTS inbound_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    outcome TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result_json TEXT,
+                    received_at TEXT NOT NULL,
+                    claimed_at TEXT,
+                    processed_at TEXT
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_inbound_messages_status
+                ON inbound_messages (status, id);
+
+                -- Policy replays run in the background; any worker process
+                -- can report their progress and result from here.
+                CREATE TABLE IF NOT EXISTS replay_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    params_json TEXT NOT NULL,
+                    scanned INTEGER NOT NULL DEFAULT 0,
+                    result_json TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    finished_at TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS stats_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS stats_decisions_hourly (
+                    hour TEXT NOT NULL,
+                    action_prefix TEXT NOT NULL,
+                    policy_id TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (hour, action_prefix, policy_id, outcome)
+                );
+
+                CREATE TABLE IF NOT EXISTS stats_pin_hourly (
+                    hour TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (hour, outcome)
+                );
+
+                CREATE TABLE IF NOT EXISTS stats_approval_latency_hourly (
+                    hour TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (hour, bucket)
+                );
                 """
             )
             conn.commit()
+            self.search_enabled = self._init_search_schema(conn)
         finally:
             conn.close()
 
+    @staticmethod
+    def _init_search_schema(conn: sqlite3.Connection) -> bool:
+        # Contentless FTS5 index keyed by audit_log.id. Rows appended from now
+        # on are indexed by append_audit; older rows (below backfill_below) are
+        # indexed newest-first by backfill_audit_search.
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS audit_fts USING fts5(
+                    event_type, action, target, outcome, details, metadata,
+                    content='', tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS audit_fts_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO audit_fts_state (key, value)
+                SELECT 'backfill_below', COALESCE(MAX(id), 0) + 1 FROM audit_log
+                """
+            )
+            conn.commit()
+            return True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: audit search is unavailable.
+            conn.rollback()
+            return False
+
+    @_timed
     def get_setting(self, key: str) -> Optional[str]:
         conn = self._connect()
         try:
@@ -70,21 +432,55 @@ class GloveDB:
         finally:
             conn.close()
 
+    @_timed
+    def get_all_settings(self) -> Dict[str, str]:
+        conn = self._connect()
+        try:
+            return {row["key"]: row["value"] for row in conn.execute("SELECT key, value FROM settings")}
+        finally:
+            conn.close()
+
     def set_setting(self, key: str, value: str) -> None:
+        self.set_settings({key: value})
+
+    @_timed
+    def set_settings(self, values: Dict[str, str]) -> None:
+        # Every settings write bumps config_version in the same transaction so
+        # other worker processes know to refresh their cached copies.
         conn = self._connect()
         try:
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT INTO settings (key, value)
                 VALUES (?, ?)
                 ON CONFLICT(key) DO UPDATE SET value = excluded.value
                 """,
-                (key, value),
+                list(values.items()),
             )
+            conn.execute(
+                """
+                INSERT INTO settings (key, value)
+                VALUES ('config_version', '1')
+                ON CONFLICT(key) DO UPDATE SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT)
+                """
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    @_timed
+    def get_or_create_setting(self, key: str, value: str) -> str:
+        # First writer wins; concurrent workers all read back the same value.
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", (key, value))
             conn.commit()
+            row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+            return row["value"]
         finally:
             conn.close()
 
+    @_timed
     def create_request(
         self,
         request_id: str,
@@ -96,76 +492,64 @@ class GloveDB:
         policy_id: str,
         expires_at: str,
     ) -> None:
-        conn = self._connect()
-        try:
-            conn.execute(
-                """
-                INSERT INTO approval_requests
-                (id, action, target, metadata_json, risk, status, reason, policy_id, created_at, expires_at)
-                VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?, ?)
-                """,
-                (
-                    request_id,
-                    action,
-                    target,
-                    json.dumps(metadata, separators=(",", ":")),
-                    risk,
-                    reason,
-                    policy_id,
-                    now_iso(),
-                    expires_at,
-                ),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        with self.unit_of_work() as uow:
+            uow.create_request(request_id, action, target, metadata, risk, reason, policy_id, expires_at)
+
+    @_timed
+    def get_request(self, request_id: str, include_metadata: bool = False) -> Optional[Dict[str, Any]]:
+        columns = REQUEST_COLUMNS if include_metadata else REQUEST_SUMMARY_COLUMNS
+        return self._request_row(request_id, columns)
+
+    def get_request_status(self, request_id: str) -> Optional[Dict[str, Any]]:
+        if self.pending is not None:
+            row = self.pending.get(request_id)
+            PENDING_TABLE_LOOKUPS.inc("hit" if row is not None else "miss")
+            if row is not None:
+                return row
+        return self.read_request_status(request_id)
 
-    def get_request(self, request_id: str) -> Optional[Dict[str, Any]]:
+    @_timed
+    def read_request_status(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self._request_row(request_id, REQUEST_STATUS_COLUMNS)
+
+    def _request_row(self, request_id: str, columns: str) -> Optional[Dict[str, Any]]:
         conn = self._connect()
         try:
             row = conn.execute(
-                "SELECT * FROM approval_requests WHERE id = ?",
+                f"SELECT {columns} FROM approval_requests WHERE id = ?",
                 (request_id,),
             ).fetchone()
+            if not row:
+                row = conn.execute(
+                    f"SELECT {columns} FROM approval_requests_history WHERE id = ?",
+                    (request_id,),
+                ).fetchone()
             if not row:
                 return None
             data = dict(row)
-            data["metadata"] = json.loads(data.pop("metadata_json"))
+            if "metadata_json" in data:
+                data["metadata"] = load_json(data.pop("metadata_json"))
             return data
         finally:
             conn.close()
 
+    @_timed
     def increment_attempts(self, request_id: str) -> int:
-        conn = self._connect()
-        try:
-            conn.execute(
-                "UPDATE approval_requests SET attempts = attempts + 1 WHERE id = ?",
-                (request_id,),
-            )
-            conn.commit()
-            row = conn.execute("SELECT attempts FROM approval_requests WHERE id = ?", (request_id,)).fetchone()
-            return int(row["attempts"]) if row else 0
-        finally:
-            conn.close()
+        with self.unit_of_work() as uow:
+            return uow.increment_attempts(request_id)
 
-    def set_request_status(self, request_id: str, status: str) -> None:
-        conn = self._connect()
-        try:
-            approved_at = now_iso() if status == "approved" else None
-            conn.execute(
-                "UPDATE approval_requests SET status = ?, approved_at = ? WHERE id = ?",
-                (status, approved_at, request_id),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    @_timed
+    def set_request_status(self, request_id: str, status: str) -> bool:
+        with self.unit_of_work() as uow:
+            return uow.set_request_status(request_id, status)
 
-    def list_pending_requests(self) -> List[Dict[str, Any]]:
+    @_timed
+    def list_pending_requests(self, include_metadata: bool = False) -> List[Dict[str, Any]]:
         conn = self._connect()
         try:
             rows = conn.execute(
-                """
-                SELECT * FROM approval_requests
+                f"""
+                SELECT {REQUEST_COLUMNS if include_metadata else REQUEST_SUMMARY_COLUMNS} FROM approval_requests
                 WHERE status = 'pending'
                 ORDER BY created_at DESC
                 LIMIT 100
@@ -174,12 +558,14 @@ class GloveDB:
             out: List[Dict[str, Any]] = []
             for row in rows:
                 data = dict(row)
-                data["metadata"] = json.loads(data.pop("metadata_json"))
+                if include_metadata:
+                    data["metadata"] = load_json(data.pop("metadata_json"))
                 out.append(data)
             return out
         finally:
             conn.close()
 
+    @_timed
     def append_audit(
         self,
         event_type: str,
@@ -188,39 +574,746 @@ class GloveDB:
         request_id: Optional[str] = None,
         action: Optional[str] = None,
         target: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
+        with self.unit_of_work() as uow:
+            uow.append_audit(event_type, outcome, details, request_id, action, target, metadata)
+
+    @staticmethod
+    def _audit_head(conn: sqlite3.Connection) -> str:
+        prev = conn.execute("SELECT entry_hash FROM audit_log ORDER BY id DESC LIMIT 1").fetchone()
+        return prev["entry_hash"] if prev else ""
+
+    def _insert_audit(
+        self,
+        conn: sqlite3.Connection,
+        prev_hash: str,
+        event_type: str,
+        outcome: str,
+        details: Dict[str, Any],
+        request_id: Optional[str] = None,
+        action: Optional[str] = None,
+        target: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # Caller holds the write lock; returns the new chain head.
+        ts = now_iso()
+        payload = json.dumps(details, sort_keys=True, separators=(",", ":"))
+        source = f"{prev_hash}|{ts}|{event_type}|{request_id or ''}|{action or ''}|{target or ''}|{outcome}|{payload}"
+        entry_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        cur = conn.execute(
+            """
+            INSERT INTO audit_log
+            (ts, event_type, request_id, action, target, outcome, details_json, prev_hash, entry_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                ts,
+                event_type,
+                request_id,
+                action,
+                target,
+                outcome,
+                # The chain hashes the JSON text; only its storage is compressed.
+                pack_text(payload, self.compress_above),
+                prev_hash or None,
+                entry_hash,
+            ),
+        )
+        if self.search_enabled:
+            conn.execute(
+                """
+                INSERT INTO audit_fts (rowid, event_type, action, target, outcome, details, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    cur.lastrowid,
+                    event_type,
+                    action or "",
+                    target or "",
+                    outcome,
+                    search_text(details),
+                    self._search_metadata(metadata),
+                ),
+            )
+        return entry_hash
+
+    @_timed
+    def pending_request_ids(self, action_prefix: str = "", limit: int = 200) -> List[str]:
         conn = self._connect()
         try:
-            prev = conn.execute("SELECT entry_hash FROM audit_log ORDER BY id DESC LIMIT 1").fetchone()
-            prev_hash = prev["entry_hash"] if prev else ""
-            ts = now_iso()
-            payload = json.dumps(details, sort_keys=True, separators=(",", ":"))
-            source = f"{prev_hash}|{ts}|{event_type}|{request_id or ''}|{action or ''}|{target or ''}|{outcome}|{payload}"
-            entry_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
-            conn.execute(
+            rows = conn.execute(
                 """
-                INSERT INTO audit_log
-                (ts, event_type, request_id, action, target, outcome, details_json, prev_hash, entry_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT id FROM approval_requests
+                WHERE status = 'pending' AND substr(action, 1, length(?)) = ?
+                ORDER BY created_at
+                LIMIT ?
                 """,
-                (ts, event_type, request_id, action, target, outcome, payload, prev_hash or None, entry_hash),
+                (action_prefix, action_prefix, limit),
+            ).fetchall()
+            return [row["id"] for row in rows]
+        finally:
+            conn.close()
+
+    @_timed
+    def approve_requests(self, approvals: Dict[str, str]) -> List[Dict[str, Any]]:
+        # approvals maps request id -> approval token tail. Statuses are
+        # re-read under the write lock, so a request approved or denied
+        # concurrently is reported rather than approved twice.
+        results: List[Dict[str, Any]] = []
+        with self.unit_of_work() as uow:
+            now = datetime.now(timezone.utc)
+            for request_id, token_tail in approvals.items():
+                row = uow.get_request_status(request_id)
+                if not row:
+                    results.append({"request_id": request_id, "status": "not_found"})
+                    continue
+                if row["status"] != "pending":
+                    results.append({"request_id": request_id, "status": row["status"]})
+                    continue
+                if datetime.fromisoformat(row["expires_at"]) < now:
+                    uow.set_request_status(request_id, "expired")
+                    uow.append_audit("approve_pin", "expired", {"reason": "request_expired"}, request_id)
+                    results.append({"request_id": request_id, "status": "expired"})
+                    continue
+                uow.set_request_status(request_id, "approved")
+                latency = now - datetime.fromisoformat(row["created_at"])
+                uow.append_audit(
+                    "approve_pin",
+                    "approved",
+                    {
+                        "approval_token_tail": token_tail,
+                        "latency_ms": int(latency.total_seconds() * 1000),
+                        "bulk": True,
+                    },
+                    request_id,
+                    row["action"],
+                    row["target"],
+                )
+                results.append({"request_id": request_id, "status": "approved"})
+        return results
+
+    @_timed
+    def fail_pin_attempts(self, request_ids: List[str], max_attempts: int) -> List[Dict[str, Any]]:
+        # A wrong PIN counts against every pending request it was aimed at.
+        results: List[Dict[str, Any]] = []
+        with self.unit_of_work() as uow:
+            for request_id in request_ids:
+                row = uow.get_request_status(request_id)
+                if not row or row["status"] != "pending":
+                    continue
+                attempts = uow.increment_attempts(request_id)
+                outcome = "locked" if attempts >= max_attempts else "failed"
+                if outcome == "locked":
+                    uow.set_request_status(request_id, "denied")
+                uow.append_audit(
+                    "approve_pin",
+                    outcome,
+                    {"attempts": attempts, "max_attempts": max_attempts, "bulk": True},
+                    request_id,
+                    row["action"],
+                    row["target"],
+                )
+                results.append({"request_id": request_id, "status": outcome, "attempts": attempts})
+            if not results:
+                # All of them were resolved while the PIN was checked; the
+                # failed attempt is still audited.
+                uow.append_audit(
+                    "approve_pin",
+                    "failed",
+                    {"reason": "no_pending_requests", "request_ids": request_ids[:20], "bulk": True},
+                )
+        return results
+
+    @_timed
+    def recent_audit(self, limit: int = 100, include_details: bool = False) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {'*' if include_details else AUDIT_SUMMARY_COLUMNS} FROM audit_log ORDER BY id DESC LIMIT ?",
+                (max(1, min(limit, 500)),),
+            ).fetchall()
+            return [_audit_entry(row) for row in rows]
+        finally:
+            conn.close()
+
+    @_timed
+    def audit_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM audit_log WHERE id = ?", (entry_id,)).fetchone()
+            return _audit_entry(row) if row else None
+        finally:
+            conn.close()
+
+    @_timed
+    def audit_cursor(self) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) AS id FROM audit_log").fetchone()
+            return int(row["id"])
+        finally:
+            conn.close()
+
+    @_timed
+    def audit_since(self, since_id: int, limit: int = 500, include_details: bool = False) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {'*' if include_details else AUDIT_SUMMARY_COLUMNS} FROM audit_log "
+                "WHERE id > ? ORDER BY id ASC LIMIT ?",
+                (since_id, max(1, limit)),
+            ).fetchall()
+            return [_audit_entry(row) for row in rows]
+        finally:
+            conn.close()
+
+    @_timed
+    def request_summaries(self, request_ids: List[str]) -> List[Dict[str, Any]]:
+        # Same rows as get_request without metadata, which the admin feed does
+        # not show. Like get_request, ids not live are read from the history
+        # table, so archived requests report their real status.
+        if not request_ids:
+            return []
+        conn = self._connect()
+        try:
+            placeholders = ",".join("?" for _ in request_ids)
+            rows = conn.execute(
+                f"SELECT {REQUEST_SUMMARY_COLUMNS} FROM approval_requests WHERE id IN ({placeholders})",
+                list(request_ids),
+            ).fetchall()
+            found = {row["id"] for row in rows}
+            missing = [request_id for request_id in request_ids if request_id not in found]
+            if missing:
+                placeholders = ",".join("?" for _ in missing)
+                rows += conn.execute(
+                    f"SELECT {REQUEST_SUMMARY_COLUMNS} FROM approval_requests_history WHERE id IN ({placeholders})",
+                    missing,
+                ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    @_timed
+    def pending_request_summaries(self, limit: int = 100) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT {REQUEST_SUMMARY_COLUMNS} FROM approval_requests
+                WHERE status = 'pending'
+                ORDER BY created_at DESC
+                LIMIT ?
+                """,
+                (max(1, min(limit, 500)),),
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def _search_metadata(self, metadata: Optional[Dict[str, Any]]) -> str:
+        if not metadata or not self.search_metadata_keys:
+            return ""
+        return search_text({key: metadata[key] for key in self.search_metadata_keys if key in metadata})
+
+    @_timed
+    def backfill_audit_search(self, batch_size: int = 2000) -> int:
+        # Indexes the next batch of pre-existing rows, newest first, so recent
+        # history becomes searchable before old history. Safe to run from
+        # several workers: the watermark is read and moved under the write lock.
+        if not self.search_enabled:
+            return 0
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM audit_fts_state WHERE key = 'backfill_below'").fetchone()
+            below = int(row["value"]) if row else 1
+            rows = conn.execute(
+                """
+                SELECT a.id, a.event_type, a.action, a.target, a.outcome, a.details_json,
+                       COALESCE(r.metadata_json, h.metadata_json) AS metadata_json
+                FROM audit_log a
+                LEFT JOIN approval_requests r
+                  ON r.id = a.request_id AND a.event_type = 'agent_request'
+                LEFT JOIN approval_requests_history h
+                  ON h.id = a.request_id AND a.event_type = 'agent_request'
+                WHERE a.id < ?
+                ORDER BY a.id DESC
+                LIMIT ?
+                """,
+                (below, max(1, batch_size)),
+            ).fetchall()
+            conn.executemany(
+                """
+                INSERT INTO audit_fts (rowid, event_type, action, target, outcome, details, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        r["id"],
+                        r["event_type"],
+                        r["action"] or "",
+                        r["target"] or "",
+                        r["outcome"],
+                        search_text(load_json(r["details_json"])),
+                        self._search_metadata(load_json(r["metadata_json"]) if r["metadata_json"] else None),
+                    )
+                    for r in rows
+                ],
             )
+            below = rows[-1]["id"] if rows else 1
+            conn.execute("UPDATE audit_fts_state SET value = ? WHERE key = 'backfill_below'", (below,))
             conn.commit()
+            return len(rows)
         finally:
             conn.close()
 
-    def recent_audit(self, limit: int = 100) -> List[Dict[str, Any]]:
+    @_timed
+    def audit_search_backfill_below(self) -> int:
+        if not self.search_enabled:
+            return 1
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM audit_fts_state WHERE key = 'backfill_below'").fetchone()
+            return int(row["value"]) if row else 1
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _first_audit_id(conn: sqlite3.Connection, ts: str, inclusive: bool) -> int:
+        # Smallest id from which every row has ts >= (or >) the given ts.
+        # ids and ts grow together, so this is a binary search over primary
+        # key lookups instead of a scan of an unindexed column.
+        top = conn.execute("SELECT COALESCE(MAX(id), 0) AS id FROM audit_log").fetchone()["id"] + 1
+        lo, hi = 1, top
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = conn.execute("SELECT ts FROM audit_log WHERE id >= ? ORDER BY id LIMIT 1", (mid,)).fetchone()
+            if row is None or (row["ts"] >= ts if inclusive else row["ts"] > ts):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    @_timed
+    def search_audit(
+        self,
+        match: str,
+        event_type: Optional[str] = None,
+        outcome: Optional[str] = None,
+        action_prefix: Optional[str] = None,
+        request_id: Optional[str] = None,
+        since_ts: Optional[str] = None,
+        until_ts: Optional[str] = None,
+        order: str = "recent",
+        after: Optional[Tuple[float, int]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
         conn = self._connect()
         try:
+            clauses = ["audit_fts MATCH ?"]
+            params: List[Any] = [match]
+            # Time bounds become rowid bounds, which FTS5 applies inside the index.
+            if since_ts:
+                clauses.append("f.rowid >= ?")
+                params.append(self._first_audit_id(conn, since_ts, inclusive=True))
+            if until_ts:
+                clauses.append("f.rowid < ?")
+                params.append(self._first_audit_id(conn, until_ts, inclusive=False))
+            if event_type:
+                clauses.append("a.event_type = ?")
+                params.append(event_type)
+            if outcome:
+                clauses.append("a.outcome = ?")
+                params.append(outcome)
+            if action_prefix:
+                clauses.append("substr(a.action, 1, ?) = ?")
+                params.extend([len(action_prefix), action_prefix])
+            if request_id:
+                clauses.append("a.request_id = ?")
+                params.append(request_id)
+            if order == "rank":
+                if after is not None:
+                    clauses.append("(f.rank > ? OR (f.rank = ? AND f.rowid > ?))")
+                    params.extend([after[0], after[0], after[1]])
+                order_by = "f.rank, f.rowid"
+            else:
+                if after is not None:
+                    clauses.append("f.rowid < ?")
+                    params.append(after[1])
+                order_by = "f.rowid DESC"
+            params.append(max(1, min(limit, 200)))
             rows = conn.execute(
-                "SELECT * FROM audit_log ORDER BY id DESC LIMIT ?",
-                (max(1, min(limit, 500)),),
+                f"""
+                SELECT a.*, f.rank AS score
+                FROM audit_fts f
+                JOIN audit_log a ON a.id = f.rowid
+                WHERE {" AND ".join(clauses)}
+                ORDER BY {order_by}
+                LIMIT ?
+                """,
+                params,
             ).fetchall()
             out: List[Dict[str, Any]] = []
             for row in rows:
                 data = dict(row)
-                data["details"] = json.loads(data.pop("details_json"))
+                data["details"] = load_json(data.pop("details_json"))
                 out.append(data)
             return out
         finally:
             conn.close()
+
+    @_timed
+    def catch_up_audit_stats(self, batch_size: int = 5000) -> int:
+        # Folds audit rows past the watermark into the hourly stats tables and
+        # moves the watermark in the same transaction.
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM stats_state WHERE key = 'audit_watermark'").fetchone()
+            watermark = int(row["value"]) if row else 0
+            rows = conn.execute(
+                """
+                SELECT a.id, a.ts, a.event_type, a.action, a.outcome, a.details_json,
+                       COALESCE(r.created_at, h.created_at) AS request_created_at
+                FROM audit_log a
+                LEFT JOIN approval_requests r
+                  ON r.id = a.request_id AND a.event_type = 'approve_pin' AND a.outcome = 'approved'
+                LEFT JOIN approval_requests_history h
+                  ON h.id = a.request_id AND a.event_type = 'approve_pin' AND a.outcome = 'approved'
+                WHERE a.id > ?
+                ORDER BY a.id
+                LIMIT ?
+                """,
+                (watermark, max(1, batch_size)),
+            ).fetchall()
+            if not rows:
+                conn.rollback()
+                return 0
+            decisions, pins, latency = aggregate_audit_rows(dict(r) for r in rows)
+            conn.executemany(
+                """
+                INSERT INTO stats_decisions_hourly (hour, action_prefix, policy_id, outcome, count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(hour, action_prefix, policy_id, outcome) DO UPDATE SET count = count + excluded.count
+                """,
+                [key + (count,) for key, count in decisions.items()],
+            )
+            conn.executemany(
+                """
+                INSERT INTO stats_pin_hourly (hour, outcome, count) VALUES (?, ?, ?)
+                ON CONFLICT(hour, outcome) DO UPDATE SET count = count + excluded.count
+                """,
+                [key + (count,) for key, count in pins.items()],
+            )
+            conn.executemany(
+                """
+                INSERT INTO stats_approval_latency_hourly (hour, bucket, count) VALUES (?, ?, ?)
+                ON CONFLICT(hour, bucket) DO UPDATE SET count = count + excluded.count
+                """,
+                [key + (count,) for key, count in latency.items()],
+            )
+            conn.execute(
+                """
+                INSERT INTO stats_state (key, value) VALUES ('audit_watermark', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """,
+                (rows[-1]["id"],),
+            )
+            conn.commit()
+            return len(rows)
+        finally:
+            conn.close()
+
+    @_timed
+    def audit_stats(self, since_hour: str, until_hour: str) -> Dict[str, Any]:
+        # Reads only the hourly tables: cost depends on the hours and groups
+        # in range, not on how many audit rows they summarize.
+        conn = self._connect()
+        try:
+            bounds = (since_hour, until_hour)
+            decisions = conn.execute(
+                """
+                SELECT hour, action_prefix, policy_id, outcome, count FROM stats_decisions_hourly
+                WHERE hour >= ? AND hour < ?
+                """,
+                bounds,
+            ).fetchall()
+            pins = conn.execute(
+                "SELECT outcome, SUM(count) AS count FROM stats_pin_hourly WHERE hour >= ? AND hour < ? GROUP BY outcome",
+                bounds,
+            ).fetchall()
+            latency = conn.execute(
+                """
+                SELECT bucket, SUM(count) AS count FROM stats_approval_latency_hourly
+                WHERE hour >= ? AND hour < ?
+                GROUP BY bucket
+                """,
+                bounds,
+            ).fetchall()
+            row = conn.execute("SELECT value FROM stats_state WHERE key = 'audit_watermark'").fetchone()
+            return {
+                "decisions": [dict(r) for r in decisions],
+                "pins": [dict(r) for r in pins],
+                "latency": [dict(r) for r in latency],
+                "watermark": int(row["value"]) if row else 0,
+            }
+        finally:
+            conn.close()
+
+    @_timed
+    def archive_requests(self, cutoff: str, batch_size: int = 500) -> int:
+        # Moves up to batch_size requests created before cutoff that are
+        # resolved, or still pending but long expired, into the history table.
+        with self.unit_of_work() as uow:
+            rows = uow.conn.execute(
+                """
+                SELECT id, status, action, target FROM approval_requests
+                WHERE status IN ('approved', 'denied', 'expired') AND created_at < ?
+                UNION ALL
+                SELECT id, status, action, target FROM approval_requests
+                WHERE status = 'pending' AND expires_at < ?
+                LIMIT ?
+                """,
+                (cutoff, cutoff, batch_size),
+            ).fetchall()
+            for row in rows:
+                if row["status"] != "pending":
+                    continue
+                # Nobody polled it after expiry; record the expiry the status
+                # endpoint would have written.
+                uow.set_request_status(row["id"], "expired")
+                uow.append_audit(
+                    "request_status",
+                    "expired",
+                    {"reason": "request_expired"},
+                    row["id"],
+                    row["action"],
+                    row["target"],
+                )
+            if rows:
+                ids = [row["id"] for row in rows]
+                marks = ",".join("?" for _ in ids)
+                uow.conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO approval_requests_history ({REQUEST_COLUMNS}, archived_at)
+                    SELECT {REQUEST_COLUMNS}, ? FROM approval_requests WHERE id IN ({marks})
+                    """,
+                    (now_iso(), *ids),
+                )
+                uow.conn.execute(f"DELETE FROM approval_requests WHERE id IN ({marks})", ids)
+        return len(rows)
+
+    @_timed
+    def enqueue_inbound(self, idempotency_key: str, body: str) -> Tuple[Dict[str, Any], bool]:
+        # -> (message row without body, True if newly queued). A key seen
+        # before returns the existing row, whatever its status.
+        with self.unit_of_work() as uow:
+            cur = uow.conn.execute(
+                """
+                INSERT INTO inbound_messages (idempotency_key, body, status, received_at)
+                VALUES (?, ?, 'queued', ?)
+                ON CONFLICT (idempotency_key) DO NOTHING
+                """,
+                (idempotency_key, body, now_iso()),
+            )
+            row = uow.conn.execute(
+                f"SELECT {INBOUND_COLUMNS} FROM inbound_messages WHERE idempotency_key = ?",
+                (idempotency_key,),
+            ).fetchone()
+        return _inbound_row(row), cur.rowcount == 1
+
+    @_timed
+    def claim_inbound(self, limit: int, stale_before: str) -> List[Dict[str, Any]]:
+        # Marks up to limit queued messages as processing and returns them
+        # with their body. Messages left in processing since stale_before
+        # (a worker died mid-way) are claimed again.
+        with self.unit_of_work() as uow:
+            rows = uow.conn.execute(
+                """
+                SELECT id, idempotency_key, body, attempts FROM inbound_messages
+                WHERE status = 'queued' OR (status = 'processing' AND claimed_at < ?)
+                ORDER BY id
+                LIMIT ?
+                """,
+                (stale_before, limit),
+            ).fetchall()
+            if rows:
+                ids = [row["id"] for row in rows]
+                marks = ",".join("?" for _ in ids)
+                uow.conn.execute(
+                    f"""
+                    UPDATE inbound_messages SET status = 'processing', claimed_at = ?, attempts = attempts + 1
+                    WHERE id IN ({marks})
+                    """,
+                    (now_iso(), *ids),
+                )
+        return [{**dict(row), "attempts": row["attempts"] + 1} for row in rows]
+
+    @_timed
+    def finish_inbound(self, message_id: int, status: str, outcome: str, result: Dict[str, Any]) -> None:
+        # status "queued" puts the message back for another attempt and keeps
+        # its body; "done" / "failed" clear the body and audit the outcome.
+        with self.unit_of_work() as uow:
+            if status == "queued":
+                uow.conn.execute(
+                    "UPDATE inbound_messages SET status = 'queued', result_json = ? WHERE id = ?",
+                    (json.dumps(result, separators=(",", ":")), message_id),
+                )
+                return
+            uow.conn.execute(
+                """
+                UPDATE inbound_messages
+                SET status = ?, outcome = ?, result_json = ?, body = '', processed_at = ?
+                WHERE id = ?
+                """,
+                (status, outcome, json.dumps(result, separators=(",", ":")), now_iso(), message_id),
+            )
+            uow.append_audit("inbound_reply", outcome, {"message_id": message_id, **result})
+
+    @_timed
+    def recent_inbound(self, limit: int = 50) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {INBOUND_COLUMNS} FROM inbound_messages ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            return [_inbound_row(row) for row in rows]
+        finally:
+            conn.close()
+
+    @_timed
+    def prune_inbound(self, cutoff: str) -> int:
+        with self.unit_of_work() as uow:
+            cur = uow.conn.execute(
+                "DELETE FROM inbound_messages WHERE status IN ('done', 'failed') AND processed_at < ?",
+                (cutoff,),
+            )
+        return cur.rowcount
+
+    @_timed
+    def create_replay_job(self, job_id: str, params: Dict[str, Any], stale_before: str) -> Optional[Dict[str, Any]]:
+        # Returns None while another replay is running. A running job whose
+        # progress stopped before stale_before (its process died) is marked
+        # failed and no longer blocks new ones.
+        now = now_iso()
+        with self.unit_of_work() as uow:
+            uow.conn.execute(
+                """
+                UPDATE replay_jobs SET status = 'failed', error = 'abandoned', finished_at = ?
+                WHERE status = 'running' AND updated_at < ?
+                """,
+                (now, stale_before),
+            )
+            if uow.conn.execute("SELECT 1 FROM replay_jobs WHERE status = 'running'").fetchone():
+                return None
+            uow.conn.execute(
+                """
+                DELETE FROM replay_jobs WHERE id NOT IN (
+                    SELECT id FROM replay_jobs ORDER BY created_at DESC LIMIT ?
+                )
+                """,
+                (REPLAY_JOBS_KEPT - 1,),
+            )
+            uow.conn.execute(
+                """
+                INSERT INTO replay_jobs (id, status, params_json, created_at, updated_at)
+                VALUES (?, 'running', ?, ?, ?)
+                """,
+                (job_id, json.dumps(params, separators=(",", ":")), now, now),
+            )
+            row = uow.conn.execute(f"SELECT {REPLAY_JOB_COLUMNS} FROM replay_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _replay_job_row(row)
+
+    @_timed
+    def update_replay_job(self, job_id: str, scanned: int) -> None:
+        with self.unit_of_work() as uow:
+            uow.conn.execute(
+                "UPDATE replay_jobs SET scanned = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+                (scanned, now_iso(), job_id),
+            )
+
+    @_timed
+    def finish_replay_job(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: str = "") -> None:
+        now = now_iso()
+        with self.unit_of_work() as uow:
+            uow.conn.execute(
+                """
+                UPDATE replay_jobs
+                SET status = ?, scanned = COALESCE(?, scanned), result_json = ?, error = ?,
+                    updated_at = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (
+                    status,
+                    result["scanned"] if result else None,
+                    json.dumps(result, separators=(",", ":")) if result is not None else None,
+                    error or None,
+                    now,
+                    now,
+                    job_id,
+                ),
+            )
+
+    @_timed
+    def get_replay_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT {REPLAY_JOB_COLUMNS} FROM replay_jobs WHERE id = ?", (job_id,)).fetchone()
+            return _replay_job_row(row) if row else None
+        finally:
+            conn.close()
+
+    @_timed
+    def incremental_vacuum(self, max_pages: int = 1000) -> int:
+        # Returns pages released to the file system; 0 unless the database
+        # is in auto_vacuum=INCREMENTAL mode.
+        conn = self._connect()
+        try:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion; execute() would
+            # release a single page.
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return max(0, before - after)
+        finally:
+            conn.close()
+
+    @_timed
+    def storage_stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return {
+                "file_bytes": page_size * page_count,
+                "free_bytes": page_size * freelist,
+                "approval_requests": conn.execute("SELECT COUNT(*) FROM approval_requests").fetchone()[0],
+                "approval_requests_history": conn.execute(
+                    "SELECT COUNT(*) FROM approval_requests_history"
+                ).fetchone()[0],
+                "auto_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0],
+            }
+        finally:
+            conn.close()
+
+    def compact(self) -> None:
+        # Full VACUUM that also switches the file to incremental auto-vacuum.
+        # Rewrites the whole database; run it while the service is stopped.
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    @_timed
+    def count_pending_requests(self) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COUNT(*) AS n FROM approval_requests WHERE status = 'pending'").fetchone()
+            return int(row["n"])
+        finally:
+            conn.close()
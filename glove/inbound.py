@@ -0,0 +1,103 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from .db import GloveDB
+from .metrics import REGISTRY
+
+
+INBOUND_MESSAGES = REGISTRY.counter(
+    "glove_inbound_messages_total",
+    "Inbound approval replies by outcome: queued, duplicate, then approved, rejected, retried or failed.",
+    ("outcome",),
+)
+
+
+class InboundRejected(Exception):
+    # Raised by the processor for replies that can never succeed (bad format,
+    # wrong PIN, unknown or resolved request); they are not retried.
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class InboundWorker:
+    # Processes queued inbound replies with process(body) -> result. The
+    # endpoint wakes it after each enqueue; the interval poll picks up replies
+    # queued by other worker processes and ones left behind by a crash.
+    def __init__(
+        self,
+        db: GloveDB,
+        process: Callable[[str], Dict[str, Any]],
+        interval: float = 1.0,
+        batch_size: int = 20,
+        max_attempts: int = 3,
+        stale_seconds: float = 60.0,
+    ):
+        self.db = db
+        self.process = process
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.stale_seconds = stale_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        stale_before = (datetime.now(timezone.utc) - timedelta(seconds=self.stale_seconds)).isoformat()
+        messages = self.db.claim_inbound(self.batch_size, stale_before)
+        for message in messages:
+            self._handle(message)
+        return len(messages)
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        try:
+            result = self.process(message["body"])
+        except InboundRejected as exc:
+            self.db.finish_inbound(
+                message["id"], "done", "rejected", {"status_code": exc.status_code, "detail": exc.detail}
+            )
+            INBOUND_MESSAGES.inc("rejected")
+            return
+        except Exception as exc:
+            if message["attempts"] < self.max_attempts:
+                self.db.finish_inbound(message["id"], "queued", "", {"error": str(exc)})
+                INBOUND_MESSAGES.inc("retried")
+            else:
+                self.db.finish_inbound(message["id"], "failed", "failed", {"error": str(exc)})
+                INBOUND_MESSAGES.inc("failed")
+            return
+        self.db.finish_inbound(message["id"], "done", "approved", result)
+        INBOUND_MESSAGES.inc("approved")
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glove-inbound-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Cleared before the pass, so a wake() during it is not lost.
+            self._wake.clear()
+            try:
+                # A full batch means more may be waiting; go again at once.
+                if self.run_once() >= self.batch_size:
+                    continue
+            except Exception as exc:
+                print(json.dumps({"event": "glove_inbound_worker_failed", "error": str(exc)}))
+            self._wake.wait(self.interval)
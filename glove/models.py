@@ -17,6 +17,11 @@ class AgentDecisionOut(BaseModel):
     request_id: str | None = None
     expires_at: str | None = None
     ui_url: str | None = None
+    # Set on allow/deny when GLOVE_DECISION_CACHE_SECONDS > 0: clients may
+    # reuse the decision for identical requests until the TTL runs out or
+    # policy_version changes.
+    cache_ttl_seconds: int | None = None
+    policy_version: str | None = None
 
 
 class ApprovePinIn(BaseModel):
@@ -24,12 +29,20 @@ class ApprovePinIn(BaseModel):
     pin: str = Field(min_length=4, max_length=32)
 
 
+class BulkApprovePinIn(BaseModel):
+    # Either explicit ids or every pending request whose action starts with
+    # action_prefix ("" for all pending).
+    request_ids: list[str] = Field(default_factory=list, max_length=200)
+    action_prefix: str | None = Field(default=None, max_length=200)
+    pin: str = Field(min_length=4, max_length=32)
+
+
 class SetupPinIn(BaseModel):
     pin: str = Field(min_length=4, max_length=32)
 
 
 class MessageReplyIn(BaseModel):
-    body: str = Field(min_length=1, max_length=300)
+    body: str = Field(min_length=1, max_length=6000)
 
 
 class ExtensionConfigIn(BaseModel):
@@ -49,3 +62,13 @@ class ExtensionInstallUrlIn(BaseModel):
 
 class RiskKeywordsConfigIn(BaseModel):
     keywords: list[str] = Field(default_factory=list)
+
+
+class PolicyReplayIn(BaseModel):
+    policy: Dict[str, Any]
+    keywords: list[str] | None = None
+    workers: int = Field(default=1, ge=1, le=32)
+    chunk_size: int = Field(default=5000, ge=100, le=100000)
+    sample_size: int = Field(default=20, ge=0, le=500)
+    since_id: int = Field(default=0, ge=0)
+    limit: int | None = Field(default=None, ge=1)
@@ -1,19 +1,22 @@
 import base64
 import json
-import smtplib
 import subprocess
+import threading
+import time
 from pathlib import Path
 import urllib.parse
-import urllib.request
-from email.message import EmailMessage
 from typing import Dict, List, Optional
 
+from .circuit import CircuitBreaker, CircuitOpen
 from .config import Settings
+from .metrics import EXTENSION_SECONDS, NOTIFIER_SECONDS
 
 
 class Notifier:
     def __init__(self, settings: Settings):
         self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
 
     def send(
         self,
@@ -25,22 +28,48 @@ class Notifier:
         providers = self._providers()
         errors: List[str] = []
         for provider in providers:
+            started = time.perf_counter()
+            outcome = "ok"
             try:
                 if provider == "webhook":
-                    self._send_webhook(subject, message, payload)
+                    self._breaker(provider).call(self._send_webhook, subject, message, payload)
                 elif provider == "smtp":
-                    self._send_smtp(subject, message)
+                    self._breaker(provider).call(self._send_smtp, subject, message)
                 elif provider == "twilio":
-                    self._send_twilio(message)
+                    self._breaker(provider).call(self._send_twilio, message)
                 elif provider == "clawhub":
+                    # Tracked per extension, in _invoke_clawhub_extension.
                     self._send_clawhub(subject, message, payload, options or {})
                 else:
                     self._send_console(subject, message, payload)
             except Exception as exc:
+                outcome = "circuit_open" if isinstance(exc, CircuitOpen) else "failed"
                 errors.append(f"{provider}: {exc}")
+            finally:
+                NOTIFIER_SECONDS.observe(time.perf_counter() - started, provider, outcome)
         if errors and len(errors) == len(providers):
             raise RuntimeError("all notifier providers failed: " + "; ".join(errors))
 
+    def channel_health(self) -> Dict[str, Dict[str, object]]:
+        # Providers and extensions that have been used since start-up, keyed
+        # "webhook" / "smtp" / "twilio" / "clawhub:<extension id>".
+        with self._breakers_lock:
+            breakers = sorted(self._breakers.items())
+        return {name: breaker.snapshot() for name, breaker in breakers}
+
+    def _breaker(self, channel: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            breaker = self._breakers.get(channel)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    channel,
+                    self.settings.notifier_failure_threshold,
+                    self.settings.notifier_circuit_cooldown_seconds,
+                    self.settings.notifier_circuit_max_cooldown_seconds,
+                )
+                self._breakers[channel] = breaker
+            return breaker
+
     def _providers(self) -> List[str]:
         if self.settings.notifier_providers:
             providers = [p.strip().lower() for p in self.settings.notifier_providers.split(",") if p.strip()]
@@ -53,6 +82,10 @@ class Notifier:
     def _send_webhook(self, subject: str, message: str, payload: Dict[str, str]) -> None:
         if not self.settings.webhook_url:
             raise RuntimeError("GLOVE_WEBHOOK_URL is required for webhook notifier.")
+        # http.client/ssl/email cost tens of ms at import; only pay for them
+        # when a provider that needs them is actually used.
+        import urllib.request
+
         body = json.dumps({"subject": subject, "message": message, "payload": payload}).encode("utf-8")
         req = urllib.request.Request(
             self.settings.webhook_url,
@@ -66,6 +99,9 @@ class Notifier:
     def _send_smtp(self, subject: str, message: str) -> None:
         if not all([self.settings.smtp_host, self.settings.smtp_from, self.settings.notify_to]):
             raise RuntimeError("SMTP notifier requires host/from/to settings.")
+        import smtplib
+        from email.message import EmailMessage
+
         msg = EmailMessage()
         msg["Subject"] = subject
         msg["From"] = self.settings.smtp_from
@@ -91,7 +127,11 @@ class Notifier:
 
         sid = self.settings.twilio_account_sid
         token = self.settings.twilio_auth_token
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json"
+        url = f"{self.settings.twilio_api_base}/2010-04-01/Accounts/{sid}/Messages.json"
+
+        # Binds the local name ``urllib`` for the whole function, so it has
+        # to come before urllib.parse is used below.
+        import urllib.request
 
         form = urllib.parse.urlencode(
             {"From": self.settings.twilio_from, "To": self.settings.twilio_to, "Body": message}
@@ -142,7 +182,8 @@ class Notifier:
             return []
         found: List[str] = []
         for child in ext_dir.iterdir():
-            if not child.is_dir():
+            # Dot-directories are in-progress or replaced installs.
+            if not child.is_dir() or child.name.startswith("."):
                 continue
             manifest_path = child / "glove-extension.json"
             if manifest_path.exists():
@@ -158,7 +199,7 @@ class Notifier:
             "message": "Test from Glove admin UI",
             "payload": {"source": "admin_test"},
         }
-        self._invoke_clawhub_extension(ext_dir, extension_id, envelope)
+        self._invoke_clawhub_extension(ext_dir, extension_id, envelope, force=True)
 
     def _resolve_extension_ids(self, options: Dict[str, object]) -> List[str]:
         override = options.get("clawhub_extensions")
@@ -166,7 +207,27 @@ class Notifier:
             return [str(x).strip() for x in override if str(x).strip()]
         return [x.strip() for x in self.settings.clawhub_extensions.split(",") if x.strip()]
 
-    def _invoke_clawhub_extension(self, ext_root: Path, ext_id: str, envelope: Dict[str, str]) -> None:
+    def _invoke_clawhub_extension(
+        self,
+        ext_root: Path,
+        ext_id: str,
+        envelope: Dict[str, str],
+        force: bool = False,
+    ) -> None:
+        started = time.perf_counter()
+        outcome = "failed"
+        try:
+            self._breaker(f"clawhub:{ext_id}").call(
+                self._run_clawhub_extension, ext_root, ext_id, envelope, force=force
+            )
+            outcome = "ok"
+        except CircuitOpen:
+            outcome = "circuit_open"
+            raise
+        finally:
+            EXTENSION_SECONDS.observe(time.perf_counter() - started, ext_id, outcome)
+
+    def _run_clawhub_extension(self, ext_root: Path, ext_id: str, envelope: Dict[str, str]) -> None:
         manifest_path = ext_root / ext_id / "glove-extension.json"
         if not manifest_path.exists():
             raise RuntimeError(f"missing manifest {manifest_path}")
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+
+PENDING_TABLE_LOOKUPS = REGISTRY.counter(
+    "glove_pending_table_lookups_total",
+    "Request status lookups answered from the in-process pending table (hit) or the database (miss).",
+    ("result",),
+)
+
+
+def in_worker_process() -> bool:
+    # uvicorn --workers and --reload run the app in multiprocessing children.
+    # Checked without importing multiprocessing, which a plain single
+    # process never needs.
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+# ("create", row) | ("status", request_id, status, approved_at) | ("attempts", request_id, attempts)
+Change = Tuple[Any, ...]
+
+
+class RequestRecord:
+    __slots__ = (
+        "id",
+        "action",
+        "target",
+        "status",
+        "attempts",
+        "created_at",
+        "expires_at",
+        "expires_ts",
+        "approved_at",
+        "resolved_ts",
+    )
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row["id"]
+        self.action = row["action"]
+        self.target = row["target"]
+        self.status = row["status"]
+        self.attempts = row["attempts"]
+        self.created_at = row["created_at"]
+        self.expires_at = row["expires_at"]
+        self.expires_ts = datetime.fromisoformat(row["expires_at"]).timestamp()
+        self.approved_at = row.get("approved_at")
+        self.resolved_ts = 0.0 if self.status == "pending" else time.time()
+
+    def as_row(self) -> Dict[str, Any]:
+        # Same shape as GloveDB.read_request_status().
+        return {
+            "id": self.id,
+            "action": self.action,
+            "target": self.target,
+            "status": self.status,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "approved_at": self.approved_at,
+        }
+
+
+class PendingRequests:
+    # Committed state of live requests, kept by this process so status reads
+    # and approval checks skip SQLite. GloveDB.unit_of_work() applies each
+    # transaction's changes after it commits. While a transaction commits,
+    # the ids it touches are held: lookups for them go to the database, so
+    # no reader sees a stale record once the commit is visible to others.
+    # Resolved requests stay for resolved_ttl seconds. Pending ones long past
+    # expiry are dropped too; anything not in the table is read from the
+    # database, which stays the source of truth.
+    def __init__(self, resolved_ttl: float = 600.0, prune_interval: float = 60.0):
+        self.resolved_ttl = resolved_ttl
+        self.prune_interval = prune_interval
+        self._records: Dict[str, RequestRecord] = {}
+        self._held: Dict[str, int] = {}
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        records = {row["id"]: RequestRecord(row) for row in rows}
+        with self._lock:
+            self._records = records
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if request_id in self._held:
+                return None
+            record = self._records.get(request_id)
+            return record.as_row() if record is not None else None
+
+    def hold(self, request_ids: List[str]) -> None:
+        with self._lock:
+            for request_id in request_ids:
+                self._held[request_id] = self._held.get(request_id, 0) + 1
+
+    def release(self, request_ids: List[str]) -> None:
+        with self._lock:
+            for request_id in request_ids:
+                left = self._held.get(request_id, 0) - 1
+                if left > 0:
+                    self._held[request_id] = left
+                else:
+                    self._held.pop(request_id, None)
+
+    def apply(self, changes: List[Change]) -> None:
+        now = time.time()
+        with self._lock:
+            for change in changes:
+                if change[0] == "create":
+                    self._records[change[1]["id"]] = RequestRecord(change[1])
+                    continue
+                record = self._records.get(change[1])
+                if record is None:
+                    continue
+                if change[0] == "status":
+                    # Transactions can finish applying out of commit order;
+                    # a resolved request never goes back to pending.
+                    if record.status == "pending":
+                        record.status = change[2]
+                        record.approved_at = change[3]
+                        record.resolved_ts = now
+                elif change[0] == "attempts":
+                    record.attempts = max(record.attempts, change[2])
+            if now >= self._next_prune:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.resolved_ttl
+        self._records = {
+            request_id: record
+            for request_id, record in self._records.items()
+            if (record.resolved_ts or record.expires_ts) >= cutoff
+        }
+        self._next_prune = now + self.prune_interval
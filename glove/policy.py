@@ -1,6 +1,16 @@
+import heapq
 import json
+import operator
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .targets import LiteralAutomaton, TargetMatcher
+
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+_MISSING = object()
+_RANGE_OPS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
 
 
 @dataclass
@@ -11,24 +21,205 @@ class PolicyDecision:
     policy_id: str
 
 
+def _lookup(metadata: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value: Any = metadata
+    for part in path:
+        if not isinstance(value, dict):
+            return _MISSING
+        value = value.get(part, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _in_set(value: Any, allowed: frozenset) -> bool:
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
+
+def compile_condition(field: str, spec: Any) -> Tuple[Predicate, bool]:
+    # Returns the predicate and whether it needs the field to be present, which
+    # is what lets rules be skipped on a key lookup before any predicate runs.
+    path = tuple(field.split(".")) if isinstance(field, str) else ()
+    if not path or not all(path):
+        raise ValueError(f"invalid metadata condition field: {field!r}")
+    if not isinstance(spec, dict):
+        spec = {"equals": spec}
+
+    checks: List[Callable[[Any], bool]] = []
+    requires_field = True
+    for op, operand in spec.items():
+        if op == "exists":
+            want = bool(operand)
+            requires_field = requires_field and want
+            checks.append(lambda v, want=want: (v is not _MISSING) == want)
+        elif op == "equals":
+            checks.append(lambda v, expected=operand: v is not _MISSING and v == expected)
+        elif op == "in":
+            if not isinstance(operand, list):
+                raise ValueError(f"metadata condition 'in' for {field!r} must be a list")
+            try:
+                allowed = frozenset(operand)
+            except TypeError:
+                raise ValueError(f"metadata condition 'in' for {field!r} must list scalars")
+            checks.append(lambda v, allowed=allowed: _in_set(v, allowed))
+        elif op in _RANGE_OPS:
+            bound = _as_number(operand)
+            if bound is None:
+                raise ValueError(f"metadata condition {op!r} for {field!r} must be numeric")
+            cmp = _RANGE_OPS[op]
+            checks.append(lambda v, cmp=cmp, bound=bound: (n := _as_number(v)) is not None and cmp(n, bound))
+        else:
+            raise ValueError(f"unknown metadata condition operator: {op!r}")
+
+    if len(checks) == 1:
+        check = checks[0]
+
+        def predicate(metadata: Dict[str, Any]) -> bool:
+            return check(_lookup(metadata, path))
+
+    else:
+
+        def predicate(metadata: Dict[str, Any]) -> bool:
+            value = _lookup(metadata, path)
+            return all(c(value) for c in checks)
+
+    return predicate, requires_field
+
+
+class _CompiledRule:
+    __slots__ = ("prefix", "rule", "targets", "conditions", "required_keys", "rank")
+
+    def __init__(self, rule: Dict[str, Any]):
+        self.prefix = rule.get("action_prefix", "")
+        self.rule = rule
+        self.targets = TargetMatcher(rule["targets"]) if rule.get("targets") else None
+        self.rank = 0
+        when = rule.get("when") or {}
+        if not isinstance(when, dict):
+            raise ValueError(f"policy rule 'when' must be an object: {rule.get('id', self.prefix)!r}")
+        conditions: List[Predicate] = []
+        required: List[str] = []
+        for field, spec in when.items():
+            predicate, requires_field = compile_condition(field, spec)
+            conditions.append(predicate)
+            if requires_field:
+                required.append(field.split(".")[0])
+        self.conditions: Tuple[Predicate, ...] = tuple(conditions)
+        self.required_keys: Tuple[str, ...] = tuple(dict.fromkeys(required))
+
+    def in_scope(self, action: str, target: str) -> bool:
+        # Everything but the metadata conditions.
+        if not action.startswith(self.prefix):
+            return False
+        return self.targets is None or self.targets.match(target) is not None
+
+    def applies_to(self, action: str, target: str, metadata: Dict[str, Any]) -> bool:
+        if not action.startswith(self.prefix):
+            return False
+        for key in self.required_keys:
+            if key not in metadata:
+                return False
+        if self.targets is not None and self.targets.match(target) is None:
+            return False
+        for predicate in self.conditions:
+            if not predicate(metadata):
+                return False
+        return True
+
+
+def _rank(compiled: _CompiledRule) -> int:
+    return compiled.rank
+
+
+def action_prefix(action: str) -> str:
+    # Two leading segments ("file.read.") are how rules and reports group
+    # actions; two-segment actions group by their first ("exec.rm" -> "exec."),
+    # so the number of groups does not grow with agent-chosen action names.
+    parts = action.split(".")
+    if len(parts) == 1:
+        return action
+    if len(parts) == 2:
+        return parts[0] + "."
+    return ".".join(parts[:2]) + "."
+
+
+def normalize_keywords(keywords: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    seen = set()
+    for raw in keywords:
+        kw = str(raw).strip().lower()
+        if not kw or len(kw) > 64:
+            continue
+        if kw in seen:
+            continue
+        seen.add(kw)
+        out.append(kw)
+    return out
+
+
 class PolicyEngine:
     def __init__(self, policy_path: str):
         with open(policy_path, "r", encoding="utf-8") as f:
             self._policy = json.load(f)
+        self._compile()
+
+    @classmethod
+    def from_policy(cls, policy: Dict[str, Any]) -> "PolicyEngine":
+        engine = cls.__new__(cls)
+        engine._policy = policy
+        engine._compile()
+        return engine
+
+    def _compile(self) -> None:
+        if not isinstance(self._policy, dict):
+            raise ValueError("policy must be a JSON object")
+        raw_rules = self._policy.get("rules", [])
+        if not isinstance(raw_rules, list) or not all(isinstance(r, dict) for r in raw_rules):
+            raise ValueError("policy rules must be a list of objects")
+        self._blocked = TargetMatcher(self._policy.get("blocked_targets", []))
+        rules = [_CompiledRule(r) for r in raw_rules if r.get("action_prefix")]
+        # Longest prefix wins, scoped rules (targets/when) before unscoped ones
+        # with the same prefix; the stable sort keeps file order for the rest.
+        rules.sort(key=lambda r: (len(r.prefix), r.targets is not None or bool(r.conditions)), reverse=True)
+        # Rules that need metadata keys are indexed under the first one, so a
+        # request only walks the rules whose keys its metadata actually has.
+        self._rules: List[_CompiledRule] = rules
+        self._unkeyed: List[_CompiledRule] = []
+        self._by_key: Dict[str, List[_CompiledRule]] = {}
+        for rank, compiled in enumerate(rules):
+            compiled.rank = rank
+            if compiled.required_keys:
+                self._by_key.setdefault(compiled.required_keys[0], []).append(compiled)
+            else:
+                self._unkeyed.append(compiled)
 
     def evaluate(self, action: str, target: str, metadata: Dict[str, Any]) -> PolicyDecision:
-        blocked_targets = self._policy.get("blocked_targets", [])
-        for blocked in blocked_targets:
-            if blocked and blocked.lower() in target.lower():
-                return PolicyDecision(
-                    decision="deny",
-                    risk="high",
-                    reason=f"Target is blocked by policy: {blocked}",
-                    policy_id="policy-blocked-target",
-                )
-
-        rules = self._policy.get("rules", [])
-        rule = self._find_best_rule(action, rules)
+        blocked = self._blocked.match(target)
+        if blocked is not None:
+            return PolicyDecision(
+                decision="deny",
+                risk="high",
+                reason=f"Target is blocked by policy: {blocked}",
+                policy_id="policy-blocked-target",
+            )
+
+        rule = self._find_best_rule(action, target, metadata)
         default_risk = self._policy.get("default_risk", "medium")
         if not rule:
             return self._risk_to_decision(default_risk, "default-policy", "Default policy applied.")
@@ -45,17 +236,27 @@ class PolicyEngine:
         reason = rule.get("reason", "Rule-based policy applied.")
         return self._risk_to_decision(risk, rule.get("id", "policy-unnamed"), reason)
 
-    @staticmethod
-    def _find_best_rule(action: str, rules: list) -> Optional[Dict[str, Any]]:
-        matches = []
-        for rule in rules:
-            prefix = rule.get("action_prefix", "")
-            if prefix and action.startswith(prefix):
-                matches.append((len(prefix), rule))
-        if not matches:
-            return None
-        matches.sort(key=lambda x: x[0], reverse=True)
-        return matches[0][1]
+    def needs_metadata(self, action: str, target: str) -> bool:
+        # Whether the decision for action/target turns on metadata conditions:
+        # the best rule in scope, ignoring conditions, has some. Replay uses it
+        # for audited rows whose metadata was never stored.
+        if self._blocked.match(target) is not None:
+            return False
+        for compiled in self._rules:
+            if compiled.in_scope(action, target):
+                return bool(compiled.conditions)
+        return False
+
+    def _find_best_rule(self, action: str, target: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        candidates: Iterable[_CompiledRule] = self._unkeyed
+        if self._by_key and metadata:
+            keyed = [rules for key, rules in self._by_key.items() if key in metadata]
+            if keyed:
+                candidates = heapq.merge(self._unkeyed, *keyed, key=_rank)
+        for compiled in candidates:
+            if compiled.applies_to(action, target, metadata):
+                return compiled.rule
+        return None
 
     @staticmethod
     def _risk_to_decision(risk: str, policy_id: str, reason: str) -> PolicyDecision:
@@ -63,3 +264,72 @@ class PolicyEngine:
         if normalized == "high":
             return PolicyDecision(decision="require_pin", risk="high", reason=reason, policy_id=policy_id)
         return PolicyDecision(decision="allow", risk=normalized, reason=reason, policy_id=policy_id)
+
+
+class RiskKeywordMatcher:
+    # Walks action, target and metadata keys/values directly instead of
+    # scanning a JSON dump of the whole request.
+    def __init__(self, keywords: Iterable[str]):
+        literals = [(kw, kw) for kw in keywords if kw]
+        self._automaton = LiteralAutomaton(literals) if literals else None
+
+    def __bool__(self) -> bool:
+        return self._automaton is not None
+
+    def match(self, action: str, target: str, metadata: Dict[str, Any]) -> Optional[str]:
+        if self._automaton is None:
+            return None
+        search = self._automaton.search
+        return search(action.lower()) or search(target.lower()) or self._match_value(metadata)
+
+    def _match_value(self, value: Any) -> Optional[str]:
+        search = self._automaton.search
+        if isinstance(value, str):
+            return search(value.lower())
+        if isinstance(value, dict):
+            for key, item in value.items():
+                hit = search(str(key).lower()) or self._match_value(item)
+                if hit:
+                    return hit
+            return None
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                hit = self._match_value(item)
+                if hit:
+                    return hit
+            return None
+        if value is None:
+            return search("null")
+        if isinstance(value, bool):
+            return search("true" if value else "false")
+        return search(str(value).lower())
+
+
+def keyword_decision(
+    keywords: RiskKeywordMatcher,
+    action: str,
+    target: str,
+    metadata: Dict[str, Any],
+) -> Optional[PolicyDecision]:
+    keyword_match = keywords.match(action, target, metadata)
+    if not keyword_match:
+        return None
+    return PolicyDecision(
+        decision="require_pin",
+        risk="high",
+        reason=f"Risk keyword matched: '{keyword_match}'",
+        policy_id="policy-risk-keyword",
+    )
+
+
+def evaluate_request(
+    engine: PolicyEngine,
+    keywords: RiskKeywordMatcher,
+    action: str,
+    target: str,
+    metadata: Dict[str, Any],
+) -> PolicyDecision:
+    decision = keyword_decision(keywords, action, target, metadata)
+    if decision is not None:
+        return decision
+    return engine.evaluate(action, target, metadata)
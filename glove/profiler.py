@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+
+_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> Dict[str, int]:
+    # Wall-clock sampler over every thread except this one; returns collapsed
+    # stacks ("root;child;leaf" -> samples) as used by flamegraph.pl/speedscope.
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        counts: Counter = Counter()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                stack.reverse()
+                counts[";".join(stack)] += 1
+            time.sleep(interval)
+        return dict(counts)
+    finally:
+        _lock.release()
+
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
@@ -0,0 +1,304 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .codec import StoredJSON, load_json
+from .policy import PolicyEngine, RiskKeywordMatcher, action_prefix, evaluate_request, normalize_keywords
+
+
+# Audit rows only keep action/target; metadata is recovered from approval_requests
+# (or its history table) for require_pin rows and is empty for recorded
+# allow/deny decisions.
+_ROWS_SQL = """
+SELECT a.id, a.action, a.target, a.outcome, a.details_json, COALESCE(r.metadata_json, h.metadata_json)
+FROM audit_log a
+LEFT JOIN approval_requests r ON r.id = a.request_id
+LEFT JOIN approval_requests_history h ON h.id = a.request_id
+WHERE a.event_type = 'agent_request' AND a.id > ? AND a.id <= ?
+ORDER BY a.id
+LIMIT ?
+"""
+
+Row = Tuple[int, str, str, str, StoredJSON, Optional[StoredJSON]]
+
+_worker_engine: Optional[PolicyEngine] = None
+_worker_keywords: Optional[RiskKeywordMatcher] = None
+
+
+def _init_worker(policy: Dict[str, Any], keywords: List[str]) -> None:
+    global _worker_engine, _worker_keywords
+    _worker_engine = PolicyEngine.from_policy(policy)
+    _worker_keywords = RiskKeywordMatcher(normalize_keywords(keywords))
+
+
+def _replay_chunk(rows: List[Row], sample_size: int) -> Dict[str, Any]:
+    assert _worker_engine is not None and _worker_keywords is not None
+    recorded_ids: Counter = Counter()
+    candidate_ids: Counter = Counter()
+    changed_from: Counter = Counter()
+    changed_to: Counter = Counter()
+    prefix_scanned: Counter = Counter()
+    prefix_transitions: Counter = Counter()
+    prefix_not_replayable: Counter = Counter()
+    samples: List[Dict[str, Any]] = []
+    changed = 0
+
+    for audit_id, action, target, outcome, details_json, metadata_json in rows:
+        action = action or ""
+        target = target or ""
+        details = load_json(details_json)
+        metadata = load_json(metadata_json)
+        recorded_id = str(details.get("policy_id", ""))
+        decision = evaluate_request(_worker_engine, _worker_keywords, action, target, metadata)
+
+        prefix = action_prefix(action)
+        if (
+            metadata_json is None
+            and decision.policy_id != "policy-risk-keyword"
+            and _worker_engine.needs_metadata(action, target)
+        ):
+            # Decided by metadata conditions, but this row's metadata was
+            # never stored: any difference would be made up.
+            prefix_not_replayable[prefix] += 1
+            continue
+        recorded_ids[recorded_id] += 1
+        candidate_ids[decision.policy_id] += 1
+        prefix_scanned[prefix] += 1
+        if decision.decision == outcome:
+            continue
+
+        changed += 1
+        changed_from[recorded_id] += 1
+        changed_to[decision.policy_id] += 1
+        prefix_transitions[(prefix, f"{outcome}->{decision.decision}")] += 1
+        if len(samples) < sample_size:
+            samples.append(
+                {
+                    "audit_id": audit_id,
+                    "action": action,
+                    "target": target,
+                    "recorded": outcome,
+                    "recorded_policy_id": recorded_id,
+                    "candidate": decision.decision,
+                    "candidate_policy_id": decision.policy_id,
+                    "candidate_reason": decision.reason,
+                }
+            )
+
+    return {
+        "scanned": len(rows),
+        "changed": changed,
+        "last_id": rows[-1][0] if rows else 0,
+        "recorded_ids": recorded_ids,
+        "candidate_ids": candidate_ids,
+        "changed_from": changed_from,
+        "changed_to": changed_to,
+        "prefix_scanned": prefix_scanned,
+        "prefix_transitions": prefix_transitions,
+        "prefix_not_replayable": prefix_not_replayable,
+        "samples": samples,
+    }
+
+
+def iter_agent_request_rows(
+    db_path: str,
+    since_id: int = 0,
+    until_id: Optional[int] = None,
+    chunk_size: int = 5000,
+    limit: Optional[int] = None,
+) -> Iterator[List[Row]]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    try:
+        if until_id is None:
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM audit_log").fetchone()
+            until_id = int(row[0])
+        cursor = since_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            rows = conn.execute(_ROWS_SQL, (cursor, until_id, size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            cursor = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+    finally:
+        conn.close()
+
+
+class _Summary:
+    def __init__(self, sample_size: int):
+        self.sample_size = sample_size
+        self.scanned = 0
+        self.changed = 0
+        self.last_id = 0
+        self.recorded_ids: Counter = Counter()
+        self.candidate_ids: Counter = Counter()
+        self.changed_from: Counter = Counter()
+        self.changed_to: Counter = Counter()
+        self.prefix_scanned: Counter = Counter()
+        self.prefix_transitions: Counter = Counter()
+        self.prefix_not_replayable: Counter = Counter()
+        self.samples: List[Dict[str, Any]] = []
+
+    def merge(self, part: Dict[str, Any]) -> None:
+        self.scanned += part["scanned"]
+        self.changed += part["changed"]
+        self.last_id = max(self.last_id, part["last_id"])
+        for name in (
+            "recorded_ids",
+            "candidate_ids",
+            "changed_from",
+            "changed_to",
+            "prefix_scanned",
+            "prefix_transitions",
+            "prefix_not_replayable",
+        ):
+            getattr(self, name).update(part[name])
+        room = self.sample_size - len(self.samples)
+        if room > 0:
+            self.samples.extend(part["samples"][:room])
+
+    def to_dict(self, elapsed: float, workers: int) -> Dict[str, Any]:
+        by_policy: Dict[str, Dict[str, int]] = {}
+        for policy_id in set(self.recorded_ids) | set(self.candidate_ids):
+            by_policy[policy_id] = {
+                "recorded": self.recorded_ids[policy_id],
+                "candidate": self.candidate_ids[policy_id],
+                "changed_from": self.changed_from[policy_id],
+                "changed_to": self.changed_to[policy_id],
+            }
+        by_prefix: Dict[str, Dict[str, Any]] = {}
+        for prefix, scanned in self.prefix_scanned.items():
+            by_prefix[prefix] = {"scanned": scanned, "changed": 0, "not_replayable": 0, "transitions": {}}
+        for prefix, count in self.prefix_not_replayable.items():
+            entry = by_prefix.setdefault(prefix, {"scanned": 0, "changed": 0, "not_replayable": 0, "transitions": {}})
+            entry["scanned"] += count
+            entry["not_replayable"] = count
+        for (prefix, transition), count in self.prefix_transitions.items():
+            entry = by_prefix[prefix]
+            entry["changed"] += count
+            entry["transitions"][transition] = count
+        transitions: Counter = Counter()
+        for (_, transition), count in self.prefix_transitions.items():
+            transitions[transition] += count
+        self.samples.sort(key=lambda s: s["audit_id"])
+        return {
+            "scanned": self.scanned,
+            "changed": self.changed,
+            "not_replayable": sum(self.prefix_not_replayable.values()),
+            "last_audit_id": self.last_id,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.scanned / elapsed, 1) if elapsed > 0 else None,
+            "workers": workers,
+            "transitions": dict(transitions.most_common()),
+            "by_policy": dict(sorted(by_policy.items())),
+            "by_action_prefix": dict(sorted(by_prefix.items())),
+            "samples": self.samples,
+        }
+
+
+def replay_audit_log(
+    db_path: str,
+    policy: Dict[str, Any],
+    keywords: List[str],
+    workers: int = 1,
+    chunk_size: int = 5000,
+    sample_size: int = 20,
+    since_id: int = 0,
+    limit: Optional[int] = None,
+    progress: Optional[Callable[[int, float], None]] = None,
+) -> Dict[str, Any]:
+    # Validate the candidate up front so a bad policy fails before any work.
+    PolicyEngine.from_policy(policy)
+    summary = _Summary(sample_size)
+    chunks = iter_agent_request_rows(db_path, since_id=since_id, chunk_size=chunk_size, limit=limit)
+    started = time.perf_counter()
+
+    def report() -> None:
+        if progress is not None:
+            progress(summary.scanned, time.perf_counter() - started)
+
+    if workers <= 1:
+        _init_worker(policy, keywords)
+        for rows in chunks:
+            summary.merge(_replay_chunk(rows, sample_size))
+            report()
+    else:
+        # Keep a bounded number of chunks in flight so memory stays flat
+        # however large the audit log is.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(policy, keywords),
+        ) as pool:
+            in_flight: Set[Future] = set()
+            for rows in chunks:
+                in_flight.add(pool.submit(_replay_chunk, rows, sample_size))
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        summary.merge(future.result())
+                    report()
+            for future in in_flight:
+                summary.merge(future.result())
+            report()
+
+    return summary.to_dict(time.perf_counter() - started, max(1, workers))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay audited agent requests against a candidate policy.")
+    parser.add_argument("--db", default="./glove.db", help="Glove SQLite database (opened read-only).")
+    parser.add_argument("--policy", required=True, help="Candidate policy.json.")
+    parser.add_argument("--keywords", default=None, help="Comma-separated risk keywords (default: from the DB).")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--sample-size", type=int, default=20)
+    parser.add_argument("--since-id", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with open(args.policy, "r", encoding="utf-8") as f:
+        policy = json.load(f)
+    if args.keywords is not None:
+        keywords = [x for x in args.keywords.split(",") if x.strip()]
+    else:
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM settings WHERE key = 'risk_keywords'").fetchone()
+        finally:
+            conn.close()
+        keywords = [x for x in (row[0] if row else "").split(",") if x.strip()]
+
+    last_report = [0.0]
+
+    def progress(scanned: int, elapsed: float) -> None:
+        if elapsed - last_report[0] < 2.0:
+            return
+        last_report[0] = elapsed
+        print(f"replayed {scanned} rows ({scanned / elapsed:,.0f}/s)", file=sys.stderr)
+
+    result = replay_audit_log(
+        args.db,
+        policy,
+        keywords,
+        workers=args.workers,
+        chunk_size=max(1, args.chunk_size),
+        sample_size=max(0, args.sample_size),
+        since_id=args.since_id,
+        limit=args.limit,
+        progress=progress,
+    )
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
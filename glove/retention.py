@@ -0,0 +1,108 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from .db import GloveDB
+from .metrics import REGISTRY
+
+
+RETENTION_ARCHIVED = REGISTRY.counter(
+    "glove_retention_archived_total",
+    "Approval requests moved to approval_requests_history.",
+)
+DB_ROWS = REGISTRY.gauge(
+    "glove_db_rows",
+    "Row counts as of the last retention pass, by table.",
+    ("table",),
+)
+DB_BYTES = REGISTRY.gauge(
+    "glove_db_bytes",
+    "Database file size and free (reusable) space as of the last retention pass.",
+    ("kind",),
+)
+
+
+class RequestRetention:
+    # Moves resolved approval requests older than retention_days into the
+    # history table in small transactions with a pause between them, so the
+    # write lock is never held for long, then returns freed pages to the OS.
+    def __init__(
+        self,
+        db: GloveDB,
+        retention_days: float = 30.0,
+        interval: float = 300.0,
+        batch_size: int = 500,
+        pause: float = 0.1,
+        vacuum_pages: int = 1000,
+    ):
+        self.db = db
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def run_once(self) -> Dict[str, Any]:
+        before = self.db.storage_stats()
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).isoformat()
+        archived = 0
+        while not self._stop.is_set():
+            moved = self.db.archive_requests(cutoff, self.batch_size)
+            archived += moved
+            RETENTION_ARCHIVED.inc(amount=moved)
+            if moved < self.batch_size:
+                break
+            self._stop.wait(self.pause)
+        # Processed inbound replies only matter for deduplicating retries.
+        pruned_inbound = self.db.prune_inbound(cutoff)
+        vacuumed = 0
+        while not self._stop.is_set():
+            released = self.db.incremental_vacuum(self.vacuum_pages)
+            vacuumed += released
+            if released < self.vacuum_pages:
+                break
+            self._stop.wait(self.pause)
+        after = self.db.storage_stats()
+        for table in ("approval_requests", "approval_requests_history"):
+            DB_ROWS.set(after[table], table)
+        DB_BYTES.set(after["file_bytes"], "file")
+        DB_BYTES.set(after["free_bytes"], "free")
+        return {
+            "cutoff": cutoff,
+            "archived": archived,
+            "pruned_inbound": pruned_inbound,
+            "vacuumed_pages": vacuumed,
+            "before": before,
+            "after": after,
+        }
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glove-request-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                result = self.run_once()
+                if result["archived"] or result["pruned_inbound"] or result["vacuumed_pages"]:
+                    print(json.dumps({"event": "glove_retention_pass", **result}))
+            except Exception as exc:
+                print(json.dumps({"event": "glove_retention_failed", "error": str(exc)}))
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,148 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .db import GloveDB
+from .policy import action_prefix
+
+
+# (action prefix, policy_id, outcome, bucket start epoch seconds)
+RollupKey = Tuple[str, str, str, int]
+
+
+class _Bucket:
+    __slots__ = ("count", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.samples: List[Dict[str, str]] = []
+
+
+def _iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _split(raw: str) -> frozenset:
+    return frozenset(x.strip().lower() for x in raw.split(",") if x.strip())
+
+
+class AuditRollup:
+    # Counts allow decisions in memory and writes one chained audit entry per
+    # (action prefix, policy_id, outcome, time bucket) instead of one per
+    # request. Buckets are only written once they have closed, except on
+    # flush(final=True) at shutdown, so a bucket normally yields one entry.
+    def __init__(
+        self,
+        db: GloveDB,
+        risks: str = "",
+        policy_ids: str = "",
+        bucket_seconds: int = 60,
+        sample_size: int = 5,
+    ):
+        self.db = db
+        self.risks = _split(risks)
+        self.policy_ids = _split(policy_ids)
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.sample_size = max(0, sample_size)
+        self._buckets: Dict[RollupKey, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.risks or self.policy_ids)
+
+    def applies_to(self, risk: str, policy_id: str) -> bool:
+        return risk.lower() in self.risks or policy_id.lower() in self.policy_ids
+
+    def record(self, action: str, target: str, policy_id: str, outcome: str = "allow") -> None:
+        now = time.time()
+        start = int(now // self.bucket_seconds) * self.bucket_seconds
+        key = (action_prefix(action), policy_id, outcome, start)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = _Bucket()
+                self._buckets[key] = bucket
+            bucket.count += 1
+            # Reservoir sampling keeps a uniform sample of the bucket's requests.
+            if len(bucket.samples) < self.sample_size:
+                bucket.samples.append({"action": action, "target": target, "ts": _iso(int(now))})
+            elif self.sample_size:
+                slot = random.randrange(bucket.count)
+                if slot < self.sample_size:
+                    bucket.samples[slot] = {"action": action, "target": target, "ts": _iso(int(now))}
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(b.count for b in self._buckets.values())
+
+    def flush(self, final: bool = False) -> int:
+        cutoff = int(time.time() // self.bucket_seconds) * self.bucket_seconds
+        with self._lock:
+            ready = [k for k in self._buckets if final or k[3] < cutoff]
+            taken = [(k, self._buckets.pop(k)) for k in sorted(ready, key=lambda k: (k[3], k[0], k[1], k[2]))]
+        for index, (key, bucket) in enumerate(taken):
+            try:
+                self._write(key, bucket)
+            except Exception:
+                self._restore(taken[index:])
+                raise
+        return len(taken)
+
+    def _restore(self, items: List[Tuple[RollupKey, _Bucket]]) -> None:
+        with self._lock:
+            for key, bucket in items:
+                current = self._buckets.get(key)
+                if current is None:
+                    self._buckets[key] = bucket
+                else:
+                    current.count += bucket.count
+                    current.samples = (current.samples + bucket.samples)[: self.sample_size]
+
+    def _write(self, key: RollupKey, bucket: _Bucket) -> None:
+        prefix, policy_id, outcome, start = key
+        self.db.append_audit(
+            "agent_request_rollup",
+            outcome,
+            {
+                "policy_id": policy_id,
+                "count": bucket.count,
+                "bucket_start": _iso(start),
+                "bucket_end": _iso(start + self.bucket_seconds),
+                "samples": bucket.samples,
+            },
+            None,
+            prefix,
+            None,
+        )
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glove-audit-rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush(final=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._seconds_until_next_bucket()):
+            try:
+                self.flush()
+            except Exception as exc:
+                # Unwritten buckets are put back and retried on the next tick.
+                print(json.dumps({"event": "glove_audit_rollup_flush_failed", "error": str(exc)}))
+
+    def _seconds_until_next_bucket(self) -> float:
+        # Wake just after each bucket boundary so closed buckets go out promptly.
+        return self.bucket_seconds - (time.time() % self.bucket_seconds) + 0.05
@@ -0,0 +1,115 @@
+import json
+import shlex
+import threading
+from typing import List, Optional, Tuple
+
+from .db import GloveDB
+
+
+SEARCH_COLUMNS = ("event_type", "action", "target", "outcome", "details", "metadata")
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _term(raw: str) -> str:
+    column = ""
+    name, sep, rest = raw.partition(":")
+    if sep and name.lower() in SEARCH_COLUMNS and rest:
+        column, raw = name.lower(), rest
+    prefix = raw.endswith("*") and len(raw) > 1
+    if prefix:
+        raw = raw[:-1]
+    expr = _phrase(raw) + (" *" if prefix else "")
+    return f"{column} : {expr}" if column else expr
+
+
+def build_match_expression(query: str, syntax: str = "simple") -> str:
+    # "simple": whitespace-separated terms (or "quoted phrases") that must all
+    # match; each is quoted, so paths like C:\Games\config.ini work as typed.
+    # Optional column:term, trailing * for prefix, leading - to exclude.
+    # "fts": the query is passed to FTS5 unchanged.
+    query = query.strip()
+    if not query:
+        raise SearchQueryError("empty_query")
+    if syntax == "fts":
+        return query
+    if syntax != "simple":
+        raise SearchQueryError("unknown_syntax")
+    try:
+        tokens = shlex.split(query, posix=True)
+    except ValueError:
+        raise SearchQueryError("unbalanced_quotes")
+    include: List[str] = []
+    exclude: List[str] = []
+    for token in tokens:
+        if token.startswith("-") and len(token) > 1:
+            exclude.append(_term(token[1:]))
+        elif token:
+            include.append(_term(token))
+    if not include:
+        raise SearchQueryError("query_needs_a_positive_term")
+    expr = " AND ".join(include)
+    for term in exclude:
+        expr = f"({expr}) NOT {term}"
+    return expr
+
+
+def encode_cursor(order: str, score: Optional[float], entry_id: int) -> str:
+    if order == "rank":
+        return f"{json.dumps(score)}:{entry_id}"
+    return str(entry_id)
+
+
+def decode_cursor(order: str, cursor: str) -> Tuple[float, int]:
+    try:
+        if order == "rank":
+            score, _, entry_id = cursor.rpartition(":")
+            return float(json.loads(score)), int(entry_id)
+        return 0.0, int(cursor)
+    except (TypeError, ValueError):
+        raise SearchQueryError("invalid_cursor")
+
+
+class AuditSearchBackfill:
+    # Indexes audit rows written before the FTS index existed, in small
+    # transactions so request handlers keep getting the write lock.
+    def __init__(self, db: GloveDB, batch_size: int = 2000, pause: float = 0.05):
+        self.db = db
+        self.batch_size = batch_size
+        self.pause = pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.db.audit_search_backfill_below() <= 1
+
+    def start(self) -> None:
+        if not self.db.search_enabled or self.complete:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glove-audit-search-backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.db.backfill_audit_search(self.batch_size) == 0:
+                    return
+            except Exception as exc:
+                print(json.dumps({"event": "glove_audit_search_backfill_failed", "error": str(exc)}))
+                self._stop.wait(5.0)
+                continue
+            self._stop.wait(self.pause)
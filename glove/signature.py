@@ -1,23 +1,29 @@
 import base64
 import hashlib
 import json
+import os
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from nacl.signing import VerifyKey
+if TYPE_CHECKING:
+    from nacl.signing import VerifyKey
 
 
 class SignatureError(Exception):
     pass
 
 
+_cache_lock = threading.Lock()
+_trust_store_cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+_verify_key_cache: Dict[str, "VerifyKey"] = {}
+
+
 def sha256_hex(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-def load_trust_store(path: str) -> dict:
-    p = Path(path).resolve()
-    if not p.exists():
-        return {"publishers": {}}
+def _read_trust_store(p: Path) -> dict:
     with p.open("r", encoding="utf-8") as f:
         payload = json.load(f)
     if not isinstance(payload, dict):
@@ -28,8 +34,48 @@ def load_trust_store(path: str) -> dict:
     return payload
 
 
-def verify_extension_zip_signature(
-    zip_bytes: bytes,
+def load_trust_store(path: str) -> dict:
+    # Parsed once and reused until the file's mtime or size changes.
+    p = Path(path).resolve()
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return {"publishers": {}}
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(p)
+    with _cache_lock:
+        cached = _trust_store_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    payload = _read_trust_store(p)
+    with _cache_lock:
+        _trust_store_cache[key] = (stamp, payload)
+    return payload
+
+
+def _verify_key(public_key_b64: str) -> "VerifyKey":
+    with _cache_lock:
+        cached: Optional["VerifyKey"] = _verify_key_cache.get(public_key_b64)
+    if cached is not None:
+        return cached
+    # PyNaCl loads libsodium bindings on import; defer it until a signature is checked.
+    from nacl.signing import VerifyKey
+
+    try:
+        pubkey = base64.b64decode(public_key_b64.encode("ascii"))
+    except Exception as exc:
+        raise SignatureError(f"invalid_trust_store_pubkey: {exc}")
+    try:
+        verify_key = VerifyKey(pubkey)
+    except Exception as exc:
+        raise SignatureError(f"invalid_trust_store_pubkey: {exc}")
+    with _cache_lock:
+        _verify_key_cache[public_key_b64] = verify_key
+    return verify_key
+
+
+def verify_extension_digest_signature(
+    digest_hex: str,
     trust_store: dict,
     key_id: str,
     signature_b64: str,
@@ -39,17 +85,22 @@ def verify_extension_zip_signature(
     if not public_key_b64:
         raise SignatureError("unknown_publisher_key_id")
 
-    try:
-        pubkey = base64.b64decode(public_key_b64.encode("ascii"))
-    except Exception as exc:
-        raise SignatureError(f"invalid_trust_store_pubkey: {exc}")
+    verify_key = _verify_key(public_key_b64)
     try:
         signature = base64.b64decode(signature_b64.encode("ascii"))
     except Exception as exc:
         raise SignatureError(f"invalid_signature_b64: {exc}")
 
-    digest = sha256_hex(zip_bytes).encode("ascii")
     try:
-        VerifyKey(pubkey).verify(digest, signature)
+        verify_key.verify(digest_hex.encode("ascii"), signature)
     except Exception as exc:
         raise SignatureError(f"signature_verification_failed: {exc}")
+
+
+def verify_extension_zip_signature(
+    zip_bytes: bytes,
+    trust_store: dict,
+    key_id: str,
+    signature_b64: str,
+) -> None:
+    verify_extension_digest_signature(sha256_hex(zip_bytes), trust_store, key_id, signature_b64)
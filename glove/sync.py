@@ -0,0 +1,107 @@
+import asyncio
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+
+class ChangeWatcher:
+    # Watches PRAGMA data_version on a dedicated connection. SQLite bumps it
+    # whenever any other connection (in this process or another worker)
+    # commits, so this is how status changes and settings edits made by one
+    # worker reach the others without a broker.
+    def __init__(self, db_path: str, interval: float = 0.05):
+        self.db_path = db_path
+        self.interval = interval
+        self._generation = 0
+        self._config_version = -1
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def config_version(self) -> int:
+        return self._config_version
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._config_version = self._read_config_version(conn)
+        self._thread = threading.Thread(target=self._run, args=(conn,), name="glove-change-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._wake()
+
+    @staticmethod
+    def _read_config_version(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM settings WHERE key = 'config_version'").fetchone()
+        try:
+            return int(row[0]) if row else 0
+        except ValueError:
+            return 0
+
+    def _run(self, conn: sqlite3.Connection) -> None:
+        try:
+            last = conn.execute("PRAGMA data_version").fetchone()[0]
+            while not self._stop.wait(self.interval):
+                try:
+                    current = conn.execute("PRAGMA data_version").fetchone()[0]
+                    if current == last:
+                        continue
+                    last = current
+                    self._config_version = self._read_config_version(conn)
+                except sqlite3.Error:
+                    continue
+                self._generation += 1
+                self._wake()
+        finally:
+            conn.close()
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def wait(self, generation: int, timeout: float) -> int:
+        with self._cond:
+            if self._generation == generation and self.running:
+                self._cond.wait(timeout)
+        return self._generation
+
+    async def wait_async(self, generation: int, timeout: float) -> int:
+        if not self.running:
+            await asyncio.sleep(min(timeout, 0.25))
+            return self._generation
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            if self._generation != generation:
+                return self._generation
+            self._async_waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._generation
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,287 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+PATTERN_KINDS = ("substring", "glob", "regex", "prefix")
+
+
+def normalize_target(value: str) -> str:
+    return value.replace("\\", "/").lower()
+
+
+def path_components(value: str) -> List[str]:
+    parts: List[str] = []
+    for index, part in enumerate(normalize_target(value).split("/")):
+        if part == "" and index == 0:
+            # Keep a root marker so "/etc" and "etc" stay distinct.
+            parts.append("")
+            continue
+        if part in ("", "."):
+            continue
+        if part == "..":
+            if parts and parts[-1] != "":
+                parts.pop()
+            continue
+        parts.append(part)
+    return parts
+
+
+def parse_pattern(raw: Any) -> Tuple[str, str]:
+    if isinstance(raw, str):
+        return "substring", raw
+    if isinstance(raw, dict):
+        kinds = [k for k in PATTERN_KINDS if k in raw]
+        if len(kinds) == 1 and isinstance(raw[kinds[0]], str):
+            return kinds[0], raw[kinds[0]]
+    raise ValueError(f"invalid target pattern: {raw!r}")
+
+
+def glob_to_regex(glob: str) -> str:
+    glob = normalize_target(glob)
+    out: List[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if glob.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class LiteralAutomaton:
+    # Aho-Corasick over normalized substrings: one pass over the target no
+    # matter how many literals are configured.
+    def __init__(self, literals: List[Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Optional[str]] = [None]
+        for needle, label in literals:
+            node = 0
+            for ch in needle:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                    self._goto[node][ch] = nxt
+                node = nxt
+            if self._out[node] is None:
+                self._out[node] = label
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                if self._out[nxt] is None:
+                    self._out[nxt] = self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> Optional[str]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] is not None:
+                return out[node]
+        return None
+
+
+class _PathTrie:
+    def __init__(self) -> None:
+        self._root: Dict[Optional[str], Any] = {}
+
+    def add(self, components: List[str], label: str) -> None:
+        node = self._root
+        for component in components:
+            node = node.setdefault(component, {})
+        node.setdefault(None, label)
+
+    def match(self, components: List[str]) -> Optional[str]:
+        node = self._root
+        for component in components:
+            if None in node:
+                return node[None]
+            node = node.get(component)
+            if node is None:
+                return None
+        return node.get(None)
+
+
+class _PrefixIndexedExpressions:
+    # Globs that start with a literal (e.g. "c:/users/*/secrets/**") are bucketed
+    # under that literal in a character trie, so only the handful whose prefix
+    # matches the target are ever tried.
+    def __init__(self) -> None:
+        self._root: Dict[Optional[str], Any] = {}
+
+    def add(self, literal: str, pattern: "re.Pattern[str]", label: str) -> None:
+        node = self._root
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append((pattern, label))
+
+    def match(self, text: str) -> Optional[str]:
+        node = self._root
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                return None
+            for pattern, label in node.get(None, ()):
+                if pattern.match(text):
+                    return label
+        return None
+
+
+def _compile_expression(kind: str, value: str, expr: str) -> "re.Pattern[str]":
+    # Each pattern is compiled on its own first, so a bad one is reported by
+    # name when the policy loads rather than as an error in a joined pattern.
+    try:
+        return re.compile(expr, re.IGNORECASE)
+    except re.error as exc:
+        raise ValueError(f"invalid target {kind} {value!r}: {exc}")
+
+
+class _CombinedExpressions:
+    # Full-match expressions joined into one alternation, so a target is
+    # scanned once however many are configured. Joining renumbers groups and
+    # only allows inline flags at the very start, so expressions with groups
+    # (and so backreferences) or inline flags are matched one by one instead.
+    def __init__(self, expressions: List[Tuple[str, str]]):
+        self._labels: Dict[str, str] = {}
+        self._combined: Optional[re.Pattern] = None
+        self._separate: List[Tuple[re.Pattern, str]] = []
+        parts = []
+        for expr, label in expressions:
+            pattern = re.compile(expr, re.IGNORECASE)
+            if pattern.groups or re.compile(expr).flags & ~re.UNICODE:
+                self._separate.append((pattern, label))
+                continue
+            name = f"p{len(parts)}"
+            self._labels[name] = label
+            parts.append(f"(?P<{name}>(?:{expr})\\Z)")
+        if parts:
+            self._combined = re.compile("|".join(parts), re.IGNORECASE)
+
+    def match(self, text: str) -> Optional[str]:
+        if self._combined is not None:
+            m = self._combined.match(text)
+            if m is not None:
+                return self._labels[m.lastgroup]
+        for pattern, label in self._separate:
+            if pattern.fullmatch(text):
+                return label
+        return None
+
+
+def _glob_literal_prefix(glob: str) -> str:
+    normalized = normalize_target(glob)
+    for index, ch in enumerate(normalized):
+        if ch in "*?[":
+            return normalized[:index]
+    return normalized
+
+
+class TargetMatcher:
+    # Compiles a list of target patterns once:
+    #   "text"               case-insensitive substring (legacy blocked_targets form)
+    #   {"substring": "..."} same, explicit
+    #   {"glob": "..."}      full match; "*" stays in one path component, "**" spans
+    #   {"regex": "..."}     anchored full match, case-insensitive
+    #   {"prefix": "..."}    path prefix, compared component by component
+    # Targets are lowercased and "\" is treated as "/" before matching, except
+    # for regexes: they see the target as given, so r"\\" matches a backslash.
+    def __init__(self, patterns: Iterable[Any]):
+        literals: List[Tuple[str, str]] = []
+        globs: List[Tuple[str, str]] = []
+        regexes: List[Tuple[str, str]] = []
+        self._trie: Optional[_PathTrie] = None
+        self._indexed: Optional[_PrefixIndexedExpressions] = None
+        self._size = 0
+
+        for raw in patterns or []:
+            kind, value = parse_pattern(raw)
+            if not value:
+                continue
+            label = value if kind == "substring" else f"{kind}:{value}"
+            if kind == "substring":
+                literals.append((normalize_target(value), label))
+            elif kind == "prefix":
+                if self._trie is None:
+                    self._trie = _PathTrie()
+                self._trie.add(path_components(value), label)
+            elif kind == "glob":
+                literal = _glob_literal_prefix(value)
+                if literal:
+                    if self._indexed is None:
+                        self._indexed = _PrefixIndexedExpressions()
+                    pattern = _compile_expression(kind, value, glob_to_regex(value) + "\\Z")
+                    self._indexed.add(literal, pattern, label)
+                else:
+                    _compile_expression(kind, value, glob_to_regex(value))
+                    globs.append((glob_to_regex(value), label))
+            else:
+                _compile_expression(kind, value, value)
+                regexes.append((value, label))
+            self._size += 1
+
+        self._literals = LiteralAutomaton(literals) if literals else None
+        self._globs = _CombinedExpressions(globs) if globs else None
+        self._regexes = _CombinedExpressions(regexes) if regexes else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def match(self, target: str) -> Optional[str]:
+        if not self._size:
+            return None
+        normalized = normalize_target(target)
+        if self._trie is not None:
+            hit = self._trie.match(path_components(normalized))
+            if hit is not None:
+                return hit
+        if self._literals is not None:
+            hit = self._literals.search(normalized)
+            if hit is not None:
+                return hit
+        if self._indexed is not None:
+            hit = self._indexed.match(normalized)
+            if hit is not None:
+                return hit
+        if self._globs is not None:
+            hit = self._globs.match(normalized)
+            if hit is not None:
+                return hit
+        if self._regexes is not None:
+            return self._regexes.match(target)
+        return None
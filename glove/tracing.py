@@ -0,0 +1,118 @@
+import json
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from .metrics import STAGE_SECONDS
+
+
+REQUEST_ID_HEADER = "x-request-id"
+
+_enabled = False
+_slow_seconds = 0.5
+_current: ContextVar[Optional["Trace"]] = ContextVar("glove_trace", default=None)
+
+
+class Trace:
+    __slots__ = ("request_id", "spans")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.spans: List[Tuple[str, float, float]] = []
+
+
+def configure(enabled: bool, slow_request_ms: int) -> None:
+    global _enabled, _slow_seconds
+    _enabled = enabled
+    _slow_seconds = max(0, slow_request_ms) / 1000.0
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    # Always feeds the stage histogram; span bookkeeping only happens while
+    # tracing is on and the call is inside a traced request.
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        STAGE_SECONDS.observe(ended - started, name)
+        if _enabled:
+            trace = _current.get()
+            if trace is not None:
+                trace.spans.append((name, started, ended))
+
+
+def _clean_request_id(raw: bytes) -> Optional[str]:
+    value = raw.decode("latin-1").strip()
+    if not value or len(value) > 128:
+        return None
+    if any(not (c.isalnum() or c in "-_.:") for c in value):
+        return None
+    return value
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-request-id":
+                request_id = _clean_request_id(value)
+                break
+        trace = Trace(request_id or secrets.token_hex(8))
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", trace.request_id.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        token = _current.set(trace)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            if elapsed >= _slow_seconds:
+                print(
+                    json.dumps(
+                        {
+                            "event": "glove_slow_request",
+                            "request_id": trace.request_id,
+                            "method": scope.get("method"),
+                            "path": scope.get("path"),
+                            "status": status[0],
+                            "duration_ms": round(elapsed * 1000, 3),
+                            "spans": [
+                                {
+                                    "name": name,
+                                    "start_ms": round((s - started) * 1000, 3),
+                                    "duration_ms": round((e - s) * 1000, 3),
+                                }
+                                for name, s, e in trace.spans
+                            ],
+                        }
+                    )
+                )
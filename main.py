@@ -1,6 +1,44 @@
-from glove.app import app, settings
+import argparse
+import dataclasses
+import json
+import os
+
+from glove.app import app, create_app, settings
+from glove.db import GloveDB
 
 if __name__ == "__main__":
+    import multiprocessing
+
     import uvicorn
 
-    uvicorn.run(app, host=settings.host, port=settings.port)
+    # Policy replay and multi-worker mode use child processes; frozen Windows builds need this.
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Run the Glove service.")
+    parser.add_argument("--workers", type=int, default=settings.workers, help="Worker processes (GLOVE_WORKERS).")
+    parser.add_argument(
+        "--compact-db",
+        action="store_true",
+        help="VACUUM the database into incremental auto-vacuum mode and exit (run with the service stopped).",
+    )
+    args = parser.parse_args()
+
+    if args.compact_db:
+        db = GloveDB(settings.db_path)
+        before = db.storage_stats()
+        db.compact()
+        print(json.dumps({"event": "glove_compact_db", "before": before, "after": db.storage_stats()}))
+    elif args.workers > 1:
+        # Migrate once here so workers don't all race on a fresh database;
+        # each worker's lifespan then opens it and reads the shared keys back.
+        GloveDB(settings.db_path)
+        # Workers load their own settings; --workers must reach them so they
+        # leave the in-process pending table off.
+        os.environ["GLOVE_WORKERS"] = str(args.workers)
+        uvicorn.run("glove.app:app", host=settings.host, port=settings.port, workers=args.workers)
+    else:
+        if os.getenv("GLOVE_PENDING_TABLE") is None:
+            # One process serves the database here, so the in-process
+            # pending table is safe to turn on by default.
+            app = create_app(dataclasses.replace(settings, pending_table=True))
+        uvicorn.run(app, host=settings.host, port=settings.port)